@@ -0,0 +1,189 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+
+from functools import partial
+
+from worker_pool import run_tasks
+
+# A manifest is a JSON list of jobs, each naming a DFA file, an input string
+#   and (optionally) a manim quality:
+#
+#   [
+#       {"machine": "fa_vault/simple.json", "input": "abca", "quality": "low_quality"},
+#       {"machine": "fa_vault/simple.json", "input": "bb"}
+#   ]
+
+DEFAULT_QUALITY = "low_quality"
+
+
+def read_manifest(filename):
+    with open(filename, "r") as f:
+        manifest = json.loads(f.read())
+
+    jobs = list()
+    for entry in manifest:
+        jobs.append({
+            "machine": entry["machine"],
+            "input": entry.get("input", ""),
+            "quality": entry.get("quality", DEFAULT_QUALITY),
+        })
+    return jobs
+
+
+# Every job renders to <out_dir>/<machine>-<path hash>/<quality>/<input>.mp4,
+#   so the same job always lands in the same place and different jobs never
+#   do. The hash of the resolved machine path tells apart files that share a
+#   name. Inputs that are not filename-safe, and the empty input, get names
+#   starting with "@", which no safe input can
+def output_path(job, out_dir):
+    path = os.path.realpath(job["machine"])
+    machine = os.path.splitext(os.path.basename(path))[0]
+    machine += "-" + hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+
+    if job["input"] == "":
+        name = "@empty"
+    elif re.fullmatch(r"[A-Za-z0-9_\-]{1,64}", job["input"]):
+        name = job["input"]
+    else:
+        name = "@" + hashlib.sha1(job["input"].encode("utf-8")).hexdigest()[:12]
+
+    return os.path.join(out_dir, machine, job["quality"], name + ".mp4")
+
+
+# Runs in a worker process. Never raises: failures are reported back so one
+#   bad job cannot take the rest of the batch down with it
+def render_job(job, out_dir):
+    start = time.perf_counter()
+    target = output_path(job, out_dir)
+
+    try:
+        from manim import tempconfig
+        from main import AnimateDFAWithTable
+        from fa_binary import read_automaton
+
+        # Manifests may name .fsmb files as well as JSON ones
+        rawJson = read_automaton(job["machine"])
+
+        # Each job gets its own media directory so partial movie files from
+        #   concurrent renders of the same scene never collide. Compiled TeX is
+        #   shared between them
+        job_dir = os.path.join(out_dir, ".media", os.path.splitext(target)[0].replace(os.sep, "_"))
+        tex_dir = os.path.join(out_dir, ".media", "Tex")
+
+        with tempconfig({
+            "quality": job["quality"],
+            "preview": False,
+            "media_dir": job_dir,
+            "tex_dir": tex_dir,
+        }):
+            scene = AnimateDFAWithTable(rawJson, job["input"])
+            scene.render()
+            produced = scene.renderer.file_writer.movie_file_path
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(str(produced), target)
+        shutil.rmtree(job_dir, ignore_errors=True)
+    except Exception as e:
+        return job, target, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+    return job, target, time.perf_counter() - start, None
+
+
+# Several jobs in one worker, one after another. Jobs on the same machine
+#   share that process's loaded manim, compiled labels and graph layout
+def render_jobs(jobs, out_dir):
+    return [render_job(job, out_dir) for job in jobs]
+
+
+# Splits the jobs into chunks that never mix machines, small enough that
+#   every worker still gets something to do
+def group_jobs(jobs, workers):
+    size = max(1, -(-len(jobs) // workers))
+
+    by_machine = dict()
+    for i, job in enumerate(jobs):
+        by_machine.setdefault(job["machine"], list()).append(i)
+
+    groups = list()
+    for indices in by_machine.values():
+        for start in range(0, len(indices), size):
+            groups.append(indices[start:start + size])
+    return groups
+
+
+# A group that went down with a broken pool is run again one job at a time
+def _one_job_each(group, chunk):
+    return [((i,), [job]) for i, job in zip(group, chunk)]
+
+
+def run_batch(jobs, out_dir, workers=None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    tasks = [(tuple(group), [jobs[i] for i in group]) for group in group_jobs(jobs, workers)]
+
+    results = [None] * len(jobs)
+    for group, _, group_results, error in run_tasks(
+        partial(render_jobs, out_dir=out_dir),
+        tasks,
+        workers,
+        split = _one_job_each,
+    ):
+        if error is not None:
+            # The worker itself died (e.g. killed, out of memory)
+            group_results = [
+                (jobs[i], output_path(jobs[i], out_dir), 0.0, f"{type(error).__name__}: {error}")
+                for i in group
+            ]
+
+        for i, result in zip(group, group_results):
+            results[i] = result
+
+            job, target, seconds, error = result
+            status = "ok" if error is None else "FAILED"
+            print(f"[{status}] {job['machine']} '{job['input']}' ({job['quality']}) in {seconds:.1f}s")
+
+    return results
+
+
+def print_summary(results, wall_time):
+    print()
+    print(f"{'status':<8}{'seconds':>9}  output")
+    for job, target, seconds, error in results:
+        status = "ok" if error is None else "FAILED"
+        print(f"{status:<8}{seconds:>9.1f}  {target}")
+        if error is not None:
+            print(f"{'':<19}{error}")
+
+    failed = sum(1 for result in results if result[3] is not None)
+    busy = sum(result[2] for result in results)
+    print()
+    print(f"{len(results) - failed}/{len(results)} rendered, {failed} failed. "
+          f"{busy:.1f}s of render time in {wall_time:.1f}s wall time")
+
+
+def main(args):
+    if 2 <= len(args) <= 4:
+        manifest = args[1]
+        out_dir = args[2] if len(args) >= 3 else "renders"
+        workers = int(args[3]) if len(args) == 4 else None
+    else:
+        print("Usage: python batch_render.py <manifest.json> [out_dir (default renders)] [workers (default all cores)]")
+        exit(code=2)
+
+    jobs = read_manifest(manifest)
+
+    start = time.perf_counter()
+    results = run_batch(jobs, out_dir, workers)
+    print_summary(results, time.perf_counter() - start)
+
+    if any(result[3] is not None for result in results):
+        exit(code=1)
+
+if __name__ == "__main__":
+    main(sys.argv)
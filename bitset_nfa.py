@@ -0,0 +1,149 @@
+class BitsetNFA:
+    """An NFA whose set of active states is a single integer bitset.
+
+    Bit i stands for states[i]. Epsilon closures are worked out once per
+    state, and for every symbol the closed successor set of each state is
+    stored as a mask, so one step of a run is an OR per active state.
+    """
+
+    def __init__(self, states, symbols, closures, successors, initial, final_mask):
+        self.states = list(states)
+        self.symbols = list(symbols)
+        self.state_ids = {state: i for i, state in enumerate(self.states)}
+
+        # closures[i]: mask of states reachable from state i on epsilons alone
+        # successors[symbol][i]: mask of states reachable from state i on symbol,
+        #   with the epsilon closure already applied
+        self.closures = closures
+        self.successors = successors
+
+        self.initial = initial
+        self.final_mask = final_mask
+
+    @classmethod
+    def from_nfa(cls, nfa, states=None):
+        if states is None:
+            states = sorted(nfa.states, key=str)
+        state_ids = {state: i for i, state in enumerate(states)}
+
+        epsilon_moves = [0] * len(states)
+        for start, paths in nfa.transitions.items():
+            for end in paths.get("", ()):
+                epsilon_moves[state_ids[start]] |= 1 << state_ids[end]
+
+        closures = [cls._closure_of(i, epsilon_moves) for i in range(len(states))]
+
+        symbols = [symbol for symbol in sorted(nfa.input_symbols, key=str) if symbol != ""]
+        successors = {symbol: [0] * len(states) for symbol in symbols}
+        for start, paths in nfa.transitions.items():
+            row = state_ids[start]
+            for symbol, ends in paths.items():
+                if symbol == "":
+                    continue
+                mask = 0
+                for end in ends:
+                    mask |= closures[state_ids[end]]
+                successors[symbol][row] = mask
+
+        final_mask = 0
+        for state in nfa.final_states:
+            final_mask |= 1 << state_ids[state]
+
+        return cls(
+            states,
+            symbols,
+            closures,
+            successors,
+            closures[state_ids[nfa.initial_state]],
+            final_mask,
+        )
+
+    @staticmethod
+    def _closure_of(start, epsilon_moves):
+        closure = 1 << start
+        frontier = closure
+        while frontier:
+            low = frontier & -frontier
+            frontier ^= low
+
+            new = epsilon_moves[low.bit_length() - 1] & ~closure
+            closure |= new
+            frontier |= new
+        return closure
+
+    ## Masks and state names ##
+    def encode(self, states):
+        mask = 0
+        for state in states:
+            mask |= 1 << self.state_ids[state]
+        return mask
+
+    def decode(self, mask):
+        active = list()
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            active.append(self.states[low.bit_length() - 1])
+        return frozenset(active)
+
+    ## Running ##
+
+    # One step of the simulation. Symbols outside the alphabet kill every
+    #   active state
+    def step(self, mask, symbol):
+        table = self.successors.get(symbol)
+        if table is None:
+            return 0
+
+        nxt = 0
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            nxt |= table[low.bit_length() - 1]
+        return nxt
+
+    def is_accepting(self, mask):
+        return mask & self.final_mask != 0
+
+    # Membership check: linear in the length of the input, and stops as soon as
+    #   no state is left alive
+    def accepts(self, input_string):
+        mask = self.initial
+        for symbol in input_string:
+            mask = self.step(mask, symbol)
+            if not mask:
+                return False
+        return self.is_accepting(mask)
+
+    # Full run, keeping the active set after every symbol so a renderer can
+    #   highlight all of the live states at each step. Starts from the
+    #   initial closure unless given another mask
+    def run(self, input_string, start=None):
+        mask = self.initial if start is None else start
+        history = [mask]
+        for symbol in input_string:
+            mask = self.step(mask, symbol)
+            history.append(mask)
+        return NFARun(self, history)
+
+
+class NFARun:
+    """The result of BitsetNFA.run: the active-state mask after each symbol"""
+
+    def __init__(self, nfa, history):
+        self.nfa = nfa
+        self.history = history
+
+    @property
+    def accepted(self):
+        return self.nfa.is_accepting(self.history[-1])
+
+    # The states alive after `step` symbols have been read (0 is the start)
+    def active_states(self, step=-1):
+        return self.nfa.decode(self.history[step])
+
+    def active_history(self):
+        return [self.nfa.decode(mask) for mask in self.history]
+
+    def __len__(self):
+        return len(self.history)
@@ -0,0 +1,255 @@
+import numpy as np
+
+from exceptions import UnsupportedSymbolException
+
+
+class CompiledDFA:
+    """A DFA flattened into an integer state x symbol transition table.
+
+    States and symbols are interned to integer ids in the order given. Two
+    extra ids are reserved: row `dead` is a sink that every missing
+    transition (partial DFAs) leads to, and column `unknown` is used for any
+    character that is not in the alphabet, which also leads to the sink.
+    Input is read one character at a time, so every symbol must be a single
+    character; the constructors raise UnsupportedSymbolException otherwise.
+    """
+
+    def __init__(self, states, symbols, table, initial, final_states):
+        self.states = list(states)
+        self.symbols = list(symbols)
+
+        self.state_ids = {state: i for i, state in enumerate(self.states)}
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        self.dead = len(self.states)
+        self.unknown = len(self.symbols)
+
+        self.table = table
+        self.initial = self.state_ids[initial]
+
+        self.accepting = np.zeros(len(self.states) + 1, dtype=bool)
+        for state in final_states:
+            self.accepting[self.state_ids[state]] = True
+
+        # Sorted code points of the single-character symbols, so whole batches
+        #   of input can be mapped to symbol ids with one searchsorted call
+        single = sorted(
+            (ord(symbol), i) for i, symbol in enumerate(self.symbols)
+            if isinstance(symbol, str) and len(symbol) == 1
+        )
+        self._codepoints = np.array([cp for cp, _ in single], dtype=np.uint32)
+        self._codepoint_ids = np.array([i for _, i in single], dtype=np.int64)
+
+        # Plain nested lists of the table, for stepping one symbol at a time
+        #   without paying for numpy scalar indexing
+        self._rows = None
+
+    ## Constructors ##
+    @classmethod
+    def from_dfa(cls, dfa, states=None, symbols=None):
+        if states is None:
+            states = sorted(dfa.states, key=str)
+        if symbols is None:
+            symbols = sorted(dfa.input_symbols, key=str)
+        _check_symbols(symbols)
+
+        state_ids = {state: i for i, state in enumerate(states)}
+        symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+
+        dead = len(states)
+        table = np.full((len(states) + 1, len(symbols) + 1), dead, dtype=np.int64)
+
+        for start, paths in dfa.transitions.items():
+            row = state_ids[start]
+            for symbol, end in paths.items():
+                table[row, symbol_ids[symbol]] = state_ids[end]
+
+        return cls(states, symbols, table, dfa.initial_state, dfa.final_states)
+
+    # From a BinaryDFA (see fa_binary). The mapped table is copied once into
+    #   the layout used here, with the dead row and unknown column added
+    @classmethod
+    def from_binary(cls, binary):
+        n, m = binary.n_states, binary.n_symbols
+        _check_symbols(binary.symbols)
+
+        table = np.full((n + 1, m + 1), n, dtype=np.int32)
+        table[:n, :m] = binary.table
+        table[table < 0] = n
+
+        states = binary.states
+        return cls(
+            states,
+            binary.symbols,
+            table,
+            states[binary.initial],
+            [states[i] for i in binary.final_ids.tolist()],
+        )
+
+    # Back to an automata-lib DFA, for anything that needs the whole object.
+    #   Missing transitions (cells leading to the dead row) make it partial
+    def to_dfa(self):
+        from automata.fa.dfa import DFA
+
+        transitions = dict()
+        partial = False
+        for state, row in zip(self.states, self.table[:self.dead, :self.unknown].tolist()):
+            paths = dict()
+            for symbol, end in zip(self.symbols, row):
+                if end == self.dead:
+                    partial = True
+                else:
+                    paths[symbol] = self.states[end]
+            transitions[state] = paths
+
+        return DFA(
+            states        = set(self.states),
+            input_symbols = set(self.symbols),
+            transitions   = transitions,
+            initial_state = self.states[self.initial],
+            final_states  = {
+                state for state, accepting in zip(self.states, self.accepting.tolist()) if accepting
+            },
+            allow_partial = partial,
+        )
+
+    ## Encoding ##
+    def encode(self, string):
+        return self.encode_many([string])[0]
+
+    # Maps the concatenation of all strings to symbol ids in one pass. Returns
+    #   the flat id array along with each string's start offset and length
+    def encode_many(self, strings):
+        strings = list(strings)
+        lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+        starts = np.zeros(len(strings), dtype=np.int64)
+        if len(strings) > 1:
+            np.cumsum(lengths[:-1], out=starts[1:])
+
+        codes = np.frombuffer("".join(strings).encode("utf-32-le"), dtype=np.uint32)
+        if len(self._codepoints) == 0:
+            return np.full(len(codes), self.unknown, dtype=np.int64), starts, lengths
+
+        pos = np.searchsorted(self._codepoints, codes)
+        np.minimum(pos, len(self._codepoints) - 1, out=pos)
+        found = self._codepoints[pos] == codes
+        ids = np.where(found, self._codepoint_ids[pos], self.unknown)
+
+        return ids, starts, lengths
+
+    ## Running ##
+    def run(self, string):
+        state = self.initial
+        for symbol in self.encode_many([string])[0]:
+            state = self.table[state, symbol]
+        return int(state)
+
+    # Advances every string one position at a time. Strings are processed
+    #   longest first, so the strings still running at position t are always
+    #   a prefix of the batch and each step is one fancy-indexed lookup
+    def run_ids(self, strings):
+        ids, starts, lengths = self.encode_many(strings)
+
+        order = np.argsort(-lengths, kind="stable")
+        sorted_lengths = lengths[order]
+        sorted_starts = starts[order]
+
+        current = np.full(len(lengths), self.initial, dtype=np.int64)
+        longest = int(sorted_lengths[0]) if len(sorted_lengths) > 0 else 0
+        live = np.searchsorted(-sorted_lengths, -np.arange(longest), side="left")
+
+        for t in range(longest):
+            k = live[t]
+            current[:k] = self.table[current[:k], ids[sorted_starts[:k] + t]]
+
+        finals = np.empty_like(current)
+        finals[order] = current
+        return finals
+
+    def run_many(self, strings):
+        finals = self.run_ids(strings)
+        accepted = self.accepting[finals]
+        final_states = [
+            self.states[i] if i != self.dead else None for i in finals.tolist()
+        ]
+        return accepted, final_states
+
+    def accepts(self, string):
+        return bool(self.accepting[self.run(string)])
+
+    # Reads the input once and records everything a scene needs to animate
+    #   the run: the state after each symbol, and the (state, symbol) table
+    #   cell each transition came from. Stops at the first symbol that has no
+    #   transition. Starts from the initial state unless given a state id
+    def trace(self, string, start=None):
+        if self._rows is None:
+            self._rows = self.table.tolist()
+
+        state = self.initial if start is None else start
+        states = [state]
+        cells = list()
+        stopped_at = None
+
+        for i, symbol in enumerate(string):
+            column = self.symbol_ids.get(symbol, self.unknown)
+            cells.append((state, column))
+
+            state = self._rows[state][column]
+            if state == self.dead:
+                stopped_at = i
+                break
+            states.append(state)
+
+        return DFATrace(self, states, cells, stopped_at)
+
+
+# Input is encoded character by character, so a longer symbol could never be
+#   read and would silently count as unknown. Refuse it up front instead
+def _check_symbols(symbols):
+    unsupported = [
+        symbol for symbol in symbols
+        if not (isinstance(symbol, str) and len(symbol) == 1)
+    ]
+    if unsupported:
+        raise UnsupportedSymbolException(
+            f"Only single-character symbols can be compiled, got {unsupported!r}"
+        )
+
+
+class DFATrace:
+    """A complete DFA run, computed before anything is drawn.
+
+    states holds the state names visited, starting with the initial state.
+    cells holds, for each symbol read, the 0-based (row, column) of the
+    transition table entry used, in the order the states and symbols were
+    compiled. The column is None for a symbol outside the alphabet.
+    """
+
+    def __init__(self, dfa, state_ids, cells, stopped_at):
+        self.states = [dfa.states[i] for i in state_ids]
+        self.cells = [
+            (row, column if column != dfa.unknown else None)
+            for row, column in cells
+        ]
+        self.symbols = [
+            dfa.symbols[column] if column is not None else None
+            for _, column in self.cells
+        ]
+
+        # Index of the symbol that had no transition, if the run fell off
+        self.stopped_at = stopped_at
+        self.accepted = stopped_at is None and bool(dfa.accepting[state_ids[-1]])
+
+    @property
+    def final_state(self):
+        return self.states[-1] if self.stopped_at is None else None
+
+    # (start, end, symbol) for every transition that was taken
+    def transitions(self):
+        return [
+            (self.states[i], self.states[i + 1], self.symbols[i])
+            for i in range(len(self.states) - 1)
+        ]
+
+    def __len__(self):
+        return len(self.cells)
@@ -0,0 +1,225 @@
+from exceptions import InvalidInputException
+
+_MOVES = {"L": -1, "R": 1, "N": 0}
+
+
+class CompiledTM:
+    """A deterministic Turing machine compiled into flat integer tables.
+
+    States and tape symbols are interned to small integers, so the tape is a
+    bytearray (one byte per cell) that grows in both directions, and one
+    step is a handful of list lookups. Nothing here touches automata-lib
+    configurations or manim, which makes it suitable for checking long runs
+    before deciding what to animate.
+    """
+
+    def __init__(self, states, symbols, blank, nexts, writes, moves, initial, final_states):
+        if len(symbols) > 256:
+            raise ValueError("CompiledTM supports at most 256 tape symbols")
+
+        self.states = list(states)
+        self.symbols = list(symbols)
+        self.state_ids = {state: i for i, state in enumerate(self.states)}
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        self.blank = self.symbol_ids[blank]
+
+        # Indexed by state * len(symbols) + symbol. A next state of -1 means
+        #   the transition is undefined
+        self.nexts = nexts
+        self.writes = writes
+        self.moves = moves
+
+        self.initial = self.state_ids[initial]
+        self.final = [state in final_states for state in self.states]
+
+    @classmethod
+    def from_dtm(cls, dtm, states=None):
+        return cls.from_parts(
+            states        = states if states is not None else sorted(dtm.states, key=str),
+            tape_symbols  = dtm.tape_symbols,
+            blank_symbol  = dtm.blank_symbol,
+            transitions   = dtm.transitions,
+            initial_state = dtm.initial_state,
+            final_states  = dtm.final_states,
+        )
+
+    @classmethod
+    def from_json(cls, rawJson):
+        return cls.from_parts(
+            states        = rawJson["states"],
+            tape_symbols  = rawJson["tape_symbols"],
+            blank_symbol  = rawJson.get("blank_symbol", "."),
+            transitions   = rawJson["transitions"],
+            initial_state = rawJson["initial_state"],
+            final_states  = set(rawJson["final_states"]),
+        )
+
+    @classmethod
+    def from_parts(cls, states, tape_symbols, blank_symbol, transitions, initial_state, final_states):
+        states = list(states)
+        symbols = sorted(set(tape_symbols) | {blank_symbol}, key=str)
+
+        state_ids = {state: i for i, state in enumerate(states)}
+        symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+
+        width = len(symbols)
+        nexts = [-1] * (len(states) * width)
+        writes = [0] * (len(states) * width)
+        moves = [0] * (len(states) * width)
+
+        for start, paths in transitions.items():
+            for symbol, (end, write, move) in paths.items():
+                index = state_ids[start] * width + symbol_ids[symbol]
+                nexts[index] = state_ids[end]
+                writes[index] = symbol_ids[write]
+                moves[index] = _MOVES[move]
+
+        return cls(states, symbols, blank_symbol, nexts, writes, moves, initial_state, set(final_states))
+
+    def encode(self, tape):
+        try:
+            return bytearray(self.symbol_ids[symbol] for symbol in tape)
+        except KeyError as e:
+            raise InvalidInputException(f"Symbol {e} is not in the tape alphabet")
+
+    def decode(self, cells):
+        return "".join(self.symbols[cell] for cell in cells)
+
+    # Runs until the machine halts or max_steps transitions have been taken.
+    #   A machine halts by reaching a final state (accept) or by having no
+    #   transition for its state and the symbol under the head (reject)
+    #
+    # Keyframes (snapshots of the configuration) are recorded at every
+    #   `every`-th step, and/or at steps that change state or reverse the
+    #   head's direction. The first and last configurations are always kept
+    #   when any keyframe option is set
+    #
+    # start (a state id) and head (a cell of tape) pick up a run partway
+    #   through, instead of from the initial state at the first cell
+    def run(self, tape="", max_steps=1_000_000, every=None, state_changes=False, reversals=False,
+            start=None, head=0):
+        cells = self.encode(tape)
+        if len(cells) <= head:
+            cells.extend(bytes([self.blank]) * (head + 1 - len(cells)))
+
+        # origin is the index in cells of the first input cell, so head
+        #   positions can be reported relative to the input
+        origin = 0
+        state = self.initial if start is None else start
+        steps = 0
+
+        nexts, writes, moves, final = self.nexts, self.writes, self.moves, self.final
+        width = len(self.symbols)
+        blank = bytes([self.blank])
+
+        tracing = bool(every) or state_changes or reversals
+        keyframes = list()
+        if tracing:
+            keyframes.append(TMKeyframe(self, 0, state, cells, head, origin))
+        last_move = 0
+
+        status = "budget"
+        while steps < max_steps:
+            if final[state]:
+                status = "accept"
+                break
+
+            index = state * width + cells[head]
+            nxt = nexts[index]
+            if nxt < 0:
+                status = "reject"
+                break
+
+            cells[head] = writes[index]
+            move = moves[index]
+            head += move
+            changed = nxt != state
+            state = nxt
+            steps += 1
+
+            # Grow the tape by doubling, so growth is amortized O(1) per step
+            if head < 0:
+                grow = len(cells)
+                cells[0:0] = blank * grow
+                head += grow
+                origin += grow
+            elif head == len(cells):
+                cells.extend(blank * len(cells))
+
+            if tracing:
+                reversed_ = move != 0 and last_move != 0 and move != last_move
+                if move != 0:
+                    last_move = move
+
+                if (every and steps % every == 0) or (state_changes and changed) or (reversals and reversed_):
+                    keyframes.append(TMKeyframe(self, steps, state, cells, head, origin))
+        else:
+            if final[state]:
+                status = "accept"
+
+        if tracing and keyframes[-1].step != steps:
+            keyframes.append(TMKeyframe(self, steps, state, cells, head, origin))
+
+        return TMResult(self, state, steps, status, cells, head, origin, keyframes)
+
+
+# Trims blanks off both ends of a tape. Returns the remaining symbols and the
+#   position (relative to the first input cell) of the first one
+def _trim_tape(tm, cells, origin):
+    start, end = 0, len(cells)
+    while start < end and cells[start] == tm.blank:
+        start += 1
+    while end > start and cells[end - 1] == tm.blank:
+        end -= 1
+    return tm.decode(cells[start:end]), start - origin
+
+
+class TMKeyframe:
+    """A snapshot of a CompiledTM configuration partway through a run"""
+
+    def __init__(self, tm, step, state, cells, head, origin):
+        self.step = step
+        self.state = tm.states[state]
+        self.head = head - origin
+        self.tape, self.tape_start = _trim_tape(tm, cells, origin)
+
+    def __repr__(self):
+        return f"TMKeyframe(step {self.step}, state {self.state}, head {self.head})"
+
+
+class TMResult:
+    """Where a CompiledTM run ended: state, step count, and the final tape"""
+
+    def __init__(self, tm, state, steps, status, cells, head, origin, keyframes=None):
+        self.tm = tm
+        self.state = tm.states[state]
+        self.steps = steps
+        self.status = status
+        self.keyframes = keyframes if keyframes is not None else list()
+
+        self._cells = cells
+        self._origin = origin
+
+        # Head position relative to the first cell of the input
+        self.head = head - origin
+
+    @property
+    def halted(self):
+        return self.status != "budget"
+
+    @property
+    def accepted(self):
+        return self.status == "accept"
+
+    # The visited part of the tape with blanks trimmed from both ends, along
+    #   with the position (relative to the input) of its first cell
+    def tape_span(self):
+        return _trim_tape(self.tm, self._cells, self._origin)
+
+    @property
+    def tape(self):
+        return self.tape_span()[0]
+
+    def __repr__(self):
+        return f"TMResult({self.status} in state {self.state} after {self.steps} steps)"
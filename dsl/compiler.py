@@ -0,0 +1,156 @@
+import os
+import sys
+
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from dsl.interpreter import Load, Render, parse, join, join_all, machine_key
+from batch_render import output_path, run_batch
+
+from dsl.dsl_errors import DSL_Error
+
+# Scripts are compiled into a Plan before anything runs, so the whole script
+#   can be seen at once: which LOADs are never used and what gets rendered.
+#   A Session runs plans against an environment that outlives any one
+#   script, redoing only what changed
+
+
+class Plan:
+    """A parsed script, with its loads and renders worked out ahead of time"""
+
+    def __init__(self, statements):
+        self.statements = statements
+
+        self.loads = [s for s in statements if isinstance(s, Load)]
+        self.renders = [s for s in statements if isinstance(s, Render)]
+
+        # A LOAD whose variable is loaded again before anything uses it is
+        #   dead. Its file is only checked, not built
+        self.dead = set()
+        pending = dict()
+        for statement in statements:
+            for varname in statement.uses():
+                pending.pop(varname, None)
+            if isinstance(statement, Load):
+                if statement.varname in pending:
+                    self.dead.add(id(pending[statement.varname]))
+                pending[statement.varname] = statement
+
+    def is_dead(self, statement):
+        return id(statement) in self.dead
+
+
+def compile_script(lines):
+    return Plan(parse(lines))
+
+
+class Session:
+    """An environment that lasts across scripts, as in the REPL.
+
+    Running a script again reloads only the files that changed since they
+    were loaded, and re-renders only the jobs whose machine changed (or
+    whose video has gone missing). RENDERs are collected while the script
+    runs and rendered together at the end, across worker processes.
+    """
+
+    def __init__(self, out_dir="renders", workers=None):
+        self.env = dict()
+        self.out_dir = out_dir
+        self.workers = workers
+
+        # (machine path, input, quality) -> source key of the machine file
+        #   when that video was rendered
+        self._rendered = dict()
+
+    def run_file(self, filename):
+        with open(filename, "r") as f:
+            return self.run_script(f.readlines())
+
+    def run_script(self, lines):
+        return self.execute(compile_script(lines))
+
+    def execute(self, plan):
+        jobs = list()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for statement in plan.statements:
+                if plan.is_dead(statement):
+                    statement.check()
+                    continue
+
+                for varname in statement.uses():
+                    join(self.env, varname)
+
+                if isinstance(statement, Render):
+                    jobs.append((statement.job(self.env), self.env[statement.varname].source_key))
+                elif isinstance(statement, Load) and self._unchanged(statement):
+                    continue
+                else:
+                    statement.execute(self.env, pool)
+
+            join_all(self.env)
+
+        self.render(jobs)
+        return self.env
+
+    # Whether the variable already holds the machine this LOAD would build
+    def _unchanged(self, load):
+        machine = self.env.get(load.varname)
+        if machine is None or isinstance(machine, Future):
+            return False
+
+        try:
+            key, _ = machine_key(load.filename)
+        except OSError:
+            return False
+        return getattr(machine, "source_key", None) == key
+
+    # Renders (job, source key) pairs as one batch, skipping repeats within
+    #   the batch and videos already rendered from the same file contents.
+    #   Jobs are told apart by what they render, not by where the video goes
+    def render(self, jobs):
+        todo = dict()
+        keys = dict()
+        for job, key in jobs:
+            job_key = (os.path.realpath(job["machine"]), job["input"], job["quality"])
+            if job_key in todo:
+                continue
+
+            target = output_path(job, self.out_dir)
+            if self._rendered.get(job_key) == key and os.path.exists(target):
+                print(f"Unchanged, keeping {target}")
+                continue
+
+            todo[job_key] = job
+            keys[job_key] = key
+
+        if not todo:
+            return list()
+
+        results = run_batch(list(todo.values()), self.out_dir, self.workers)
+        for job_key, (job, target, seconds, error) in zip(todo, results):
+            if error is None:
+                self._rendered[job_key] = keys[job_key]
+            else:
+                print(f"Could not render {target}: {error}", file=sys.stderr)
+        return results
+
+    # Reads commands until EOF or EXIT. RUN <file> runs (or re-runs) a whole
+    #   script in this session
+    def repl(self):
+        while True:
+            try:
+                line = input("fsmipr> ").strip()
+            except EOFError:
+                break
+
+            if line in ("EXIT", "QUIT"):
+                break
+
+            try:
+                if line.startswith("RUN "):
+                    self.run_file(Path(line[4:].strip().strip('\"')))
+                else:
+                    self.run_script([line])
+            except (DSL_Error, OSError) as e:
+                print(f"{type(e).__name__}: {e}", file=sys.stderr)
@@ -26,3 +26,9 @@ class DoesNotExistError(DSL_Error):
     """Referenced an object that does not exist in the context"""
 
     pass
+
+
+class NotRenderableError(DSL_Error):
+    """The object cannot be rendered"""
+
+    pass
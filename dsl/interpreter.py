@@ -1,81 +1,303 @@
-from ...fa_manager import DFA_Manager, NFA_Manager, TM_Manager
-import json
+import os
 import sys
+import copy
+import json
+import shlex
+import hashlib
+import threading
 
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from fa_manager import DFA_Manager, NFA_Manager, TM_Manager
+from batch_render import DEFAULT_QUALITY, render_job
 
-from dsl_errors import \
+from dsl.dsl_errors import \
+    DoesNotExistError, \
     MalformedCommandError, \
+    NotRenderableError, \
     TypeNotRecognizedError, \
     TypeNotSpecifiedError
 
-# NOTE: This shouldn't run ridiculously slow, but a potential speedup
-#   I see is running each LOAD instruction concurrently.
+# A script is parsed in full before anything runs. Each LOAD is handed to a
+#   thread pool as soon as it is reached, and its variable holds the Future
+#   until a later statement uses it, so independent LOADs read and parse
+#   their files at the same time.
 
+## Statements ##
 
-def read_file(filename):
-    with open(filename, "r") as f:
-        lines = f.readlines()
+class Load:
+    def __init__(self, filename, varname, line_no=None):
+        self.filename = filename
+        self.varname = varname
+        self.line_no = line_no
 
-    for line in lines:
-        triageLine(line)
+    # Variables that must be loaded before this statement runs
+    def uses(self):
+        return ()
 
+    def execute(self, env, pool=None):
+        if self.varname in env:
+            print(
+                f"Overwrote existing FA at {self.varname}",
+                file=sys.stderr,
+            )
 
-def load_from_file(filename, varname, env):
-    with open(filename, "r") as f:
-        rawJson = json.loads(f.read())
+        if pool is None:
+            env[self.varname] = load_machine(self.filename)
+            _report(env[self.varname], self.filename, self.varname)
+        else:
+            env[self.varname] = pool.submit(load_machine, self.filename)
+            env[self.varname].filename = self.filename
+
+    # For a LOAD whose machine is never used: its file is still read and
+    #   checked, so a bad one is reported, but nothing is built
+    def check(self):
+        check_machine(self.filename)
+
+
+class Render:
+    def __init__(self, varname, input_string="", quality=DEFAULT_QUALITY, line_no=None):
+        self.varname = varname
+        self.input_string = input_string
+        self.quality = quality
+        self.line_no = line_no
+
+    def uses(self):
+        return (self.varname,)
+
+    # The batch_render job for this command. Only DFAs can be rendered so far
+    def job(self, env):
+        machine = env.get(self.varname)
+        if machine is None:
+            raise DoesNotExistError(f"Line {self.line_no}: nothing is loaded as {self.varname}")
+        if not isinstance(machine, DFA_Manager):
+            raise NotRenderableError(
+                f"Line {self.line_no}: {self.varname} is not a DFA, and only DFAs can be rendered"
+            )
+
+        return {
+            "machine": machine.source_file,
+            "input": self.input_string,
+            "quality": self.quality,
+        }
+
+    # Renders right away, in this process. A Session collects RENDERs instead
+    #   and renders them all at once
+    def execute(self, env, pool=None, out_dir="renders"):
+        job, target, seconds, error = render_job(self.job(env), out_dir)
+        if error is not None:
+            print(f"Could not render {self.varname}: {error}", file=sys.stderr)
+        else:
+            print(f"Rendered {self.varname} to {target} in {seconds:.1f}s")
+
+
+# Any command the interpreter does not run yet. Its arguments are taken to be
+#   variable names, so pending LOADs of them are still joined in order
+class Command:
+    def __init__(self, command, args, line_no=None):
+        self.command = command
+        self.args = args
+        self.line_no = line_no
+
+    def uses(self):
+        return self.args
+
+    def execute(self, env, pool=None):
+        pass
 
+
+def parse_line(line, line_no=None):
+    line = line.strip()
+    if line == "":
+        return None
+
+    tokens = line.split(" ")
+    if tokens[0] == "LOAD":
+        if len(tokens) < 4 or tokens[-2] != "AS":
+            raise MalformedCommandError(f"Line {line_no}: {line}")
+
+        filename = " ".join(tokens[1:-2])
+        filename = filename.removeprefix('\"').removesuffix('\"')
+
+        return Load(filename, tokens[-1], line_no)
+
+    if tokens[0] == "RENDER":
+        # RENDER <obj_name> [ON "<input>"] [AT <quality>]
+        tokens = shlex.split(line)
+        options = dict(zip(tokens[2::2], tokens[3::2]))
+        if len(tokens) % 2 != 0 or not set(options) <= {"ON", "AT"}:
+            raise MalformedCommandError(f"Line {line_no}: {line}")
+
+        return Render(tokens[1], options.get("ON", ""), options.get("AT", DEFAULT_QUALITY), line_no)
+
+    return Command(tokens[0], tokens[1:], line_no)
+
+
+def parse(lines):
+    statements = list()
+    for line_no, line in enumerate(lines, start=1):
+        statement = parse_line(line, line_no)
+        if statement is not None:
+            statements.append(statement)
+    return statements
+
+## Loading ##
+
+# (resolved path, mtime, sha256 of the contents) -> the manager first built
+#   from that file, as a Future. Editing a file changes its key, so stale
+#   machines are never handed out
+_machine_cache = dict()
+_cache_lock = threading.Lock()
+
+
+def _manager_class(rawJson):
     if "type" not in rawJson:
         raise TypeNotSpecifiedError()
 
     if rawJson["type"].lower() == "dfa":
-        created = DFA_Manager.from_json(rawJson)
+        return DFA_Manager
     elif rawJson["type"].lower() == "nfa":
-        created = NFA_Manager.from_json(rawJson)
+        return NFA_Manager
     elif rawJson["type"].lower() == "tm":
-        created = TM_Manager.from_json(rawJson)
+        return TM_Manager
     else:
         raise TypeNotRecognizedError(
             f'JSON claims type {rawJson["type"]}, which is not a valid type.'
         )
 
-    if varname in env:
-        print(
-            f"Overwrote existing FA at {varname}",
-            file=sys.stderr,
-        )
-    env[varname] = created
 
+def _build_machine(rawJson):
+    return _manager_class(rawJson).from_json(rawJson)
 
-def triageLine(line, env):
-    if line.startswith("LOAD "):
-        tokens = line.split(" ")
 
-        if tokens[-2] != "AS":
-            raise MalformedCommandError()
+# The cache keeps a manager nobody has touched. Each LOAD gets its own shallow
+#   copy with a fresh input cursor: the automaton and the unbuilt graph spec
+#   are shared, but stepping one variable never moves another. The spec
+#   itself is never changed, since GraphSpec.build works on a copy of it
+def _fresh(manager, key):
+    machine = copy.copy(manager)
+    machine.input_string = manager.input_string
 
-        filename = " ".join(tokens[1:-2])
-        filename.removeprefix('\"')
-        filename.removesuffix('\"')
+    # Where the machine came from, for rendering and for noticing edits
+    machine.source_file = key[0]
+    machine.source_key = key
+    return machine
+
+
+def machine_key(filename):
+    path = os.path.realpath(filename)
+    with open(path, "rb") as f:
+        contents = f.read()
+    return (path, os.stat(path).st_mtime_ns, hashlib.sha256(contents).hexdigest()), contents
+
+
+# The cache holds a Future per file, so a file LOADed by several threads at
+#   once is still only parsed by the first of them
+def load_machine(filename):
+    key, contents = machine_key(filename)
+
+    with _cache_lock:
+        entry = _machine_cache.get(key)
+        building = entry is None
+        if building:
+            entry = Future()
+            _machine_cache[key] = entry
+
+    if building:
+        try:
+            entry.set_result(_build_machine(json.loads(contents)))
+        # BaseException, since the managers exit on bad json. Anyone waiting
+        #   on this entry must hear about it either way
+        except BaseException as e:
+            with _cache_lock:
+                del _machine_cache[key]
+            entry.set_exception(e)
+            raise
+
+    return _fresh(entry.result(), key)
+
+
+# Reads a file and raises whatever load_machine would for a file that is
+#   missing, not JSON or of no known type, without building the machine
+def check_machine(filename):
+    _, contents = machine_key(filename)
+    _manager_class(json.loads(contents))
+
+
+def clear_cache():
+    with _cache_lock:
+        _machine_cache.clear()
+
+
+def _report(machine, filename, varname):
+    kind = type(machine).__name__.removesuffix("_Manager")
+    print(f"Loaded the {kind} contained in {filename} as {varname}")
+
+
+def load_from_file(filename, varname, env):
+    Load(filename, varname).execute(env)
+
+## Running ##
 
-        varname = tokens[-1]
+# Waits for the LOAD behind varname, if it is still running. A failed LOAD
+#   raises its error here, at the first statement that needed it
+def join(env, varname):
+    value = env.get(varname)
+    if isinstance(value, Future):
+        env[varname] = value.result()
+        _report(env[varname], value.filename, varname)
+    return env.get(varname)
 
-        load_from_file(filename, varname, env)
+
+def join_all(env):
+    for varname in list(env):
+        join(env, varname)
+
+
+def run(statements, env, workers=None):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for statement in statements:
+            for varname in statement.uses():
+                join(env, varname)
+            statement.execute(env, pool)
+
+        join_all(env)
+    return env
+
+
+def read_file(filename, env=None):
+    if env is None:
+        env = dict()
+
+    with open(filename, "r") as f:
+        lines = f.readlines()
+
+    return run(parse(lines), env)
+
+
+def triageLine(line, env):
+    statement = parse_line(line)
+    if statement is None:
+        return
+
+    for varname in statement.uses():
+        join(env, varname)
+    statement.execute(env)
 
 
 if __name__ == "__main__":
+    from dsl.compiler import Session
+
+    session = Session()
     if len(sys.argv) == 1:
-        infile = Path(input("Input file path: "))
+        session.repl()
     elif len(sys.argv) == 2:
-        infile = Path(sys.argv[1])
+        session.run_file(Path(sys.argv[1]))
+        print(session.env)
     else:
         print(
-            "Usage: interpreter.py [infile]",
+            "Usage: python -m dsl.interpreter [infile]",
             file=sys.stderr
         )
         exit(1)
-
-    env = dict()
-
-    triageLine("LOAD \"hell yeah brother\" AS hyb", env)
-    print(env)
@@ -0,0 +1,92 @@
+# Transitions grouped by the edge they are drawn on. An automaton has one
+#   transition per (state, symbol), but the graph has one arrow per pair of
+#   states, labelled with every symbol that takes it. Everything that turns
+#   transitions into graph edges goes through here, so each edge is made
+#   once and its label is joined once, in a single pass over the transitions
+
+SEPARATOR = ", "
+EPSILON = "\\epsilon"
+
+
+# How one symbol is written on an edge. The empty string is an epsilon move
+def symbol_label(symbol):
+    if symbol == "":
+        return EPSILON
+    return str(symbol)
+
+
+# The symbols an edge label stands for, undoing symbol_label and the join
+def label_symbols(label, separator=SEPARATOR):
+    return ["" if symbol == EPSILON else symbol for symbol in label.split(separator)]
+
+
+class EdgeIndex:
+    """The symbols on each edge (start, end), in the order they were added.
+
+    Edges keep the order they were first seen in, so the same transitions
+    always give the same graph.
+    """
+
+    def __init__(self, separator=SEPARATOR):
+        self.separator = separator
+        self._symbols = dict()
+
+    # Symbols are kept in a dict, so one added twice is only written once
+    def add(self, start, symbol, end):
+        self._symbols.setdefault((start, end), dict())[symbol] = None
+
+    # transitions is {start: {symbol: end}}, or {start: {symbol: ends}} if
+    #   nondeterministic. Unordered collections of ends (as in automata's
+    #   NFAs) are sorted by name, so the edge order survives hash randomization
+    @classmethod
+    def from_transitions(cls, transitions, nondeterministic=False):
+        from layout_cache import canonical_name
+
+        index = cls()
+        for start, paths in transitions.items():
+            for symbol, ends in paths.items():
+                if not nondeterministic:
+                    index.add(start, symbol, ends)
+                    continue
+
+                if isinstance(ends, (set, frozenset)):
+                    ends = sorted(ends, key=canonical_name)
+                for end in ends:
+                    index.add(start, symbol, end)
+        return index
+
+    # Transitions as written in fa_vault, where an end is one state name or
+    #   a list of them
+    @classmethod
+    def from_json(cls, rawJson):
+        index = cls()
+        for start, paths in rawJson["transitions"].items():
+            for symbol, ends in paths.items():
+                if isinstance(ends, list):
+                    for end in ends:
+                        index.add(start, symbol, end)
+                else:
+                    index.add(start, symbol, ends)
+        return index
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __contains__(self, edge):
+        return edge in self._symbols
+
+    def edges(self):
+        return list(self._symbols)
+
+    def symbols(self, start, end):
+        return list(self._symbols[(start, end)])
+
+    def label(self, start, end):
+        return self.separator.join(symbol_label(symbol) for symbol in self._symbols[(start, end)])
+
+    def edge_config(self):
+        return {edge: {"label": self.label(*edge)} for edge in self._symbols}
+
+    # The (edges, edge_config) pair LabeledEdgeDiGraph is built from
+    def mobj_edges(self):
+        return self.edges(), self.edge_config()
@@ -0,0 +1,149 @@
+from collections import deque
+
+# Comparisons between two DFAs, worked out on the product automaton but only
+#   over the pairs of states reachable from the pair of start states. Missing
+#   transitions of partial DFAs (and symbols outside one of the alphabets)
+#   lead to None, a dead state shared by both sides, so nothing is completed
+#   up front
+
+
+class Comparison:
+    """The outcome of comparing two DFAs.
+
+    holds is True when the relation (equivalence or inclusion) holds.
+    Otherwise counterexample is a shortest string on which the two machines
+    disagree, and left_accepts says which of them accepts it.
+    """
+
+    def __init__(self, counterexample=None, left_accepts=None):
+        self.holds = counterexample is None
+        self.counterexample = counterexample
+        self.left_accepts = left_accepts
+
+    def __bool__(self):
+        return self.holds
+
+    def __repr__(self):
+        if self.holds:
+            return "Comparison(holds)"
+        return f"Comparison(fails on '{self.counterexample}')"
+
+
+def _step(dfa, state, symbol):
+    if state is None:
+        return None
+    return dfa.transitions.get(state, dict()).get(symbol)
+
+
+def _accepts(dfa, state):
+    return state is not None and state in dfa.final_states
+
+
+def _symbols(left, right):
+    return sorted(set(left.input_symbols) | set(right.input_symbols), key=str)
+
+
+# Breadth first over the reachable product, so the first pair that fails is
+#   reached by a shortest string. That string is rebuilt from parent pointers
+def shortest_counterexample(left, right, fails):
+    symbols = _symbols(left, right)
+    start = (left.initial_state, right.initial_state)
+
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        pair = queue.popleft()
+        if fails(_accepts(left, pair[0]), _accepts(right, pair[1])):
+            symbols_read = list()
+            while parents[pair] is not None:
+                pair, symbol = parents[pair]
+                symbols_read.append(symbol)
+            return "".join(reversed(symbols_read))
+
+        for symbol in symbols:
+            nxt = (_step(left, pair[0], symbol), _step(right, pair[1], symbol))
+            # Both sides dead: nothing past here can tell them apart
+            if nxt == (None, None) or nxt in parents:
+                continue
+            parents[nxt] = (pair, symbol)
+            queue.append(nxt)
+
+    return None
+
+
+def _differ(left_accepts, right_accepts):
+    return left_accepts != right_accepts
+
+
+def _escapes(left_accepts, right_accepts):
+    return left_accepts and not right_accepts
+
+
+# Hopcroft-Karp: merge the start states, then keep merging the successors of
+#   merged states with a union-find. The DFAs are equivalent exactly when no
+#   class ends up mixing accepting and rejecting states. Near-linear in the
+#   number of reachable states. Only on failure is the product searched again
+#   for the shortest counterexample
+def check_equivalence(left, right):
+    symbols = _symbols(left, right)
+
+    # States are tagged with their side, so the two DFAs may share names
+    parent = dict()
+    size = dict()
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        a, b = find(a), find(b)
+        if a == b:
+            return False
+        if size.get(a, 1) < size.get(b, 1):
+            a, b = b, a
+        parent[b] = a
+        size[a] = size.get(a, 1) + size.get(b, 1)
+        return True
+
+    def tagged(side, state):
+        return None if state is None else (side, state)
+
+    start = (left.initial_state, right.initial_state)
+    union(tagged(0, start[0]), tagged(1, start[1]))
+    pending = [start]
+
+    equivalent = True
+    while pending and equivalent:
+        p, q = pending.pop()
+        if _accepts(left, p) != _accepts(right, q):
+            equivalent = False
+            break
+
+        for symbol in symbols:
+            p_next, q_next = _step(left, p, symbol), _step(right, q, symbol)
+            if union(tagged(0, p_next), tagged(1, q_next)):
+                pending.append((p_next, q_next))
+
+    if equivalent:
+        return Comparison()
+
+    counterexample = shortest_counterexample(left, right, _differ)
+    return Comparison(counterexample, _accepts_string(left, counterexample))
+
+
+# Whether every string left accepts is accepted by right as well
+def check_inclusion(left, right):
+    counterexample = shortest_counterexample(left, right, _escapes)
+    if counterexample is None:
+        return Comparison()
+    return Comparison(counterexample, True)
+
+
+def _accepts_string(dfa, string):
+    state = dfa.initial_state
+    for symbol in string:
+        state = _step(dfa, state, symbol)
+    return _accepts(dfa, state)
@@ -14,3 +14,21 @@ class InvalidInputException(FSMIPR_Exception):
     """There is not a defined transition for the given input at the current state"""
 
     pass
+
+
+class NondeterminismException(FSMIPR_Exception):
+    """The requested next state is not one the nondeterministic choice allows"""
+
+    pass
+
+
+class StateBudgetExceeded(FSMIPR_Exception):
+    """A construction needed more states than it was allowed to build"""
+
+    pass
+
+
+class UnsupportedSymbolException(FSMIPR_Exception):
+    """The automaton uses a symbol the compiled form cannot represent"""
+
+    pass
@@ -0,0 +1,237 @@
+import sys
+import mmap
+import json
+import struct
+
+import numpy as np
+
+# A compact file format for DFAs too big for JSON (.fsmb). Little-endian:
+#
+#   header      magic "FSMB", version, flags, state count, symbol count,
+#               initial state id, final state count, then the byte offset
+#               of each section below
+#   states      (count + 1) uint32 offsets into a UTF-8 blob of the names
+#   symbols     same layout as states
+#   finals      uint32 state ids
+#   table       int32 [state][symbol] -> next state id, -1 if undefined
+#
+# Every section starts on an 8 byte boundary, so the table can be used
+#   straight out of an mmap without copying it
+
+MAGIC = b"FSMB"
+VERSION = 1
+EXTENSION = ".fsmb"
+
+FLAG_PARTIAL = 1
+
+_HEADER = struct.Struct("<4sHHIIIIQQQQ")
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _string_table(strings):
+    blobs = [str(string).encode("utf-8") for string in strings]
+    offsets = np.zeros(len(blobs) + 1, dtype="<u4")
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+    return offsets.tobytes() + b"".join(blobs)
+
+
+def dump_binary(rawJson, filename):
+    if rawJson.get("type", "dfa").lower() != "dfa":
+        raise ValueError(f"Only DFAs can be stored in the binary format, not {rawJson['type']}")
+
+    states = list(rawJson["states"])
+    symbols = list(rawJson["input_symbols"])
+    state_ids = {state: i for i, state in enumerate(states)}
+    symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+
+    table = np.full((len(states), len(symbols)), -1, dtype="<i4")
+    for start, paths in rawJson["transitions"].items():
+        row = state_ids[start]
+        for symbol, end in paths.items():
+            table[row, symbol_ids[symbol]] = state_ids[end]
+
+    finals = np.array([state_ids[state] for state in rawJson["final_states"]], dtype="<u4")
+
+    sections = [_string_table(states), _string_table(symbols), finals.tobytes(), table.tobytes()]
+    offsets = list()
+    position = _align(_HEADER.size)
+    for section in sections:
+        offsets.append(position)
+        position = _align(position + len(section))
+
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        FLAG_PARTIAL if rawJson.get("allow_partial", False) else 0,
+        len(states),
+        len(symbols),
+        state_ids[rawJson["initial_state"]],
+        len(finals),
+        *offsets,
+    )
+
+    with open(filename, "wb") as f:
+        f.write(header)
+        for offset, section in zip(offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+
+
+class BinaryDFA:
+    """A DFA read from a .fsmb file through a read-only mmap.
+
+    Nothing is copied on open: table is a numpy view of the mapped file, and
+    state and symbol names are decoded only when asked for. Stepping one
+    symbol at a time goes through a memoryview of the same bytes.
+    """
+
+    def __init__(self, filename):
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic, version, flags,
+            self.n_states, self.n_symbols, self.initial, n_finals,
+            states_at, symbols_at, finals_at, table_at,
+        ) = _HEADER.unpack_from(self._mmap, 0)
+
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not an automaton in the binary format")
+        if version != VERSION:
+            raise ValueError(f"{filename} is binary format version {version}, expected {VERSION}")
+
+        self.allow_partial = bool(flags & FLAG_PARTIAL)
+
+        self._state_offsets = np.frombuffer(self._mmap, dtype="<u4", count=self.n_states + 1, offset=states_at)
+        self._states_blob = states_at + 4 * (self.n_states + 1)
+        self._symbol_offsets = np.frombuffer(self._mmap, dtype="<u4", count=self.n_symbols + 1, offset=symbols_at)
+        self._symbols_blob = symbols_at + 4 * (self.n_symbols + 1)
+
+        self.final_ids = np.frombuffer(self._mmap, dtype="<u4", count=n_finals, offset=finals_at)
+
+        cells = self.n_states * self.n_symbols
+        self.table = np.frombuffer(self._mmap, dtype="<i4", count=cells, offset=table_at) \
+            .reshape(self.n_states, self.n_symbols)
+        self._cells = memoryview(self._mmap)[table_at:table_at + 4 * cells].cast("i")
+
+        self._symbol_ids = None
+        self._final_set = None
+
+    @classmethod
+    def open(cls, filename):
+        return cls(filename)
+
+    # The numpy views must go before the mmap can close, so a table still
+    #   held by the caller keeps the file open (mmap raises BufferError)
+    def close(self):
+        self._cells.release()
+        self._cells = self.table = self.final_ids = None
+        self._state_offsets = self._symbol_offsets = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    ## Names ##
+    def _decode(self, offsets, blob, i):
+        return self._mmap[blob + int(offsets[i]):blob + int(offsets[i + 1])].decode("utf-8")
+
+    def state_name(self, i):
+        return self._decode(self._state_offsets, self._states_blob, i)
+
+    def symbol_name(self, i):
+        return self._decode(self._symbol_offsets, self._symbols_blob, i)
+
+    @property
+    def states(self):
+        return [self.state_name(i) for i in range(self.n_states)]
+
+    @property
+    def symbols(self):
+        return [self.symbol_name(i) for i in range(self.n_symbols)]
+
+    ## Running, straight off the mapped table ##
+    def step(self, state, symbol):
+        if self._symbol_ids is None:
+            self._symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        column = self._symbol_ids.get(symbol)
+        if column is None:
+            return -1
+        return self._cells[state * self.n_symbols + column]
+
+    def accepts(self, string):
+        if self._final_set is None:
+            self._final_set = set(self.final_ids.tolist())
+
+        state = self.initial
+        for symbol in string:
+            state = self.step(state, symbol)
+            if state < 0:
+                return False
+        return state in self._final_set
+
+    ## Conversion ##
+
+    # The same machine in the JSON schema used by fa_vault
+    def to_json(self):
+        states = self.states
+        symbols = self.symbols
+
+        transitions = dict()
+        for i, row in enumerate(self.table.tolist()):
+            transitions[states[i]] = {
+                symbols[j]: states[end] for j, end in enumerate(row) if end >= 0
+            }
+
+        rawJson = {
+            "type": "dfa",
+            "states": states,
+            "input_symbols": symbols,
+            "transitions": transitions,
+            "initial_state": states[self.initial],
+            "final_states": [states[i] for i in self.final_ids.tolist()],
+        }
+        if self.allow_partial:
+            rawJson["allow_partial"] = True
+        return rawJson
+
+
+def is_binary(filename):
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+# Reads an automaton in either format, as a dict in the JSON schema. Entry
+#   points use this so they take .fsmb files as well as .json
+def read_automaton(filename):
+    if is_binary(filename):
+        with BinaryDFA(filename) as binary:
+            return binary.to_json()
+
+    with open(filename, "r") as f:
+        return json.loads(f.read())
+
+
+def main(args):
+    if len(args) == 3:
+        infile, outfile = args[1], args[2]
+    else:
+        print(f"Usage: python fa_binary.py <in.json|in{EXTENSION}> <out{EXTENSION}|out.json>")
+        exit(code=2)
+
+    rawJson = read_automaton(infile)
+    if outfile.endswith(EXTENSION):
+        dump_binary(rawJson, outfile)
+    else:
+        with open(outfile, "w") as f:
+            json.dump(rawJson, f, indent=4)
+
+if __name__ == "__main__":
+    main(sys.argv)
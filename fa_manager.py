@@ -1,22 +1,44 @@
 import sys
-import json
 import copy
+import json
+
+import numpy as np
 
 from abc import ABC, abstractmethod
 
 from automata.fa.dfa import DFA
 from automata.fa.nfa import NFA
-from automata.pda.pda import PDA
 from automata.tm.dtm import DTM
-from automata.tm.tm import TMStateT
 from automata.tm.configuration import TMConfiguration
 from automata.tm.tape import TMTape
 
-from labeledEdgeDiGraph import LabeledEdgeDiGraph
-from turingTape import TuringTape
-from exceptions import EmptyInputException, InvalidInputException
-
-from manim import UP, DOWN, LEFT, RIGHT, VGroup, FadeTransform
+from bitset_nfa import BitsetNFA
+from lazy_dfa import LazyDFA
+from minimizer import Minimizer
+from subset_construction import SubsetConstruction
+from equivalence import check_equivalence, check_inclusion
+from compiled_tm import CompiledTM
+from input_cursor import InputCursor
+from edge_index import EdgeIndex, label_symbols
+from exceptions import EmptyInputException, InvalidInputException, NondeterminismException, \
+    UnsupportedSymbolException
+
+# This module is the core layer: loading, stepping and tracing machines. It
+#   must not import manim (or anything that does) at module level, so that
+#   headless scripts start quickly. Everything that draws imports manim
+#   inside the method that needs it, the first time a mobject is asked for
+
+# The arguments for a LabeledEdgeDiGraph that has not been built yet
+class GraphSpec:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    # Every build gets its own copy of the arguments, so a spec shared between
+    #   managers (see dsl/interpreter.py) builds the same graph each time
+    def build(self):
+        from labeledEdgeDiGraph import LabeledEdgeDiGraph
+
+        return LabeledEdgeDiGraph(**copy.deepcopy(self.kwargs))
 
 class Automaton_Manager(ABC):
     @abstractmethod
@@ -39,17 +61,88 @@ class Automaton_Manager(ABC):
     def next(self):
         pass
 
+    # Input is read through a cursor, so stepping is O(1) and never copies the
+    #   input. Assigning a string, iterable or open text stream restarts it.
+    #   Reading this back gives the unread part (reading in the rest of a stream)
+    @property
+    def input_string(self):
+        return self.cursor.remaining()
+
+    @input_string.setter
+    def input_string(self, source):
+        self.cursor = InputCursor(source)
+
+    # Managers can be handed a GraphSpec instead of a mobject. The graph is then
+    #   only built (and manim only imported) when something first reads mobj
+    #   A spec may also be a function that returns one, when even working out
+    #   the graph's arguments is worth putting off
+    @property
+    def mobj(self):
+        if self._mobj is None and self._mobj_spec is not None:
+            spec, self._mobj_spec = self._mobj_spec, None
+            if callable(spec):
+                spec = spec()
+            self._mobj = self._build_mobj(spec)
+        return self._mobj
+
+    @mobj.setter
+    def mobj(self, mobj):
+        if isinstance(mobj, GraphSpec) or callable(mobj):
+            self._mobj, self._mobj_spec = None, mobj
+        else:
+            self._mobj, self._mobj_spec = mobj, None
+
+    def _build_mobj(self, spec):
+        graph = spec.build()
+
+        # Catch the graph up with any stepping done before it existed
+        if self.current_state != self.auto.initial_state:
+            graph.remove_flag(self.auto.initial_state, "c")
+            graph.add_flag(self.current_state, "c")
+        return graph
+
+    # Moves the current-state highlight, but only on a graph that already
+    #   exists. Stepping never forces the mobject to be built
+    def _move_current_flag(self, old, new):
+        if self._mobj is not None:
+            graph = self._graph()
+            graph.remove_flag(old, "c")
+            graph.add_flag(new, "c")
+
+    def _graph(self):
+        return self.mobj
+
 class DFA_Manager(Automaton_Manager):
-    def __init__(self, auto, mobj, input_string = ""):
+    # auto may be None if a compiled table is given instead (see from_binary).
+    #   The automata-lib DFA is then only built from the table when something
+    #   asks for it
+    def __init__(self, auto, mobj, input_string = "", compiled=None):
         # Attributes common to all Automaton_Managers
-        self.auto = auto
+        self._auto = auto
         self.mobj = mobj
 
-        self.current_state = self.auto.initial_state
+        # Interning order used when compiling. from_json keeps the order of
+        #   the file so table indices line up with what the user wrote
+        self.state_order = None
+        self.symbol_order = None
+        self._compiled = compiled
+
+        if auto is None:
+            self.current_state = compiled.states[compiled.initial]
+        else:
+            self.current_state = auto.initial_state
         self.input_string = input_string
 
-        # A little aliasing
-        self.dfa = self.auto
+    @property
+    def auto(self):
+        if self._auto is None:
+            self._auto = self._compiled.to_dfa()
+        return self._auto
+
+    # A little aliasing
+    @property
+    def dfa(self):
+        return self.auto
 
     ## Utility methods, for instantiating a class with just one component ##
     @classmethod
@@ -91,8 +184,8 @@ class DFA_Manager(Automaton_Manager):
             for vertex in rawJson["final_states"]:
                 vertex_config[vertex]["flags"].append("f")
 
-            edges, edge_config = cls._json_to_mobj_edges(rawJson)
-            mobj = LabeledEdgeDiGraph(
+            edges, edge_config = EdgeIndex.from_json(rawJson).mobj_edges()
+            mobj = GraphSpec(
                 vertices      = rawJson["states"],
                 edges         = edges,
                 labels        = True,
@@ -101,7 +194,51 @@ class DFA_Manager(Automaton_Manager):
                 edge_config   = edge_config
             )
 
-            return cls(auto, mobj, input_string)
+            manager = cls(auto, mobj, input_string)
+            manager.state_order = list(rawJson["states"])
+            manager.symbol_order = list(rawJson["input_symbols"])
+
+            return manager
+
+    # Loads a .fsmb file (see fa_binary) straight into the compiled table.
+    #   Nothing else is built up front: the automata-lib DFA and the graph
+    #   arguments are made from the table the first time something needs them,
+    #   so checking strings against a big machine never pays for either
+    @classmethod
+    def from_binary(cls, filename, input_string=""):
+        from fa_binary import BinaryDFA
+        from compiled_dfa import CompiledDFA
+
+        with BinaryDFA(filename) as binary:
+            try:
+                compiled = CompiledDFA.from_binary(binary)
+            except UnsupportedSymbolException:
+                # Symbols the table cannot hold: load it the slow way instead
+                return cls.from_json(binary.to_json(), input_string)
+
+        manager = cls(None, None, input_string, compiled=compiled)
+        manager.state_order = compiled.states
+        manager.symbol_order = compiled.symbols
+        manager.mobj = manager._binary_graph_spec
+        return manager
+
+    # The same graph from_json would draw for the file, in the file's order
+    def _binary_graph_spec(self):
+        vertex_config = {vertex: {"flags": []} for vertex in self.state_order}
+        vertex_config[self.dfa.initial_state]["flags"].append("i")
+
+        for vertex in self.dfa.final_states:
+            vertex_config[vertex]["flags"].append("f")
+
+        edges, edge_config = EdgeIndex.from_transitions(self.dfa.transitions).mobj_edges()
+        return GraphSpec(
+            vertices      = self.state_order,
+            edges         = edges,
+            labels        = True,
+            layout        = "kamada_kawai",
+            vertex_config = vertex_config,
+            edge_config   = edge_config
+        )
 
     @classmethod
     def from_mobj(cls, mobj, input_string=""):
@@ -110,7 +247,7 @@ class DFA_Manager(Automaton_Manager):
         final_states = set()
 
         for (u, v) in mobj._edge_config:
-            input_symbols.add(mobj._edge_config[(u, v)]["label"])
+            input_symbols.update(label_symbols(mobj._edge_config[(u, v)]["label"]))
 
         for v in mobj.vertices:
             if "i" in mobj.flags[v]:
@@ -141,9 +278,9 @@ class DFA_Manager(Automaton_Manager):
         for v in dfa.final_states:
             vertex_config[v]["flags"].append("f")
 
-        edges, edge_config = cls._auto_transitions_to_mobj_edges(dfa.transitions)
+        edges, edge_config = EdgeIndex.from_transitions(dfa.transitions).mobj_edges()
 
-        mobj = LabeledEdgeDiGraph(
+        mobj = GraphSpec(
             vertices = dfa.states,
             edges = edges,
             labels = True,
@@ -162,51 +299,18 @@ class DFA_Manager(Automaton_Manager):
             if start not in transitions:
                 transitions[start] = dict()
 
-            symbol = edge_config[(start, end)]["label"]
-            transitions[start][symbol] = end
+            for symbol in label_symbols(edge_config[(start, end)]["label"]):
+                transitions[start][symbol] = end
         return transitions
 
-    @staticmethod
-    def _auto_transitions_to_mobj_edges(transitions):
-        edges = list()
-        edge_config = dict()
-
-        for start in transitions:
-            for symbol in transitions[start]:
-                end = transitions[start][symbol]
-                edges.append((start, end))
-
-                if (start, end) not in edge_config:
-                    edge_config[(start, end)] = dict()
-
-                edge_config[(start, end)]["label"] = symbol
-        return edges, edge_config
-
-    @staticmethod
-    def _json_to_mobj_edges(rawJson):
-        new_transitions = copy.deepcopy(rawJson["transitions"])
-        edges = list()
-        edge_config = dict()
-        for start in new_transitions:
-            for symbol in new_transitions[start]:
-                end = new_transitions[start][symbol]
-
-                edges.append((start, end))
-
-                if (start, end) not in edge_config:
-                    edge_config[(start, end)] = dict()
-                edge_config[(start, end)]["label"] = symbol
-        return edges, edge_config
-
     ## Public methods for interaction ##
 
     # Returns the next state without moving to it. Including a symbol overrides
     #   the first character of the input string. This is not an option for next()
     def peek(self, symbol=None):
         if symbol is None:
-            if len(self.input_string) > 0:
-                symbol = self.input_string[0]
-            else:
+            symbol = self.cursor.peek()
+            if symbol is None:
                 return None
             
         nxt = self.dfa._get_next_current_state(self.current_state, symbol)
@@ -216,30 +320,134 @@ class DFA_Manager(Automaton_Manager):
         else:
             return nxt
 
-    # Returns the next state, while updating the internal state to match. There
-    #   is no option to override with a different character
-    def next(self):
+    # Moves to the next state and consumes one symbol, without touching the
+    #   mobject. Returns the state that was left
+    def _step(self):
         # This could raise an InvalidInputException, but I want that to propogate up
         next_state = self.peek()
 
         if next_state is None:
             raise EmptyInputException("There are no characters left in the input string")
 
-        self.mobj.remove_flag(self.current_state, "c")
-        self.mobj.add_flag(next_state, "c")
-
-        self.current_state = next_state
-        self.input_string = self.input_string[1:]
+        prev_state, self.current_state = self.current_state, next_state
+        self.cursor.advance()
+        return prev_state
 
+    # Returns the next state, while updating the internal state to match. There
+    #   is no option to override with a different character
+    def next(self):
+        prev_state = self._step()
+        self._move_current_flag(prev_state, self.current_state)
+
+    # Reads the rest of the input without touching the mobject, which is the
+    #   fast way through very long (or streamed) input. Returns the final state
+    def run(self):
+        while (symbol := self.cursor.peek()) is not None:
+            self.current_state = self.peek(symbol)
+            self.cursor.advance()
+        return self.current_state
+
+    # Without a step count, animates until the input runs out, so the length
+    #   of the input never needs to be known ahead of time. Each step only
+    #   animates what it changes: the highlight leaving one vertex, the
+    #   highlight arriving at the next and a flash along the edge taken
     def animate(self, steps=None):
-        if steps is None:
-            steps = len(self.input_string)
-
-        for i in range(steps):
-            prev_mobj = self.mobj
-            self.next()
-
-            yield FadeTransform(prev_mobj, self.mobj)
+        taken = 0
+        while (steps is None and not self.cursor.exhausted()) or \
+                (steps is not None and taken < steps):
+            graph = self._graph()
+            prev_state = self._step()
+            taken += 1
+
+            yield _step_animation(graph, prev_state, self.current_state)
+
+    ## Compiled form, for checking many strings without animating ##
+
+    # Builds (once) the integer transition table for this DFA. Raises
+    #   UnsupportedSymbolException if a symbol is not a single character
+    def compile(self):
+        if self._compiled is None:
+            from compiled_dfa import CompiledDFA
+
+            self._compiled = CompiledDFA.from_dfa(
+                self.dfa,
+                states  = self.state_order,
+                symbols = self.symbol_order,
+            )
+        return self._compiled
+
+    # Runs every string in the batch together, one position at a time.
+    #   Returns a boolean accept array and the final state of each string
+    #   (None if the string fell off a partial DFA or used an unknown symbol).
+    #   DFAs that cannot be compiled are run through automata-lib instead, and
+    #   then each "string" may also be a sequence of multi-character symbols
+    def run_many(self, strings):
+        try:
+            compiled = self.compile()
+        except UnsupportedSymbolException:
+            return self._run_many_stepwise(strings)
+        return compiled.run_many(strings)
+
+    def _run_many_stepwise(self, strings):
+        accepted = list()
+        final_states = list()
+        for string in strings:
+            state = self.dfa.initial_state
+            for symbol in string:
+                state = self.dfa.transitions.get(state, {}).get(symbol)
+                if state is None:
+                    break
+            accepted.append(state is not None and state in self.dfa.final_states)
+            final_states.append(state)
+        return np.array(accepted, dtype=bool), final_states
+
+    # Trace-first simulation: runs the whole input in one pass from the
+    #   current state and returns a DFATrace with the visited states, the
+    #   table cell of each step and the outcome. Without an input string the
+    #   rest of the cursor is read, and the manager ends up where the trace
+    #   stopped. A given string leaves the manager where it is
+    def trace(self, input_string=None):
+        compiled = self.compile()
+        start = compiled.state_ids[self.current_state]
+
+        if input_string is not None:
+            return compiled.trace(input_string, start)
+
+        trace = compiled.trace(self.cursor, start)
+        prev_state, self.current_state = self.current_state, trace.states[-1]
+        self._move_current_flag(prev_state, self.current_state)
+        return trace
+
+    ## Minimization ##
+
+    # A Minimizer for this DFA. Iterate its events() to watch the partition
+    #   refinement, or ask for minimized() directly
+    def minimizer(self):
+        return Minimizer(self.dfa, states=self.state_order, symbols=self.symbol_order)
+
+    # A new manager for the minimal equivalent DFA
+    def minimize(self, input_string=""):
+        return DFA_Manager.from_dfa(self.minimizer().minimized(), input_string)
+
+    ## Comparing against other DFAs ##
+
+    # Both take a DFA_Manager or a bare DFA and return a Comparison, which is
+    #   truthy when the check holds and otherwise carries a shortest
+    #   counterexample. Partial DFAs are fine on either side
+    def equivalent_to(self, other):
+        return check_equivalence(self.dfa, _as_dfa(other))
+
+    # Whether every string this DFA accepts is accepted by other
+    def included_in(self, other):
+        return check_inclusion(self.dfa, _as_dfa(other))
+
+def _as_dfa(fa):
+    if isinstance(fa, DFA_Manager):
+        return fa.dfa
+    elif isinstance(fa, DFA):
+        return fa
+    else:
+        raise TypeError(f"Can't compare a DFA with type {type(fa)}.")
 
 class NFA_Manager(Automaton_Manager):
     def __init__(self, auto, mobj, input_string = ""):
@@ -253,6 +461,12 @@ class NFA_Manager(Automaton_Manager):
         # A little aliasing
         self.nfa = self.auto
 
+        # Bit order used by the bitset simulation, see compile()
+        self.state_order = None
+        self.current_states = None
+        self._compiled = None
+        self._lazy = None
+
     ## Utility methods, for instantiating a class with just one component ##
     @classmethod
     def from_json(cls, rawStr, input_string=None):
@@ -290,8 +504,8 @@ class NFA_Manager(Automaton_Manager):
             for vertex in rawJson["final_states"]:
                 vertex_config[vertex]["flags"].append("f")
 
-            edges, edge_config = cls._json_to_mobj_edges(rawJson)
-            mobj = LabeledEdgeDiGraph(
+            edges, edge_config = EdgeIndex.from_json(rawJson).mobj_edges()
+            mobj = GraphSpec(
                 vertices      = rawJson["states"],
                 edges         = edges,
                 labels        = True,
@@ -300,7 +514,10 @@ class NFA_Manager(Automaton_Manager):
                 edge_config   = edge_config
             )
 
-            return cls(auto, mobj, input_string)
+            manager = cls(auto, mobj, input_string)
+            manager.state_order = list(rawJson["states"])
+
+            return manager
 
     @classmethod
     def from_mobj(cls, mobj, input_string=""):
@@ -309,7 +526,9 @@ class NFA_Manager(Automaton_Manager):
         final_states = set()
 
         for (u, v) in mobj._edge_config:
-            input_symbols.add(mobj._edge_config[(u, v)]["label"])
+            input_symbols.update(label_symbols(mobj._edge_config[(u, v)]["label"]))
+        # Epsilon moves are labelled but are not part of the alphabet
+        input_symbols.discard("")
 
         for v in mobj.vertices:
             if "i" in mobj.flags[v]:
@@ -338,9 +557,9 @@ class NFA_Manager(Automaton_Manager):
         for v in dfa.final_states:
             vertex_config[v]["flags"].append("f")
 
-        edges, edge_config = cls._auto_transitions_to_mobj_edges(dfa.transitions)
+        edges, edge_config = EdgeIndex.from_transitions(dfa.transitions).mobj_edges()
 
-        mobj = LabeledEdgeDiGraph(
+        mobj = GraphSpec(
             vertices = dfa.states,
             edges = edges,
             labels = True,
@@ -361,9 +580,9 @@ class NFA_Manager(Automaton_Manager):
         for v in nfa.final_states:
             vertex_config[v]["flags"].append("f")
 
-        edges, edge_config = cls._auto_transitions_to_mobj_edges(nfa.transitions)
+        edges, edge_config = EdgeIndex.from_transitions(nfa.transitions, nondeterministic=True).mobj_edges()
 
-        mobj = LabeledEdgeDiGraph(
+        mobj = GraphSpec(
             vertices = nfa.states,
             edges = edges,
             labels = True,
@@ -391,72 +610,130 @@ class NFA_Manager(Automaton_Manager):
             if start not in transitions:
                 transitions[start] = dict()
 
-            symbol = edge_config[(start, end)]["label"]
-            if symbol not in transitions[start]:
-                transitions[start][symbol] = list()
+            for symbol in label_symbols(edge_config[(start, end)]["label"]):
+                if symbol not in transitions[start]:
+                    transitions[start][symbol] = list()
 
-            transitions[start][symbol].append(end)
+                transitions[start][symbol].append(end)
         return transitions
 
-    @staticmethod
-    def _auto_transitions_to_mobj_edges(transitions):
-        edges = list()
-        edge_config = dict()
-
-        for start in transitions:
-            for symbol in transitions[start]:
-                endings = transitions[start][symbol]
-                if isinstance(endings, str):
-                    edges.append((start, endings))
-
-                    if (start, endings) not in edge_config:
-                        edge_config[(start, endings)] = dict()
-                        
-                    edge_config[(start, endings)]["label"] = symbol
-                else:
-                    for end in endings:
-                        edges.append((start, end))
+    ## Public methods for interaction ##
 
-                        if (start, end) not in edge_config:
-                            edge_config[(start, end)] = dict()
+    # Returns the set of states the next symbol can lead to, without moving.
+    #   Including a symbol overrides the next character of the input
+    def peek(self, symbol=None):
+        if symbol is None:
+            symbol = self.cursor.peek()
+            if symbol is None:
+                return None
 
-                        edge_config[(start, end)]["label"] = symbol
-        return edges, edge_config
+        nxt = self.nfa.transitions.get(self.current_state, dict()).get(symbol)
 
-    @staticmethod
-    def _json_to_mobj_edges(rawJson):
-        new_transitions = copy.deepcopy(rawJson["transitions"])
-        edges = list()
-        edge_config = dict()
-        for start in new_transitions:
-            for symbol in new_transitions[start]:
-                endings = new_transitions[start][symbol]
-                raise InvalidInputException("That input does not have a defined transition at this state")
-            else:
-                return nxt
+        if not nxt:
+            raise InvalidInputException("That input does not have a defined transition at this state")
+        else:
+            return nxt
 
     # Unlike DFA, this behavior is nondeterministic. The caller must choose an ending state based on the peek() method. If the ending state is valid, next() will return that state and update the internal state to it
     def next(self, end):
         # This could raise an InvalidInputException, but I want that to propogate up
-        if end in self.peek():
-            self.mobj.remove_flag(self.current_state, "c")
-            self.mobj.add_flag(end, "c")
+        options = self.peek()
+        if options is None:
+            raise EmptyInputException("There are no characters left in the input string")
+
+        if end in options:
+            self._move_current_flag(self.current_state, end)
 
+            # One branch was chosen, so the set from simulate() no longer holds
             self.current_state = end
+            self.current_states = None
+            self.cursor.advance()
         else:
             raise NondeterminismException("Next state requested for NFA, but state was unreachable")
 
+    ## Bitset simulation, which follows every branch at once ##
+
+    # Builds (once) the bitset form of this NFA, with epsilon closures and
+    #   per-symbol successor masks precomputed
+    def compile(self):
+        if self._compiled is None:
+            self._compiled = BitsetNFA.from_nfa(self.nfa, states=self.state_order)
+        return self._compiled
+
+    # Runs the whole input from where the manager is (every live branch after
+    #   an earlier simulate, otherwise the current state and its epsilon
+    #   closure) and returns an NFARun holding the active set after every
+    #   symbol. Without an input string the rest of the cursor is read and
+    #   current_states is left at the end of the run; a given string leaves
+    #   the manager where it is
+    def simulate(self, input_string=None):
+        compiled = self.compile()
+        if self.current_states is not None:
+            start = compiled.encode(self.current_states)
+        else:
+            start = compiled.closures[compiled.state_ids[self.current_state]]
+
+        if input_string is not None:
+            return compiled.run(input_string, start)
+
+        run = compiled.run(self.cursor, start)
+        self.current_states = run.active_states()
+        return run
+
+    def accepts(self, input_string):
+        return self.compile().accepts(input_string)
+
+    # Lazy determinization: subset states are built only when a run reaches
+    #   them and are kept (LRU, up to max_subsets) across every later run made
+    #   through the returned LazyDFA. Asking again with a different size
+    #   starts a fresh cache
+    def lazy_dfa(self, max_subsets=4096):
+        if self._lazy is None or self._lazy.max_subsets != max_subsets:
+            self._lazy = LazyDFA(self.compile(), max_subsets=max_subsets)
+        return self._lazy
+
+    # Eager determinization of the reachable subsets, as a SubsetConstruction.
+    #   Iterate its events() to watch the DFA grow, or ask for dfa() directly.
+    #   Either raises StateBudgetExceeded past max_states subsets
+    def determinize(self, max_states=256):
+        return SubsetConstruction(self.compile(), max_states=max_states)
+
+    # Marks exactly the given states as current, so every live branch of a
+    #   simulation is highlighted at once
+    def highlight(self, states):
+        states = set(states)
+        for v in self.mobj.vertices:
+            if v in states and "c" not in self.mobj.flags[v]:
+                self.mobj.add_flag(v, "c")
+            elif v not in states and "c" in self.mobj.flags[v]:
+                self.mobj.remove_flag(v, "c")
+
 class TM_Manager(Automaton_Manager):
     def __init__(self, auto, mobj, tape=""):
         self.auto = auto
+
+        # The whole input has to sit on the tape anyway, so streams and
+        #   iterables are read in up front
+        tape = InputCursor(tape).remaining()
+
+        # The TuringTape drawn on screen. With a GraphSpec it is made along
+        #   with the rest of the mobject
+        self.tape = None
         self.mobj = mobj
+        if self._mobj is not None:
+            from turingTape import TuringTape
 
-        self.tape = TuringTape(tape)
+            self.tape = TuringTape(tape, blank=self.auto.blank_symbol)
 
-        self.current_state = TMConfiguration(self.auto.initial_state, TMTape(tape[0], '.'))
+        self.current_state = TMConfiguration(
+            self.auto.initial_state,
+            TMTape(tape, blank_symbol=self.auto.blank_symbol)
+        )
         self.input_string = tape
+        self.initial_tape = tape
 
         self.tm = self.auto
+        self._compiled = None
 
     # @classmethod
     # def _merge_duplicate_edges(cls, rawJson):
@@ -485,7 +762,10 @@ class TM_Manager(Automaton_Manager):
 
     @classmethod
     def from_json(cls, rawStr, tape=""):
-        rawJson = json.loads(rawStr)
+        if isinstance(rawStr, dict):
+            rawJson = rawStr
+        else:
+            rawJson = json.loads(rawStr)
 
         auto = DTM(
             states = set(rawJson["states"]),
@@ -504,7 +784,7 @@ class TM_Manager(Automaton_Manager):
             vertex_config[vertex]["flags"].append("f")
 
         edges, edge_config = cls._json_to_mobj_edges(rawJson)
-        mobj = LabeledEdgeDiGraph(
+        mobj = GraphSpec(
             vertices      = rawJson["states"],
             edges         = edges,
             labels        = True,
@@ -512,39 +792,45 @@ class TM_Manager(Automaton_Manager):
             vertex_config = vertex_config,
             edge_config   = edge_config,
             layout_scale = 2
-        ).shift(DOWN*1.5)
-        tapemobj = TuringTape(tape).get_mobject().next_to(mobj, UP*4)
+        )
 
-        return cls(auto, VGroup(mobj, tapemobj), tape)
+        return cls(auto, mobj, tape)
 
-    def _json_to_mobj_edges(rawJson):
-        new_transitions = rawJson["transitions"]
-        edges = list()
-        edge_config = dict()
-        for start in new_transitions:
-            for symbol in new_transitions[start]:
-                ending = new_transitions[start][symbol]
-                end = ending[0]
+    # The graph sits under the tape. Keep hold of the TuringTape that is
+    #   actually on screen, so moving the head recolors the right boxes
+    def _build_mobj(self, spec):
+        from manim import UP, DOWN, VGroup
+        from turingTape import TuringTape
+
+        graph = spec.build().shift(DOWN*1.5)
+        graph.add_flag(self.current_state.state, "c")
 
-                edges.append((start, end))
+        # Drawn from the current configuration, in case the machine was
+        #   stepped before anything asked for the mobject
+        tape = self.current_state.tape
+        self.tape = TuringTape(tape.get_symbols_as_str(), blank=self.tm.blank_symbol)
+        self.tape.index = tape.current_position
+        tapemobj = self.tape.get_mobject().next_to(graph, UP*4)
 
-                if (start, end) not in edge_config:
-                    edge_config[(start, end)] = dict()
+        return VGroup(graph, tapemobj)
 
-                if "label" not in edge_config[(start, end)]:
-                    edge_config[(start, end)]["label"] = list()
+    def _graph(self):
+        return self.mobj[0]
 
+    # Each transition is written as its own "read -> write, move" entry on
+    #   the edge to the state it leads to
+    @staticmethod
+    def _json_to_mobj_edges(rawJson):
+        index = EdgeIndex(separator=",")
+        for start in rawJson["transitions"]:
+            for symbol, ending in rawJson["transitions"][start].items():
                 if symbol == ending[1]:
                     labelstr = f"{symbol} \\rightarrow {ending[2]}"
                 else:
                     labelstr = f"{symbol} \\rightarrow {ending[1]}, {ending[2]}"
-                edge_config[(start, end)]["label"].append(labelstr.replace(".", "\\_"))
-
-        for (start, end) in edge_config:
-            edge_config[(start, end)]["label"] = ",".join(edge_config[(start, end)]["label"])
+                index.add(start, labelstr.replace(".", "\\_"), ending[0])
 
-        print(edges, edge_config)
-        return edges, edge_config
+        return index.mobj_edges()
 
 
     @classmethod
@@ -559,29 +845,170 @@ class TM_Manager(Automaton_Manager):
         else:
             return nxt
 
-    # Returns the next state, while updating the internal state to match. There
-    #   is no option to override with a different character
-    def next(self):
+    # Moves to the next configuration without touching the mobject. Returns
+    #   the configuration that was left
+    def _step(self):
         # This could raise an InvalidInputException, but I want that to propogate up
         next_state = self.peek()
 
         if next_state is None:
             raise EmptyInputException("There are no characters left in the input string")
 
-        self.mobj[0].remove_flag(self.current_state, "c")
-        self.mobj[0].add_flag(next_state, "c")
+        prev_state, self.current_state = self.current_state, next_state
+        return prev_state
+
+    # Returns the next state, while updating the internal state to match. There
+    #   is no option to override with a different character
+    def next(self):
+        prev_state = self._step()
+        self._move_current_flag(prev_state.state, self.current_state.state)
+
+        # A tape that was never drawn has no cells to update
+        if self.tape is not None and len(self.tape.boxes) > 0:
+            self._tape_step(prev_state, self.current_state)
+
+    # Brings the drawn tape from one configuration to the next: rewrites the
+    #   cell under the head if its symbol changed, adds a cell if the head ran
+    #   off either end, and moves the highlight. Returns the animations for
+    #   just those cells
+    def _tape_step(self, prev_state, next_state, animate=False):
+        position = prev_state.tape.current_position
+        _, written, direction = self.tm._get_transition(
+            prev_state.state, prev_state.tape.read_symbol()
+        )
+
+        anims = list()
+        if written != prev_state.tape.read_symbol():
+            anims.append(self.tape.write(position, written, animate))
+
+        if direction == "L" and position == 0:
+            anims.append(self.tape.grow("L", animate))
+        elif direction == "R" and position == len(prev_state.tape) - 1:
+            anims.append(self.tape.grow("R", animate))
+
+        anims.append(self.tape.set_index(next_state.tape.current_position, animate))
+        return [anim for anim in anims if anim is not None]
+
+    def halted(self):
+        return self.current_state.state in self.tm.final_states
+
+    ## Headless execution, for checking long runs before animating them ##
+
+    def compile(self):
+        if self._compiled is None:
+            self._compiled = CompiledTM.from_dtm(self.tm)
+        return self._compiled
+
+    # Runs the machine on its starting tape (or the tape given) without
+    #   touching automata-lib configurations or the mobject. Returns a TMResult
+    #   with the halting status, final state, step count and final tape
+    def run_headless(self, tape=None, max_steps=1_000_000, every=None, state_changes=False, reversals=False):
+        if tape is None:
+            tape = self.initial_tape
+        return self.compile().run(
+            tape,
+            max_steps     = max_steps,
+            every         = every,
+            state_changes = state_changes,
+            reversals     = reversals,
+        )
+
+    # The part of a keyframe's tape worth drawing: the non-blank cells, widened
+    #   to include the head. Returns the string and the head's index in it
+    def _tape_window(self, keyframe):
+        start = min(keyframe.tape_start, keyframe.head)
+        end = max(keyframe.tape_start + len(keyframe.tape), keyframe.head + 1)
+
+        blank = self.tm.blank_symbol
+        string = blank * (keyframe.tape_start - start) + keyframe.tape + \
+            blank * (end - keyframe.tape_start - len(keyframe.tape))
+        return string, keyframe.head - start
+
+    # Fast-forward animation: the rest of the run, from the current
+    #   configuration, is simulated headlessly first, and only keyframes
+    #   (every k-th step, state changes, head reversals) are drawn. Each
+    #   stretch of skipped steps becomes one transition with a step counter,
+    #   so render time follows the number of keyframes, not run length. As
+    #   with animate, each animation has to be played before the next is
+    #   asked for, since the tape is swapped to its new cells in between
+    def animate_keyframes(self, every=None, state_changes=True, reversals=True, max_steps=1_000_000):
+        from manim import DOWN, LEFT, FadeIn, Transform, AnimationGroup, MathTex
+
+        if not (every or state_changes or reversals):
+            raise ValueError("No keyframes requested: set every, state_changes or reversals")
+
+        compiled = self.compile()
+        tape = self.current_state.tape
+        result = compiled.run(
+            tape.get_symbols_as_str(),
+            max_steps     = max_steps,
+            every         = every,
+            state_changes = state_changes,
+            reversals     = reversals,
+            start         = compiled.state_ids[self.current_state.state],
+            head          = tape.current_position,
+        )
+        graph, tapemobj = self.mobj[0], self.mobj[1]
+
+        previous = result.keyframes[0]
+        counter = MathTex("\\text{step } 0", font_size=32).next_to(tapemobj, DOWN)
+        yield FadeIn(counter)
+
+        for keyframe in result.keyframes[1:]:
+            skipped = keyframe.step - previous.step
 
-        self.tape.index = next_state.tape.current_position
-        self.tape.get_mobject().update()
+            string, index = self._tape_window(keyframe)
+            target = self.tape.snapshot(string, index).move_to(tapemobj, aligned_edge=LEFT)
 
-        self.current_state = next_state
+            if skipped > 1:
+                label = f"\\text{{step }} {keyframe.step} \\; (\\gg {skipped})"
+            else:
+                label = f"\\text{{step }} {keyframe.step}"
+            new_counter = MathTex(label, font_size=32).next_to(target, DOWN)
+
+            anims = [Transform(tapemobj, target), Transform(counter, new_counter)]
+            if keyframe.state != previous.state:
+                anims.append(graph.remove_flag(previous.state, "c", animate=True))
+                anims.append(graph.add_flag(keyframe.state, "c", animate=True))
+            yield AnimationGroup(*[anim for anim in anims if anim is not None])
+
+            self.tape.show(target, string, index)
+            previous = keyframe
+
+        string, index = self._tape_window(result.keyframes[-1])
+        self.current_state = TMConfiguration(
+            result.state,
+            TMTape(string, blank_symbol=self.tm.blank_symbol, current_position=index),
+        )
 
+    # Without a step count, animates until the machine halts. The length of the
+    #   input says nothing about how long a TM runs. As with DFA_Manager, a
+    #   step animates only the vertices, edge and tape cells it changes
     def animate(self, steps=None):
-        if steps is None:
-            steps = len(self.input_string)
+        from manim import AnimationGroup
+
+        taken = 0
+        while (steps is None and not self.halted()) or \
+                (steps is not None and taken < steps):
+            graph = self._graph()
+            prev_state = self._step()
+            taken += 1
+
+            yield AnimationGroup(
+                _step_animation(graph, prev_state.state, self.current_state.state),
+                *self._tape_step(prev_state, self.current_state, animate=True),
+            )
+
+# The animation for one transition from start to end: the current-state
+#   highlight moves (unless the transition is a loop) and the edge taken
+#   flashes. Nothing else in the graph is touched
+def _step_animation(graph, start, end):
+    from manim import AnimationGroup
 
-        for i in range(steps):
-            prev_mobj = self.mobj
-            self.next()
+    anims = list()
+    if start != end:
+        anims.append(graph.remove_flag(start, "c", animate=True))
+        anims.append(graph.add_flag(end, "c", animate=True))
+    anims.append(graph.traverse_animation(start, end))
 
-            yield FadeTransform(prev_mobj, self.mobj)
+    return AnimationGroup(*[anim for anim in anims if anim is not None])
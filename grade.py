@@ -0,0 +1,165 @@
+import os
+import csv
+import sys
+import json
+import time
+import hashlib
+
+from utils import JSONToDFA
+from minimizer import Minimizer, canonical_form
+from equivalence import check_equivalence
+from worker_pool import run_tasks
+
+# Grades a directory of submitted DFAs (one json file each, in the fa_vault
+#   format) against a reference DFA:
+#
+#   python grade.py fa_vault/simple.json submissions/ grades.csv
+#
+# The reference is minimized and put in canonical form once. A submission
+#   with the same canonical form is equivalent without any further search;
+#   otherwise the product is searched for a shortest counterexample
+
+FIELDS = ["submission", "verdict", "counterexample", "accepted_by", "duplicate_of", "detail"]
+
+# Written in place of an empty counterexample, which would look like no
+#   counterexample at all
+EMPTY_STRING = "<empty>"
+
+# Set in each worker by _init_worker, so the reference is only sent once
+_reference = None
+_reference_form = None
+
+
+def _init_worker(reference, reference_form):
+    global _reference, _reference_form
+    _reference = reference
+    _reference_form = reference_form
+
+
+# Two files with the same hash describe the same machine, whatever their
+#   key order, list order or whitespace
+def structural_hash(rawJson):
+    structure = {
+        "states": sorted(map(str, rawJson["states"])),
+        "input_symbols": sorted(map(str, rawJson["input_symbols"])),
+        "transitions": rawJson["transitions"],
+        "initial_state": rawJson["initial_state"],
+        "final_states": sorted(map(str, rawJson["final_states"])),
+    }
+    return hashlib.sha256(json.dumps(structure, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# Runs in a worker process. Never raises: a malformed submission is a verdict
+def grade_submission(rawJson):
+    try:
+        submission = JSONToDFA(rawJson)
+    except Exception as e:
+        return {"verdict": "invalid", "detail": f"{type(e).__name__}: {e}"}
+
+    if canonical_form(submission) == _reference_form:
+        return {"verdict": "equivalent"}
+
+    comparison = check_equivalence(_reference, submission)
+    if comparison.holds:
+        return {"verdict": "equivalent"}
+
+    return {
+        "verdict": "not equivalent",
+        "counterexample": comparison.counterexample or EMPTY_STRING,
+        "accepted_by": "reference" if comparison.left_accepts else "submission",
+    }
+
+
+def read_submissions(directory):
+    submissions = list()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            submissions.append(os.path.join(directory, name))
+    return submissions
+
+
+# Grades every submission, skipping files structurally identical to one
+#   already sent off. Returns one result dict per file, in file order
+def grade_all(reference_json, files, workers=None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    reference = Minimizer(JSONToDFA(reference_json)).minimized()
+    reference_form = canonical_form(reference)
+
+    results = [None] * len(files)
+    first_with_hash = dict()
+    duplicates = dict()
+    unique = dict()
+
+    for i, filename in enumerate(files):
+        try:
+            with open(filename, "r") as f:
+                rawJson = json.loads(f.read())
+            digest = structural_hash(rawJson)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            results[i] = {"verdict": "invalid", "detail": f"{type(e).__name__}: {e}"}
+            continue
+
+        if digest in first_with_hash:
+            duplicates[i] = first_with_hash[digest]
+        else:
+            first_with_hash[digest] = i
+            unique[i] = rawJson
+
+    for i, _, result, error in run_tasks(
+        grade_submission,
+        list(unique.items()),
+        workers,
+        initializer = _init_worker,
+        initargs    = (reference, reference_form),
+    ):
+        if error is not None:
+            # The worker itself died (e.g. killed, out of memory)
+            result = {"verdict": "error", "detail": f"{type(error).__name__}: {error}"}
+        results[i] = result
+
+    for i, original in duplicates.items():
+        results[i] = dict(results[original], duplicate_of=os.path.basename(files[original]))
+
+    for filename, result in zip(files, results):
+        result["submission"] = os.path.basename(filename)
+    return results
+
+
+def write_csv(results, filename):
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow({field: result.get(field, "") for field in FIELDS})
+
+
+def main(args):
+    if 3 <= len(args) <= 5:
+        reference_file = args[1]
+        directory = args[2]
+        out_file = args[3] if len(args) >= 4 else "grades.csv"
+        workers = int(args[4]) if len(args) == 5 else None
+    else:
+        print("Usage: python grade.py <reference.json> <submissions_dir> [out.csv (default grades.csv)] [workers (default all cores)]")
+        exit(code=2)
+
+    with open(reference_file, "r") as f:
+        reference_json = json.loads(f.read())
+
+    files = read_submissions(directory)
+
+    start = time.perf_counter()
+    results = grade_all(reference_json, files, workers)
+    write_csv(results, out_file)
+
+    counts = dict()
+    for result in results:
+        counts[result["verdict"]] = counts.get(result["verdict"], 0) + 1
+    summary = ", ".join(f"{count} {verdict}" for verdict, count in sorted(counts.items()))
+    print(f"Graded {len(files)} submissions in {time.perf_counter() - start:.1f}s: {summary}")
+    print(f"Wrote {out_file}")
+
+if __name__ == "__main__":
+    main(sys.argv)
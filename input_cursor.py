@@ -0,0 +1,81 @@
+_EMPTY = object()
+
+
+class InputCursor:
+    """Reads input one symbol at a time from a string, iterable or text stream.
+
+    Strings are read by index, so stepping never copies the input. Iterables
+    (e.g. generators) yield one symbol per item, and text streams (anything
+    with a read() method, like an open file) are read in chunks. Only one
+    symbol of lookahead is ever held for non-string sources.
+    """
+
+    def __init__(self, source="", chunk_size=4096):
+        self.position = 0
+        self._buffered = _EMPTY
+
+        if isinstance(source, str):
+            self._string = source
+            self._offset = 0
+            self._symbols = None
+        else:
+            self._string = None
+            self._offset = 0
+            if hasattr(source, "read"):
+                self._symbols = self._read_chunks(source, chunk_size)
+            else:
+                self._symbols = iter(source)
+
+    @staticmethod
+    def _read_chunks(stream, chunk_size):
+        while chunk := stream.read(chunk_size):
+            yield from chunk
+
+    # Returns the next symbol without consuming it, or None at the end
+    def peek(self):
+        if self._string is not None:
+            if self._offset < len(self._string):
+                return self._string[self._offset]
+            return None
+
+        if self._buffered is _EMPTY:
+            self._buffered = next(self._symbols, None)
+        return self._buffered
+
+    # Consumes and returns the next symbol, or None at the end
+    def advance(self):
+        symbol = self.peek()
+        if symbol is None:
+            return None
+
+        if self._string is not None:
+            self._offset += 1
+        else:
+            self._buffered = _EMPTY
+
+        self.position += 1
+        return symbol
+
+    def exhausted(self):
+        return self.peek() is None
+
+    # Returns everything not yet consumed as a string. For streams this has to
+    #   read the rest of the input, so the cursor switches over to reading
+    #   from that string afterwards
+    def remaining(self):
+        if self._string is None:
+            rest = list()
+            if self.peek() is not None:
+                rest.append(self._buffered)
+            rest.extend(self._symbols)
+
+            self._string = "".join(rest)
+            self._offset = 0
+            self._symbols = None
+            self._buffered = _EMPTY
+
+        return self._string[self._offset:]
+
+    def __iter__(self):
+        while (symbol := self.advance()) is not None:
+            yield symbol
@@ -4,19 +4,26 @@ __all__ = {
 
 import numpy as np
 
+from manim.constants import DEFAULT_FONT_SIZE, RIGHT, UP
 from manim.mobject.graph import DiGraph
 from manim.mobject.geometry.arc import CurvedArrow, Dot, Annulus, LabeledDot
 from manim.mobject.geometry.labeled import LabeledLine
 from manim.mobject.geometry.line import Arrow
 from manim.mobject.geometry.shape_matchers import\
     BackgroundRectangle, SurroundingRectangle
-from manim.mobject.text.tex_mobject import MathTex
-from manim.mobject.types.vectorized_mobject import VGroup, VDict
-from manim.animation.indication import Indicate
+from manim.mobject.types.vectorized_mobject import VGroup, VDict, VMobject
+from manim.animation.indication import Indicate, ShowPassingFlash
+from manim.animation.composition import AnimationGroup
+from manim.utils.space_ops import rotate_vector
 
 from copy import copy, deepcopy
 
-from utils import angle_between
+from utils import edge_offsets, loop_angles
+from layout_cache import canonical_name, layout_key, load_layout, store_layout
+from tex_cache import cached_math_tex
+
+# Length of the axes of the invisible corner that carries a graph's frame
+FRAME_SIZE = 0.01
 
 
 class LabeledEdgeDiGraph(DiGraph):
@@ -36,13 +43,30 @@ class LabeledEdgeDiGraph(DiGraph):
         partitions=None,
         root_vertex=None,
         edge_config=None,
+        cache_layout=True,
     ):
 
+        # Unordered vertex collections (e.g. dfa.states) are put in a fixed
+        #   order so the layout comes out the same on every run
+        if not isinstance(vertices, (list, tuple)):
+            vertices = sorted(vertices, key=canonical_name)
+
+        # Named layouts are looked up in the on-disk layout cache first. On a
+        #   hit the stored positions are handed to manim and no layout runs
+        layout_cache_key = None
+        if cache_layout and isinstance(layout, str) and partitions is None and root_vertex is None:
+            layout_cache_key = layout_key(
+                vertices, edges, layout, layout_scale, layout_config)
+            cached = load_layout(layout_cache_key, vertices)
+            if cached is not None:
+                layout = cached
+                layout_cache_key = None
+
         if isinstance(labels, dict):
             self._labels = labels
         elif isinstance(labels, bool):
             if labels:
-                self._labels = {v: MathTex(
+                self._labels = {v: cached_math_tex(
                     v, fill_color=label_fill_color) for v in vertices}
             else:
                 self._labels = dict()
@@ -58,9 +82,37 @@ class LabeledEdgeDiGraph(DiGraph):
                 if key not in vertices:
                     self.common_vertex_config[key] = value
 
+        # Copied per vertex, so the flags popped and the labels added below
+        #   never show up in the caller's config
+        if vertex_config is not None:
+            vertex_config = {
+                key: copy(value) if isinstance(value, dict) else value
+                for key, value in vertex_config.items()
+            }
+
+        # Flags are kept as sets: "i" initial, "f" final, "c" current
+        self.flags = {v: set() for v in vertices}
         if vertex_config is not None:
-            self.flags = {v: vertex_config[v].pop(
-                "flags") for v in vertex_config}
+            for v in vertex_config:
+                if isinstance(vertex_config[v], dict) and "flags" in vertex_config[v]:
+                    self.flags[v] = set(vertex_config[v].pop("flags"))
+
+        # Filled in by _populate_edge_dict, which runs inside DiGraph.__init__
+        self._successors = dict()
+        self._predecessors = dict()
+
+        # The graph's own frame and the centroid in it, see get_vcenter. The
+        #   frame is only made once DiGraph.__init__ has placed the vertices
+        self._frame = None
+        self._vcenter = None
+
+        # Centers of the vertices when the edges were last put in place, and
+        #   the angle each loop was turned to then, both in the graph's frame.
+        #   See watch and moved
+        self._last_positions = dict()
+        self._loop_angles = dict()
+        self._watched = None
+        self._pending = dict()
 
         self._vertex_config = {
             v: vertex_config.get(
@@ -97,88 +149,373 @@ class LabeledEdgeDiGraph(DiGraph):
         )
         self.layout_scale = layout_scale
 
+        centroid = self._average_center()
+        self._frame = VMobject(stroke_width=0, fill_opacity=0).set_points_as_corners([
+            centroid + FRAME_SIZE*RIGHT, centroid, centroid + FRAME_SIZE*UP
+        ])
+        self.add(self._frame)
+        self._last_positions = dict(zip(self.vertices, self._to_frame(
+            [vertex["base"].get_center() for vertex in self.vertices.values()]
+        )))
+
+        if layout_cache_key is not None:
+            store_layout(layout_cache_key, {
+                v: self[v].get_center() for v in self.vertices
+            })
+
+        # Accessories are built the first time a vertex needs them and are
+        #   only shown or hidden afterwards, so the mobject tree never grows
+        self._rings = dict()
+        self._start_arrows = dict()
+
         self._redraw_vertices()
 
+    ## Frame and centroid ##
+
+    # The graph's frame is an invisible corner among its submobjects, so it
+    #   is shifted, scaled and rotated along with everything else. A point
+    #   kept in its coordinates stays right through any of those without
+    #   being looked at again: only vertices moving on their own change them
+    def _frame_axes(self):
+        points = self._frame.points
+        origin = points[3]
+        x, y = points[0] - origin, points[7] - origin
+        z = np.cross(x, y) / np.linalg.norm(x)
+        return origin, np.column_stack([x, y, z])
+
+    def _to_frame(self, points):
+        origin, axes = self._frame_axes()
+        return np.linalg.solve(axes, (np.reshape(points, (-1, 3)) - origin).T).T
+
+    def _from_frame(self, point):
+        origin, axes = self._frame_axes()
+        return origin + axes @ point
+
+    # How far the graph has been turned since it was made
+    def _frame_angle(self):
+        origin, axes = self._frame_axes()
+        return float(np.arctan2(axes[1, 0], axes[0, 0]))
+
+    def _average_center(self):
+        return np.average([vertex["base"].get_center()
+                           for vertex in self.vertices.values()], axis=0)
+
+    # The mean of the vertex centers. Kept in the graph's frame, so it follows
+    #   the graph when the whole thing is moved, and is worked out again only
+    #   after vertices are added, removed or laid out again
     def get_vcenter(self):
-        centers = np.array([vertex["base"].get_center()
-                           for vertex in self.vertices.values()])
-        return np.average(centers, axis=0)
+        if self._frame is None:
+            return self._average_center()
+        if self._vcenter is None:
+            self._vcenter = self._to_frame(self._average_center())[0]
+        return self._from_frame(self._vcenter)
+
+    # Anything that adds or removes vertices, or moves them without
+    #   update_edges seeing it, must call this
+    def _vertices_moved(self):
+        self._vcenter = None
+
+    def change_layout(self, *args, **kwargs):
+        result = super().change_layout(*args, **kwargs)
+        self._vertices_moved()
+        self.moved(*self.vertices)
+        return result
+
+    def _add_created_vertex(self, vertex, *args, **kwargs):
+        result = super()._add_created_vertex(vertex, *args, **kwargs)
+        self._vertices_moved()
+        self.moved(vertex)
+        return result
+
+    def _remove_vertex(self, vertex):
+        for w in self.successors(vertex):
+            self._predecessors[w].pop(vertex, None)
+        for u in self.predecessors(vertex):
+            self._successors[u].pop(vertex, None)
+        self._successors.pop(vertex, None)
+        self._predecessors.pop(vertex, None)
+        self._loop_angles.pop(vertex, None)
+        self._last_positions.pop(vertex, None)
+        self._pending.pop(vertex, None)
+        if self._watched is not None:
+            self._watched.pop(vertex, None)
+
+        result = super()._remove_vertex(vertex)
+        self._vertices_moved()
+        return result
+
+    ## Adjacency ##
+
+    # Successors and predecessors of each vertex, as dicts used for ordered
+    #   sets, so reverse-edge and neighbour lookups never scan the edge list
+    def _link(self, u, v):
+        self._successors.setdefault(u, dict())[v] = None
+        self._predecessors.setdefault(v, dict())[u] = None
+
+    def _unlink(self, u, v):
+        self._successors.get(u, dict()).pop(v, None)
+        self._predecessors.get(v, dict()).pop(u, None)
+
+    def has_edge(self, u, v):
+        return v in self._successors.get(u, ())
+
+    def successors(self, v):
+        return list(self._successors.get(v, ()))
+
+    def predecessors(self, v):
+        return list(self._predecessors.get(v, ()))
+
+    # Every edge into or out of v, its loop included once
+    def incident_edges(self, v):
+        return [(v, w) for w in self._successors.get(v, ())] + \
+            [(u, v) for u in self._predecessors.get(v, ()) if u != v]
+
+    def _add_edge(self, edge, *args, **kwargs):
+        result = super()._add_edge(edge, *args, **kwargs)
+        self._link(*edge)
+        return result
+
+    def _remove_edge(self, edge):
+        result = super()._remove_edge(edge)
+        self._unlink(*edge)
+        if edge[0] == edge[1]:
+            self._loop_angles.pop(edge[0], None)
+        return result
+
+    ## Edge geometry ##
+
+    # The centers of the given vertices stacked into one array, with the row
+    #   that belongs to each vertex
+    def _vertex_positions(self, vertices):
+        ids = {v: i for i, v in enumerate(vertices)}
+        positions = np.array([
+            self.vertices[v]["base"].get_center() for v in vertices
+        ]).reshape(-1, 3)
+        return ids, positions
+
+    # The shift of every edge that runs both ways and the rotation of every
+    #   loop among edges, worked out together before any edge mobject is
+    #   built or moved. Only the ends of those edges are looked at. Loops
+    #   point away from the centroid
+    def _edge_geometry(self, edges):
+        pairs = [(u, v) for (u, v) in edges if u != v and self.has_edge(v, u)]
+        loops = [u for (u, v) in edges if u == v]
+
+        ids, positions = self._vertex_positions(list(dict.fromkeys(
+            [v for edge in pairs for v in edge] + loops
+        )))
+
+        offsets = dict()
+        if pairs:
+            starts = np.array([ids[u] for (u, v) in pairs])
+            ends = np.array([ids[v] for (u, v) in pairs])
+            offsets = dict(zip(pairs, edge_offsets(positions, starts, ends)))
+
+        angles = dict()
+        if loops:
+            loop_positions = positions[[ids[u] for u in loops]]
+            angles = dict(zip(loops, loop_angles(loop_positions, self.get_vcenter()).tolist()))
+
+        return offsets, angles
+
+    ## Tracking moves ##
+
+    # Only these vertices are compared against their last centers each
+    #   frame. None watches every vertex, which is what manim's Graph does and
+    #   costs a get_center per vertex per frame. A scene that only ever moves
+    #   a few vertices by hand can narrow it down, and calls moved() for the
+    #   one-off moves of any others
+    def watch(self, vertices=None):
+        self._watched = None if vertices is None else dict.fromkeys(vertices)
+
+    # Marks vertices as moved, so their edges are put back on the next frame
+    #   whether or not they are watched
+    def moved(self, *vertices):
+        self._pending.update(dict.fromkeys(vertices))
+
+    # The vertices whose centers changed since the last call: the watched
+    #   ones compared against the centers saved then, plus any marked with
+    #   moved(). Centers are compared in the graph's frame, so moving the
+    #   whole graph moves nothing. The cached centroid is moved along with
+    #   the vertices, by the mean of their shifts over the whole graph, so it
+    #   never has to be averaged again. Also returns whether it moved
+    def _moved_vertices(self):
+        watched = self.vertices if self._watched is None else self._watched
+
+        candidates = list(dict.fromkeys(
+            v for v in list(watched) + list(self._pending) if v in self.vertices
+        ))
+        positions = self._to_frame([self.vertices[v]["base"].get_center() for v in candidates])
+
+        moved = list()
+        shift = np.zeros(3)
+        for v, position in zip(candidates, positions):
+            last = self._last_positions.get(v)
+            if last is None:
+                self._vertices_moved()
+            elif v in self._pending or not np.allclose(position, last, rtol=0, atol=1e-9):
+                shift += position - last
+            else:
+                continue
+
+            moved.append(v)
+            self._last_positions[v] = position
+
+        self._pending.clear()
+
+        recentred = bool(moved) and (self._vcenter is None or bool(np.any(shift != 0)))
+        if self._vcenter is not None:
+            self._vcenter = self._vcenter + shift / len(self.vertices)
+        return moved, recentred
+
+    ## Building and placing edges ##
+
+    def _edge_label(self, edge, default):
+        label = self._edge_config[edge].get("label", default)
+        return "\\epsilon" if label == "" else label
+
+    # The label of a straight edge, compiled through the label cache with
+    #   the color and size LabeledLine would have given it
+    def _line_label(self, edge):
+        label_config = self._edge_config[edge].get("label_config", dict())
+        return cached_math_tex(
+            self._edge_label(edge, "f"),
+            fill_color=label_config.get("color", "white"),
+            font_size=label_config.get("font_size", DEFAULT_FONT_SIZE),
+        )
+
+    # Everything in an edge's config but the label, for its constructor
+    def _edge_kwargs(self, edge):
+        return {
+            key: deepcopy(value)
+            for key, value in self._edge_config[edge].items() if key != "label"
+        }
+
+    def _loop_arrow(self, u):
+        return CurvedArrow(
+            start_point=self.vertices[u]["base"].get_top(),
+            end_point=self.vertices[u]["base"].get_bottom(),
+            angle=-4,
+            z_index=-1,
+            **self._edge_kwargs((u, u))
+        )
+
+    # A loop is a VGroup of the arrow, the frame and background of its label
+    #   and the label, turned by between to point away from the middle of the
+    #   graph. The label and its boxes stay upright
+    def _build_loop(self, u, between):
+        loop = self._loop_arrow(u)
+        label_mobject = cached_math_tex(
+            self._edge_label((u, u), "g"),
+            fill_color="white",
+            font_size=40,
+        ).move_to(loop.get_center()).shift(
+            np.array([0.5, 0, 0])
+        ).rotate(-1*between)
+
+        label_background = BackgroundRectangle(
+            label_mobject,
+            buff=0.05,
+            color="black",
+            fill_opacity=1,
+            stroke_width=0.5,
+        ).rotate(-1*between)
+        label_frame = SurroundingRectangle(
+            label_mobject,
+            buff=0.05,
+            color="white",
+            stroke_width=0.5
+        ).rotate(-1*between)
+
+        return VGroup(
+            loop,
+            label_frame,
+            label_background,
+            label_mobject
+        ).rotate(
+            between,
+            about_point=self.vertices[u]["base"].get_center()
+        )
+
+    # Puts an existing loop back around u. The arrow is only rebuilt if u
+    #   itself moved, otherwise it is turned to the new angle. The label and
+    #   its boxes are never rebuilt, only shifted
+    def _place_loop(self, u, between, rebuild):
+        edge = self.edges[(u, u)]
+        center = self.vertices[u]["base"].get_center()
+
+        if rebuild:
+            loop = self._loop_arrow(u)
+            anchor = loop.get_center() + np.array([0.5, 0, 0])
+            edge[0].become(loop.rotate(between, about_point=center))
+            target = center + rotate_vector(anchor - center, between)
+        else:
+            turn = between - self._loop_angle(u)
+            edge[0].rotate(turn, about_point=center)
+            target = center + rotate_vector(edge[3].get_center() - center, turn)
+
+        edge[1:].shift(target - edge[3].get_center())
+        self._loop_angles[u] = between - self._frame_angle()
+
+    # The angle a loop is turned to now. Stored against the graph's frame,
+    #   since turning the whole graph turns its loops too
+    def _loop_angle(self, u):
+        if self._frame is None:
+            return self._loop_angles[u]
+        return self._loop_angles[u] + self._frame_angle()
+
+    # Puts an existing edge back between the centers of its ends. Only the
+    #   line's own points are recomputed: the tip and the label are taken
+    #   off and put back, so the label is never compiled again
+    def _place_line(self, u, v, offset):
+        edge = self.edges[(u, v)]
+        label = edge.label
+        tip = edge.tip if edge.has_tip() else None
+
+        edge.remove(label)
+        if tip is not None:
+            edge.remove(tip)
+
+        edge.set_points_by_ends(
+            self.vertices[u]["base"],
+            self.vertices[v]["base"],
+            buff=edge.buff,
+            path_arc=edge.path_arc,
+        )
+        edge.shift(offset)
+
+        # Measured before the tip goes back on and cuts the line short, as
+        #   LabeledLine does when it first places the label
+        start, end = edge.get_start_and_end()
+        label_position = self._edge_config[(u, v)].get("label_position", 0.5)
+
+        if tip is not None:
+            edge.add_tip(tip)
+
+        edge.add(label.move_to(start + (end - start)*label_position))
 
     def _populate_edge_dict(self, edges, edge_type):
         if edge_type.__name__ != "LabeledLine":
             raise TypeError("Unsupported edge type: " +
                             edge_type.__name__ + ". Must use LabeledLine")
 
-        tmp_edge_conf = deepcopy(self._edge_config)
+        for (u, v) in edges:
+            self._link(u, v)
+
+        offsets, angles = self._edge_geometry(edges)
+        self._loop_angles = dict(angles)
 
         self.edges = dict()
         for (u, v) in edges:
             if u != v:
-                if (v, u) in edges:
-                    vec1 = self[v].get_center() - self[u].get_center()
-                    vec2 = np.cross(vec1, np.array([0, 0, 1]))
-
-                    length = np.linalg.norm(vec2)
-                    offset = 0.1*vec2/length
-                else:
-                    offset = np.array([0, 0, 0])
-
-                edge_label = tmp_edge_conf[(u, v)].pop("label", "f")
-                if edge_label == "":
-                    edge_label = "\\epsilon"
                 self.edges[(u, v)] = edge_type(
-                    label=edge_label,
+                    label=self._line_label((u, v)),
                     start=self[u],
                     end=self[v],
-                    **tmp_edge_conf[(u, v)]
-                ).shift(offset)
+                    **self._edge_kwargs((u, v))
+                ).shift(offsets.get((u, v), np.array([0, 0, 0])))
             else:
-                edge_label = tmp_edge_conf[(u, u)].pop("label", "g")
-
-                between = angle_between(self[u].get_center(
-                ) - self.get_vcenter(), np.array([1, 0, 0]))
-                if self[u].get_center()[1] < self.get_vcenter()[1]:
-                    between *= -1
-
-                loop = CurvedArrow(
-                    start_point=self[u].get_top(),
-                    end_point=self[u].get_bottom(),
-                    angle=-4,
-                    z_index=-1,
-                    **tmp_edge_conf[(u, u)]
-                )
-                label_mobject = MathTex(
-                    edge_label,
-                    fill_color="white",
-                    font_size=40,
-                ).move_to(loop.get_center()).shift(
-                    np.array([0.5, 0, 0])
-                ).rotate(-1*between)
-
-                label_background = BackgroundRectangle(
-                    label_mobject,
-                    buff=0.05,
-                    color="black",
-                    fill_opacity=1,
-                    stroke_width=0.5,
-                ).rotate(-1*between)
-                label_frame = SurroundingRectangle(
-                    label_mobject,
-                    buff=0.05,
-                    color="white",
-                    stroke_width=0.5
-                ).rotate(-1*between)
-
-                label_group = VGroup(
-                    loop,
-                    label_frame,
-                    label_background,
-                    label_mobject
-                )
-                self.edges[(u, u)] = VGroup(label_group).rotate(
-                    between,
-                    about_point=self[u].get_center()
-                )
+                self.edges[(u, u)] = self._build_loop(u, angles[u])
 
         for (u, v), edge in self.edges.items():
             try:
@@ -189,138 +526,110 @@ class LabeledEdgeDiGraph(DiGraph):
                 print(self._tip_config)
                 exit()
 
+    # Runs as an updater every frame. Only the edges of vertices that moved
+    #   since the last frame are put back in place. Loops are turned to point
+    #   away from the centroid, so they all turn when it moves, and otherwise
+    #   only the loops on moved vertices are touched. Finding what moved
+    #   still costs one get_center per watched vertex, see watch
     def update_edges(self, graph):
-        tmp_edge_conf = deepcopy(self._edge_config)
+        moved, recentred = self._moved_vertices()
+        if not moved:
+            return
 
-        for (u, v), edge in graph.edges.items():
-            if u != v:
-                # Handling arrows going both ways
-                if (v, u) in self.edges:
-                    vec1 = self.vertices[v]["base"].get_center() -\
-                        self.vertices[u]["base"].get_center()
-                    vec2 = np.cross(vec1, np.array([0, 0, 1]))
-
-                    length = np.linalg.norm(vec2)
-                    offset = 0.1*vec2/length
-                else:
-                    offset = np.array([0, 0, 0])
-
-                # Housekeeping
-                edge_type = type(edge)
-                tip = edge.pop_tips()[0]
-                edge_label = tmp_edge_conf[(u, v)].pop(
-                    "label", "update_edges fail")
-                if edge_label == "":
-                    edge_label = "\\epsilon"
-
-                new_edge = edge_type(
-                    label=edge_label,
-                    start=self.vertices[u]["base"],
-                    end=self.vertices[v]["base"],
-                    **tmp_edge_conf[(u, v)]
-                ).shift(offset)
-
-                edge.become(new_edge)
-                edge.add_tip(tip)
-            else:
-                edge_label = tmp_edge_conf[(u, u)].pop(
-                    "label", "update_edges fail")
-
-                between = angle_between(self.vertices[u]["base"].get_center(
-                ) - self.get_vcenter(), np.array([1, 0, 0]))
-                if self[u].get_center()[1] < self.get_vcenter()[1]:
-                    between *= -1
-
-                loop = CurvedArrow(
-                    start_point=self.vertices[u]["base"].get_top(),
-                    end_point=self.vertices[u]["base"].get_bottom(),
-                    angle=-4,
-                    z_index=-1,
-                    **tmp_edge_conf[(u, u)]
-                )
-                label_mobject = MathTex(
-                    edge_label,
-                    fill_color="white",
-                    font_size=40,
-                ).move_to(
-                    loop.get_center()
-                ).shift(np.array([0.5, 0, 0])).rotate(-1*between)
-
-                label_background = BackgroundRectangle(
-                    label_mobject,
-                    buff=0.05,
-                    color="black",
-                    fill_opacity=1,
-                    stroke_width=0.5,
-                ).rotate(-1*between)
-                label_frame = SurroundingRectangle(
-                    label_mobject,
-                    buff=0.05,
-                    color="white",
-                    stroke_width=0.5
-                ).rotate(-1*between)
-
-                label_group = VGroup(
-                    loop,
-                    label_frame,
-                    label_background,
-                    label_mobject
-                )
-                edge.become(label_group).rotate(
-                    between,
-                    about_point=self.vertices[u]["base"].get_center()
-                )
-
-    def _redraw_vertices(self):
-        for v in self.vertices:
-            if "f" in self.flags[v]:
-                ring = Annulus(
-                    inner_radius=self.vertices[v]["base"].width +
-                    0.1*self.layout_scale/2,
-                    outer_radius=self.vertices[v]["base"].width +
-                    0.2*self.layout_scale/2,
-                    z_index=-1,
-                    fill_color="white"
-                ).move_to(
-                    self.vertices[v]["base"].get_center()
-                ).scale(1/self.layout_scale)
-
-                self.vertices[v]["accessories"].add(ring)
-
-            if "i" in self.flags[v]:
-                ray = self.vertices[v]["base"].get_center() - \
-                    self.get_vcenter()
-                start_arrow = Arrow(
-                    start=ray*2,
-                    end=ray*1.05,
-                    fill_color="white",
-                    stroke_width=20
-                )
-                self.vertices[v]["accessories"].add(start_arrow)
-
-            if "c" in self.flags[v]:
-                for item in self.vertices[v]["base"]:
-                    if isinstance(item, Dot):
-                        item.set_color("yellow")
-                    else:
-                        item.set_color("black")
+        lines = dict.fromkeys(
+            (u, v) for w in moved for (u, v) in self.incident_edges(w)
+            if u != v and (u, v) in self.edges
+        )
+        if recentred:
+            loops = [(u, u) for u in self._loop_angles]
+        else:
+            loops = [(u, u) for u in moved if u in self._loop_angles]
+        offsets, angles = self._edge_geometry(list(lines) + loops)
+
+        for (u, v) in lines:
+            self._place_line(u, v, offsets.get((u, v), np.array([0, 0, 0])))
+
+        moved = set(moved)
+        for u, between in angles.items():
+            if u in moved or between != self._loop_angle(u):
+                self._place_loop(u, between, rebuild=u in moved)
+
+    def _ring_for(self, v):
+        if v not in self._rings:
+            ring = Annulus(
+                inner_radius=self.vertices[v]["base"].width +
+                0.1*self.layout_scale/2,
+                outer_radius=self.vertices[v]["base"].width +
+                0.2*self.layout_scale/2,
+                z_index=-1,
+                fill_color="white"
+            ).move_to(
+                self.vertices[v]["base"].get_center()
+            ).scale(1/self.layout_scale)
+
+            self._rings[v] = ring
+            self.vertices[v]["accessories"].add(ring)
+        return self._rings[v]
+
+    def _start_arrow_for(self, v):
+        if v not in self._start_arrows:
+            ray = self.vertices[v]["base"].get_center() - \
+                self.get_vcenter()
+            start_arrow = Arrow(
+                start=ray*2,
+                end=ray*1.05,
+                fill_color="white",
+                stroke_width=20
+            )
+
+            self._start_arrows[v] = start_arrow
+            self.vertices[v]["accessories"].add(start_arrow)
+        return self._start_arrows[v]
+
+    # Brings one vertex in line with its flags. Accessories a vertex has never
+    #   needed are not built at all. With animate, the accessories still switch
+    #   at once but the recoloring is returned as an animation instead
+    def _redraw_vertex(self, v, animate=False):
+        flags = self.flags[v]
+
+        if "f" in flags or v in self._rings:
+            self._ring_for(v).set_opacity(1 if "f" in flags else 0)
+
+        if "i" in flags or v in self._start_arrows:
+            self._start_arrow_for(v).set_opacity(1 if "i" in flags else 0)
+
+        dot_color = "yellow" if "c" in flags else "white"
+        recolors = list()
+        for item in self.vertices[v]["base"]:
+            color = dot_color if isinstance(item, Dot) else "black"
+            if animate:
+                recolors.append(item.animate.set_color(color))
             else:
-                for item in self.vertices[v]["base"]:
-                    if isinstance(item, Dot):
-                        item.set_color("white")
-                    else:
-                        item.set_color("black")
-
-    def add_flag(self, state, flag):
-        if state in self.vertices:
-            self.flags[state].append(flag)
-        self._redraw_vertices()
+                item.set_color(color)
 
-    def remove_flag(self, state, flag):
-        if state in self.vertices:
-            if flag in self.flags[state]:
-                self.flags[state].remove(flag)
-        self._redraw_vertices()
+        if animate:
+            return AnimationGroup(*recolors)
+
+    def _redraw_vertices(self, vertices=None):
+        if vertices is None:
+            vertices = self.vertices
+
+        for v in vertices:
+            self._redraw_vertex(v)
+
+    # Only the vertex whose flags changed is redrawn, so a step costs the same
+    #   no matter how big the graph is or how long the run has been going.
+    #   With animate, returns the animation of that one vertex (None if the
+    #   flag was already in place)
+    def add_flag(self, state, flag, animate=False):
+        if state in self.vertices and flag not in self.flags[state]:
+            self.flags[state].add(flag)
+            return self._redraw_vertex(state, animate)
+
+    def remove_flag(self, state, flag, animate=False):
+        if state in self.vertices and flag in self.flags[state]:
+            self.flags[state].discard(flag)
+            return self._redraw_vertex(state, animate)
 
     def _arrow_from(self, edge):
         return Arrow(
@@ -337,6 +646,17 @@ class LabeledEdgeDiGraph(DiGraph):
         else:
             return Indicate(self._arrow_from(self.edges[(start, end)]))
 
+    # A flash running along one edge, for showing which transition a step
+    #   took. Only a copy of that edge is animated
+    def traverse_animation(self, start, end, color="yellow"):
+        if (start, end) not in self.edges:
+            raise Exception(f"Transition does not exist: {(start, end)}")
+
+        return ShowPassingFlash(
+            self.edges[(start, end)].copy().set_color(color),
+            time_width=0.5
+        )
+
     def __repr__(self):
         return f"Directed Graph with labeled edges with\
             {len(self.vertices)} vertices and {len(self.edges)} edges"
@@ -0,0 +1,71 @@
+import os
+import json
+import hashlib
+import tempfile
+
+import numpy as np
+
+from utils import get_cache_dir
+
+
+# A name for a vertex that is the same in every process. str() is not enough
+#   for the frozenset states DFA.from_nfa makes, since set order changes
+#   with hash randomization
+def canonical_name(vertex):
+    if isinstance(vertex, (set, frozenset)):
+        return "{" + ",".join(sorted(canonical_name(v) for v in vertex)) + "}"
+    if isinstance(vertex, tuple):
+        return "(" + ",".join(canonical_name(v) for v in vertex) + ")"
+    return str(vertex)
+
+
+# Hash of everything that decides where a layout puts the vertices
+def layout_key(vertices, edges, layout, layout_scale, layout_config=None):
+    structure = {
+        "vertices": sorted(canonical_name(v) for v in vertices),
+        "edges": sorted({(canonical_name(u), canonical_name(v)) for (u, v) in edges}),
+        "layout": layout,
+        "layout_scale": layout_scale,
+        "layout_config": layout_config or dict(),
+    }
+    encoded = json.dumps(structure, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _layout_path(key):
+    return os.path.join(get_cache_dir("layouts"), key + ".json")
+
+
+# Returns {vertex: position} if the layout for this key is cached, else None
+def load_layout(key, vertices):
+    try:
+        with open(_layout_path(key), "r") as f:
+            cached = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+    positions = dict()
+    for v in vertices:
+        name = canonical_name(v)
+        if name not in cached:
+            return None
+        positions[v] = np.array(cached[name], dtype=float)
+    return positions
+
+
+def store_layout(key, positions):
+    encoded = {
+        canonical_name(v): [float(x) for x in position]
+        for v, position in positions.items()
+    }
+
+    # Write to a temporary file first so a concurrent render never reads half
+    #   of a layout
+    directory = get_cache_dir("layouts")
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps(encoded))
+        os.replace(tmp_path, _layout_path(key))
+    except OSError:
+        pass
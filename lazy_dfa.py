@@ -0,0 +1,83 @@
+from collections import OrderedDict
+
+
+class LazyDFA:
+    """Determinizes a BitsetNFA on the fly, one subset state at a time.
+
+    A subset state is the active-state mask of the NFA. Its outgoing
+    transitions are only worked out when a run actually takes them, and are
+    kept in a bounded cache that evicts the least recently used subset. The
+    cache lives as long as the LazyDFA, so repeated runs over a corpus of
+    test strings reuse the subsets earlier runs discovered.
+    """
+
+    def __init__(self, nfa, max_subsets=4096):
+        if max_subsets < 1:
+            raise ValueError("max_subsets must be at least 1")
+
+        self.nfa = nfa
+        self.max_subsets = max_subsets
+
+        # mask -> {symbol: next mask}, ordered from least to most recently used
+        self._subsets = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def initial(self):
+        return self.nfa.initial
+
+    def _row(self, mask):
+        row = self._subsets.get(mask)
+        if row is None:
+            row = dict()
+            self._subsets[mask] = row
+            if len(self._subsets) > self.max_subsets:
+                self._subsets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._subsets.move_to_end(mask)
+        return row
+
+    def step(self, mask, symbol):
+        row = self._row(mask)
+
+        nxt = row.get(symbol)
+        if nxt is None:
+            self.misses += 1
+            nxt = self.nfa.step(mask, symbol)
+            row[symbol] = nxt
+        else:
+            self.hits += 1
+        return nxt
+
+    # Returns the subset state reached after reading all of the input
+    def run(self, input_string):
+        mask = self.nfa.initial
+        for symbol in input_string:
+            mask = self.step(mask, symbol)
+            if not mask:
+                break
+        return mask
+
+    def accepts(self, input_string):
+        return self.nfa.is_accepting(self.run(input_string))
+
+    def accepts_many(self, strings):
+        return [self.accepts(string) for string in strings]
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "subsets": len(self._subsets),
+        }
+
+    def clear(self):
+        self._subsets.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
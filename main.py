@@ -1,14 +1,24 @@
 from manim import *
 from labeledEdgeDiGraph import LabeledEdgeDiGraph
 from utils import *
+from fa_manager import DFA_Manager
+from fa_binary import read_automaton
 from automata.fa.dfa import DFA
 from automata.fa.nfa import NFA
-from automata.base.exceptions import RejectionException
 import sys
-import json
 import numpy as np
 import queue
 
+# Runs the whole input once, before anything is drawn. The scenes below only
+#   animate the resulting DFATrace, so no step has to search the state or
+#   symbol lists. States and symbols keep the order of the json, which is
+#   also the order of the rows and columns of the transition tables
+def trace_input(dfa, rawJson, input_string):
+    manager = DFA_Manager.from_dfa(dfa)
+    manager.state_order = list(rawJson["states"])
+    manager.symbol_order = list(rawJson["input_symbols"])
+    return manager.trace(input_string)
+
 class DFAScene(Scene):
     def __init__(self, rawJson):
         super().__init__()
@@ -16,7 +26,7 @@ class DFAScene(Scene):
         self.rawJson = rawJson
 
         self.vertices = self.rawJson["states"]
-        self.edges = JSONtoManimEdges(self.rawJson)
+        self.edges, edge_conf = JSONtoManimEdges(self.rawJson)
         # self.loops, self.edges = self.sift_self_transitions()
 
         vertex_config = {
@@ -31,13 +41,6 @@ class DFAScene(Scene):
             if vertex == self.rawJson["initial_state"]:
                 vertex_config[vertex]["flags"].append("i")
         
-        edge_conf = dict()
-        for (u, v) in self.edges:
-            if (u, v) not in edge_conf:
-                edge_conf[(u, v)] = dict()
-            transition_name = list(self.rawJson["transitions"][u].keys())[list(self.rawJson["transitions"][u].values()).index(v)]
-            edge_conf[(u, v)]["label"] = transition_name
-
         # TODO: Figure out how to use CurvedArrow
         self.g = LabeledEdgeDiGraph(
             self.vertices,
@@ -79,31 +82,17 @@ class WatchItHappen(DFAScene):
 
     def construct(self):
         super().construct()
-        sequence = []
-        current_state = self.rawJson["initial_state"]
-        for char in self.input_string:
-            if char in self.rawJson["transitions"][current_state]:
-                next_state = self.rawJson["transitions"][current_state][char]
-
-                if next_state != current_state:
-                    sequence.append(self.g.edges[(current_state, next_state)])
-                else:
-                    sequence.append(self.loop_arcs[current_state])
-
-                current_state = next_state
-            else: break
+        trace = trace_input(self.dfa, self.rawJson, self.input_string)
+        sequence = [self.g.edges[(start, end)] for (start, end, _) in trace.transitions()]
 
         to_show = [arrow.copy().set(color=RED, stroke_width=10) for arrow in sequence]
 
-        substring = self.input_string
-        floater = Tex(substring, color=BLACK, fill_color=YELLOW)
+        floater = Tex(self.input_string, color=BLACK, fill_color=YELLOW)
 
-        for arrow in to_show:
-            char = substring[0]
-            substring = substring[1:]
+        for i, arrow in enumerate(to_show):
             self.play(
                 Create(arrow),
-                Transform(floater, Tex(str(substring), color=BLACK, fill_color=YELLOW)),
+                Transform(floater, Tex(self.input_string[i + 1:], color=BLACK, fill_color=YELLOW)),
                 MoveAlongPath(floater, arrow),
                 rate_func=linear,
                 running_time=1
@@ -142,56 +131,29 @@ class DisplayTransitionTable(Scene):
 
 class AnimateTransitionTable(DisplayTransitionTable):
     def construct(self):
-        sequence = []
-        current_state = self.rawJson["initial_state"]
-        for char in self.input_string:
-            if char in self.rawJson["transitions"][current_state]:
-                next_state = self.rawJson["transitions"][current_state][char]
-
-                sequence.append((current_state, next_state))
-
-                current_state = next_state
-            else: break
+        trace = trace_input(JSONToDFA(self.rawJson), self.rawJson, self.input_string)
 
         self.play(Create(self.table))
+        if len(trace.cells) == 0 or trace.cells[0][1] is None:
+            self.wait()
+            return
 
-        state_index = list(self.rawJson["states"]).index(self.rawJson["initial_state"]) + 2
-        trans_index = list(self.rawJson["input_symbols"]).index(self.input_string[0]) + 2
-        follower = self.table.get_cell((state_index, trans_index), color=YELLOW)
+        row, col = trace.cells[0]
+        follower = self.table.get_cell((row + 2, col + 2), color=YELLOW)
         self.play(Create(follower))
 
-        substring = self.input_string
-        floater = Tex(substring, color=BLACK, fill_color=YELLOW)
+        floater = Tex(self.input_string, color=BLACK, fill_color=YELLOW)
         self.add(floater)
 
-        current_state = self.rawJson["initial_state"]
-        next_state = self.rawJson["transitions"][current_state][self.input_string[0]]
-        for char in self.input_string:
-            char = substring[0]
-            substring = substring[1:]
+        for i, (row, col) in enumerate(trace.cells):
+            if col is None or i >= len(trace.states) - 1:
+                break
 
-            if char in self.rawJson["transitions"][current_state]:
-                if next_state != current_state:
-                    arrow = self.g.edges[(current_state, next_state)]
-                else:
-                    arrow = self.loop_arcs[current_state]
-                path = arrow.copy().set(color=RED, stroke_width=10)
-
-                state_index = list(self.rawJson["states"]).index(current_state) + 2
-                trans_index = list(self.rawJson["input_symbols"]).index(char) + 2
-
-                new_follower = self.table.get_cell((state_index, trans_index), color=YELLOW)
-                next_state = self.rawJson["transitions"][current_state][char]
-
-                self.play(
-                    Transform(follower, new_follower),
-                    Create(path),
-                    Transform(floater, Tex(str(substring), color=BLACK, fill_color=YELLOW)),
-                    MoveAlongPath(floater, path),
-                )
-                self.remove(path)
-                current_state = next_state
-            else: break
+            new_follower = self.table.get_cell((row + 2, col + 2), color=YELLOW)
+            self.play(
+                Transform(follower, new_follower),
+                Transform(floater, Tex(self.input_string[i + 1:], color=BLACK, fill_color=YELLOW)),
+            )
 
         self.wait()
 
@@ -228,85 +190,51 @@ class AnimateDFAWithTable(Scene):
     def construct(self):
         self.play(Create(self.fa_mobj), Create(self.table))
 
-        previous_state = None
-        prev_string = None
-        prev_follower = None
-
-        try:
-            for new_state in self.dfa.read_input_stepwise(self.input_string, ignore_rejection=False):
-                curr_string = Tex(self.input_string[self.live_str_index:], font_size=40, color="yellow").move_to(self.fa_mobj).shift(3*DOWN)
-
-                trans_tup = (str(previous_state), str(new_state))
-                
-                tab_state_dex = list(self.rawJson["states"]).index(str(new_state)) + 2
-                tab_trans_dex = list(self.rawJson["input_symbols"]).index(self.input_string[self.live_str_index]) + 2
-                follower = self.table.get_cell((tab_state_dex, tab_trans_dex), color="yellow")
-
-                if previous_state is None:
-                    previous_state = new_state
-                    prev_string = curr_string
-                    prev_follower = follower
-                    continue
-
-                focus_edge = self.fa_mobj.edges[trans_tup]
-                self.play(
-                    ShowPassingFlash(focus_edge.copy().set_color("0x0000ff"), time_width=0.2),
-                    ReplacementTransform(prev_string, curr_string),
-                    ReplacementTransform(prev_follower, follower)
-                )
-                self.wait(0.5)
-
-                previous_state = new_state
-                prev_string = curr_string
-                prev_follower = follower
-                self.live_str_index += 1
-
-        except RejectionException as e:
-            reject_mobj = Text(str(e) + f"\nwith input string '{self.input_string}'", font_size=15, color="red").move_to(self.fa_mobj).shift(3*UP)
-            self.play(Create(reject_mobj))
-        else:
+        trace = trace_input(self.dfa, self.rawJson, self.input_string)
+
+        # Follows the table cell about to be used and the unread input
+        def follower_for(step):
+            if step >= len(trace.cells) or trace.cells[step][1] is None:
+                return None
+            row, col = trace.cells[step]
+            return self.table.get_cell((row + 2, col + 2), color="yellow")
+
+        def string_for(step):
+            return Tex(self.input_string[step:], font_size=40, color="yellow").move_to(self.fa_mobj).shift(3*DOWN)
+
+        prev_string = string_for(0)
+        prev_follower = follower_for(0)
+
+        for step, (start, end, _) in enumerate(trace.transitions()):
+            curr_string = string_for(step + 1)
+            follower = follower_for(step + 1)
+
+            focus_edge = self.fa_mobj.edges[(start, end)]
+            animations = [
+                ShowPassingFlash(focus_edge.copy().set_color("0x0000ff"), time_width=0.2),
+                ReplacementTransform(prev_string, curr_string),
+            ]
+            if prev_follower is not None and follower is not None:
+                animations.append(ReplacementTransform(prev_follower, follower))
+            elif prev_follower is not None:
+                animations.append(FadeOut(prev_follower))
+
+            self.play(*animations)
+            self.wait(0.5)
+
+            prev_string = curr_string
+            prev_follower = follower
+
+        if trace.accepted:
             accept_mobj = Tex(f"The DFA accepted the string '{self.input_string}'", font_size=24, color="green").move_to(self.fa_mobj).shift(3*UP)
             self.play(Create(accept_mobj))
-        #
-        # state_index = list(self.rawJson["states"]).index(self.rawJson["initial_state"]) + 2
-        # trans_index = list(self.rawJson["input_symbols"]).index(self.input_string[0]) + 2
-        # follower = self.table.get_cell((state_index, trans_index), color=YELLOW)
-        # self.play(Create(follower))
-        #
-        # substring = self.input_string
-        # floater = Tex(substring, color=BLACK, fill_color=YELLOW)
-        # self.add(floater)
-        #
-        # current_state = self.rawJson["initial_state"]
-        # next_state = self.rawJson["transitions"][current_state][self.input_string[0]]
-        # for char in self.input_string:
-        #     char = substring[0]
-        #     substring = substring[1:]
-        #
-        #     if char in self.rawJson["transitions"][current_state]:
-        #         next_state = self.rawJson["transitions"][current_state][char]
-        #         
-        #         if next_state != current_state:
-        #             arrow = self.g.edges[(current_state, next_state)]
-        #         else:
-        #             arrow = self.loop_arcs[current_state]
-        #         path = arrow.copy().set(color=RED, stroke_width=10)
-        #
-        #         state_index = list(self.rawJson["states"]).index(current_state) + 2
-        #         trans_index = list(self.rawJson["input_symbols"]).index(char) + 2
-        #
-        #         new_follower = self.table.get_cell((state_index, trans_index), color=YELLOW)
-        #
-        #         self.play(
-        #             Transform(follower, new_follower),
-        #             Create(path),
-        #             Transform(floater, Tex(str(substring), color=BLACK, fill_color=YELLOW)),
-        #             MoveAlongPath(floater, path),
-        #         )
-        #         self.remove(path)
-        #
-        #         current_state = next_state
-        #     else: break
+        else:
+            if trace.stopped_at is not None:
+                reason = f"No transition from {trace.states[-1]} on '{self.input_string[trace.stopped_at]}'"
+            else:
+                reason = f"The DFA stopped on non-final state {trace.final_state}"
+            reject_mobj = Text(reason + f"\nwith input string '{self.input_string}'", font_size=15, color="red").move_to(self.fa_mobj).shift(3*UP)
+            self.play(Create(reject_mobj))
         self.wait()
 
 def main():
@@ -318,11 +246,10 @@ def main():
         else:
             picture_quality = "low_quality"
     else:
-        print("Usage: py main.py <DFA.json> <input_string> [picture_quality (default low)]")
+        print("Usage: py main.py <DFA.json|DFA.fsmb> <input_string> [picture_quality (default low)]")
         exit()
 
-    with open(dfaFilename, "r") as f:
-        rawJson = json.loads(f.read())
+    rawJson = read_automaton(dfaFilename)
 
     # TODO: Input validation. Ensure all things coming in from the json file are correctly typed and formatted
     # TODO: Error handling and prettifying.
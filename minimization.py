@@ -1,219 +1,137 @@
 from manim import *
 from labeledEdgeDiGraph import LabeledEdgeDiGraph
 from fa_manager import *
+from fa_binary import read_automaton
 
-import json
+import sys
+
+# Past this many states the pair table is unreadable (and has O(n^2) cells),
+#   so the refinement is summarized instead
+TABLE_LIMIT = 10
+
+# How many updates the summary shows, however many splits there are
+SUMMARY_FRAMES = 20
 
 class Minimize(Scene):
+    def __init__(self, rawJson):
+        super().__init__()
+        self.rawJson = rawJson
+        self.dfa = DFA_Manager.from_json(rawJson)
+
     def construct(self):
-        with open("minimize2.json", "r") as f:
-            rawJson = json.loads(f.read())
-
-        dfa = DFA_Manager.from_json(rawJson, "ababb")
-
-        # rows = list()
-        # for state in rawJson["states"]:
-        #     new_row = list()
-        #     for state2 in rawJson["states"]:
-        #         new_row.append(" ")
-        #     rows.append(new_row)
-        # table = Table(
-        #     rows,
-        #     col_labels = [Tex(x) for x in rawJson["states"]],
-        #     row_labels = [Tex(x) for x in rawJson["states"]],
-        #     top_left_entry = None,
-        #     include_outer_lines=True
-        # ).scale(0.6)
-        #
-        # self.play(Create(dfa.mobj.shift(RIGHT*3.5)), Create(table.shift(LEFT*3)))
-        # self.wait(1)
-        #
-        # new_rows = list()
-        # for i in range(len(rawJson["states"])):
-        #     new_row = list()
-        #     for j in range(len(rawJson["states"])):
-        #         if j >= i:
-        #             new_row.append("x")
-        #         else:
-        #             new_row.append(" ")
-        #     new_rows.append(new_row)
-        #
-        # new_mobj = Table(
-        #     new_rows,
-        #     col_labels = [Tex(x) for x in rawJson["states"]],
-        #     row_labels = [Tex(x) for x in rawJson["states"]],
-        #     top_left_entry = None,
-        #     include_outer_lines=True
-        # ).scale(0.6).shift(LEFT*3)
-        # 
-        # self.play(ReplacementTransform(table, new_mobj))
-        # self.wait(1)
-        #
-        # new_rows[4] = list("FF?Fxx")
-        # new_rows[5] = list("????Fx")
-        # mobj = Table(
-        #     new_rows,
-        #     col_labels = [Tex(x) for x in rawJson["states"]],
-        #     row_labels = [Tex(x) for x in rawJson["states"]],
-        #     top_left_entry = None,
-        #     include_outer_lines=True
-        # ).scale(0.6).shift(LEFT*3)
-        #
-        # self.play(ReplacementTransform(new_mobj, mobj))
-        # self.wait(1)
-        #
-        # new_rows[1][0] = "?"
-        # new_rows[2] = list("FFxxxx")
-        # new_rows[3] = list("??Fxxx")
-        # new_rows[5] = list("??F?Fx")
-        #
-        # new_mobj = Table(
-        #     new_rows,
-        #     col_labels = [Tex(x) for x in rawJson["states"]],
-        #     row_labels = [Tex(x) for x in rawJson["states"]],
-        #     top_left_entry = None,
-        #     include_outer_lines=True
-        # ).scale(0.6).shift(LEFT*3)
-        #
-        # self.play(ReplacementTransform(mobj, new_mobj))
-        # self.wait(1)
-        #
-        # new_rows[1][0] = "F"
-        # new_rows[3] = list("F?Fxxx")
-        # new_rows[4] = list("FFFFxx")
-        # new_rows[5] = list("FFF?Fx")
-        #
-        # mobj = Table(
-        #     new_rows,
-        #     col_labels = [Tex(x) for x in rawJson["states"]],
-        #     row_labels = [Tex(x) for x in rawJson["states"]],
-        #     top_left_entry = None,
-        #     include_outer_lines=True
-        # ).scale(0.6).shift(LEFT*3)
-        #
-        # self.play(ReplacementTransform(new_mobj, mobj))
-        # self.wait(1)
-        #
-        # new_rows[3] = list("FFFxxx")
-        # new_rows[5] = list("FFFFFx")
-        #
-        # new_mobj = Table(
-        #     new_rows,
-        #     col_labels = [Tex(x) for x in rawJson["states"]],
-        #     row_labels = [Tex(x) for x in rawJson["states"]],
-        #     top_left_entry = None,
-        #     include_outer_lines=True
-        # ).scale(0.6).shift(LEFT*3)
-        #
-        # self.play(ReplacementTransform(mobj, new_mobj))
-        # self.wait(2)
-        # self.clear()
-        # self.play(Create(Text("The DFA was already minimized")))
-        # self.wait()
+        minimizer = self.dfa.minimizer()
+        n = len(self.rawJson["states"])
 
-        rows = list()
-        for state in rawJson["states"]:
-            new_row = list()
-            for state2 in rawJson["states"]:
-                new_row.append(" ")
-            rows.append(new_row)
-        table = Table(
-            rows,
-            col_labels = [Tex(x) for x in rawJson["states"]],
-            row_labels = [Tex(x) for x in rawJson["states"]],
-            top_left_entry = None,
-            include_outer_lines=True
-        ).scale(0.6)
+        if n <= TABLE_LIMIT:
+            self.animate_table(minimizer)
+        else:
+            self.animate_summary(minimizer)
 
-        self.play(Create(dfa.mobj.shift(RIGHT*3.5)), Create(table.shift(LEFT*3)))
-        self.wait(1)
+        self.wait(2)
+        self.clear()
 
-        new_rows = list()
-        for i in range(len(rawJson["states"])):
+        minimized = minimizer.minimized()
+        if len(minimized.states) == n:
+            self.play(Create(Text("The DFA was already minimized")))
+        elif len(minimized.states) <= TABLE_LIMIT:
+            new_dfa = DFA_Manager.from_dfa(minimized)
+            self.play(Create(new_dfa.mobj))
+            self.wait()
+            self.play(Create(Text("The new, minimized DFA").shift(UP*3)))
+        else:
+            self.play(Create(Text(f"{n} states minimized to {len(minimized.states)}")))
+        self.wait()
+
+    # The classic table of state pairs. Every split marks the pairs it
+    #   separates with F, and the pairs never marked are equivalent (T)
+    def animate_table(self, minimizer):
+        states = self.rawJson["states"]
+        index = {state: i for i, state in enumerate(states)}
+
+        rows = list()
+        for i in range(len(states)):
             new_row = list()
-            for j in range(len(rawJson["states"])):
+            for j in range(len(states)):
                 if j >= i:
                     new_row.append("x")
                 else:
                     new_row.append(" ")
-            new_rows.append(new_row)
-
-        new_mobj = Table(
-            new_rows,
-            col_labels = [Tex(x) for x in rawJson["states"]],
-            row_labels = [Tex(x) for x in rawJson["states"]],
-            top_left_entry = None,
-            include_outer_lines=True
-        ).scale(0.6).shift(LEFT*3)
-        
-        self.play(ReplacementTransform(table, new_mobj))
-        self.wait(1)
-
-        new_rows[2] = list("FFxxxx")
-        new_rows[3] = list("??Fxxx")
-        new_rows[5] = list("???F?x")
-        mobj = Table(
-            new_rows,
-            col_labels = [Tex(x) for x in rawJson["states"]],
-            row_labels = [Tex(x) for x in rawJson["states"]],
-            top_left_entry = None,
-            include_outer_lines=True
-        ).scale(0.6).shift(LEFT*3)
-
-        self.play(ReplacementTransform(new_mobj, mobj))
-        self.wait(1)
-
-        new_rows[4] = list("FF?Fxx")
-
-        new_mobj = Table(
-            new_rows,
-            col_labels = [Tex(x) for x in rawJson["states"]],
-            row_labels = [Tex(x) for x in rawJson["states"]],
-            top_left_entry = None,
-            include_outer_lines=True
-        ).scale(0.6).shift(LEFT*3)
-
-        self.play(ReplacementTransform(mobj, new_mobj))
-        self.wait(1)
-
-        new_rows[1][0] = "F"
-        new_rows[3][0] = "F"
-        new_rows[4][2] = "T"
-        new_rows[5] = list("F?FTFx")
+            rows.append(new_row)
 
-        mobj = Table(
-            new_rows,
-            col_labels = [Tex(x) for x in rawJson["states"]],
-            row_labels = [Tex(x) for x in rawJson["states"]],
+        table = Table(
+            rows,
+            col_labels = [Tex(x) for x in states],
+            row_labels = [Tex(x) for x in states],
             top_left_entry = None,
             include_outer_lines=True
         ).scale(0.6).shift(LEFT*3)
 
-        self.play(ReplacementTransform(new_mobj, mobj))
+        self.play(Create(self.dfa.mobj.shift(RIGHT*3.5)), Create(table))
         self.wait(1)
 
-        new_rows[3] = list("FTFxxx")
-        new_rows[4] = list("FFTFxx")
-        new_rows[5] = list("FTFTFx")
-
-        new_mobj = Table(
-            new_rows,
-            col_labels = [Tex(x) for x in rawJson["states"]],
-            row_labels = [Tex(x) for x in rawJson["states"]],
-            top_left_entry = None,
-            include_outer_lines=True
-        ).scale(0.6).shift(LEFT*3)
-
-        self.play(ReplacementTransform(mobj, new_mobj))
-        self.wait(2)
-        self.clear()
-        new_dfa = DFA_Manager.from_dfa(dfa.auto.minify())
-        self.play(Create(new_dfa.mobj))
-        self.wait()
-        self.play(Create(Text("The new, minimized DFA").shift(UP*3)))
-        self.wait()
+        def mark(p, q, symbol):
+            i, j = max(index[p], index[q]), min(index[p], index[q])
+            entry = table.get_entries((i + 2, j + 2))
+            return Transform(entry, Tex(symbol).scale(0.6).move_to(entry))
+
+        caption = Text("").to_edge(DOWN)
+        marked = set()
+        for event in minimizer.events():
+            pairs = event.marked_pairs()
+            marked.update(frozenset(pair) for pair in pairs)
+
+            if event.splitter is None:
+                reason = "Final states are distinguishable from non-final states"
+            else:
+                moved = ", ".join(sorted(map(str, event.moved)))
+                reason = f"On '{event.symbol}', {moved} lead somewhere the rest of their block does not"
+            new_caption = Text(reason, font_size=20).to_edge(DOWN)
+
+            self.play(*[mark(p, q, "F") for p, q in pairs], Transform(caption, new_caption))
+            self.wait(1)
+
+        equivalent = [
+            mark(states[i], states[j], "T")
+            for i in range(len(states)) for j in range(i)
+            if frozenset((states[i], states[j])) not in marked
+        ]
+        if equivalent:
+            self.play(*equivalent, FadeOut(caption))
+
+    # For big DFAs: a running count of blocks, updated a fixed number of times
+    def animate_summary(self, minimizer):
+        n = len(self.rawJson["states"])
+        every = max(1, n // SUMMARY_FRAMES)
+
+        title = Text(f"Minimizing a DFA with {n} states").shift(UP*2)
+        counter = Text("1 block").next_to(title, DOWN*2)
+        self.play(Create(title), FadeIn(counter))
+
+        largest = 0
+        last = None
+        for event in minimizer.events():
+            blocks = minimizer.block_count()
+            largest = max(largest, len(event.moved))
+            last = event
+
+            if event.step % every == 0:
+                new_counter = Text(
+                    f"{blocks} blocks after {event.step + 1} splits\n"
+                    f"largest split: {largest} states", font_size=32
+                ).move_to(counter)
+                self.play(Transform(counter, new_counter), run_time=0.3)
+
+        if last is not None and last.step % every != 0:
+            new_counter = Text(
+                f"{blocks} blocks after {last.step + 1} splits\n"
+                f"largest split: {largest} states", font_size=32
+            ).move_to(counter)
+            self.play(Transform(counter, new_counter), run_time=0.3)
 
 if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else "minimize2.json"
+    rawJson = read_automaton(filename)
+
     with tempconfig({"quality": "high_quality", "preview": True}):
-        scene = Minimize()
+        scene = Minimize(rawJson)
         scene.render()
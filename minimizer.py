@@ -0,0 +1,289 @@
+from collections import deque
+
+from automata.fa.dfa import DFA
+
+
+class Minimizer:
+    """Hopcroft's partition refinement over a (possibly partial) DFA.
+
+    States start out in two blocks, final and non-final, and blocks are split
+    until every block is a set of equivalent states. Refinement is exposed as
+    a stream of BlockSplit events so a scene can draw it as it happens.
+    Splitting always keeps the smaller half on the worklist, so the whole
+    refinement is O(n log n) per input symbol.
+
+    A partial DFA is completed with a sink (internally the state id n) that
+    every missing transition leads to. The sink takes part in refinement but
+    never shows up in events or results.
+    """
+
+    def __init__(self, dfa, states=None, symbols=None):
+        if states is None:
+            states = sorted(dfa.states, key=str)
+        if symbols is None:
+            symbols = sorted(dfa.input_symbols, key=str)
+
+        self.dfa = dfa
+        self.states = list(states)
+        self.symbols = list(symbols)
+        self.state_ids = {state: i for i, state in enumerate(self.states)}
+
+        n = len(self.states)
+        self.sink = n
+
+        # Predecessor lists per symbol, the only direction refinement needs
+        self._preds = [[list() for _ in range(n + 1)] for _ in self.symbols]
+        partial = False
+        for q, state in enumerate(self.states):
+            paths = dfa.transitions.get(state, dict())
+            for c, symbol in enumerate(self.symbols):
+                end = paths.get(symbol)
+                if end is None:
+                    partial = True
+                    self._preds[c][self.sink].append(q)
+                else:
+                    self._preds[c][self.state_ids[end]].append(q)
+
+        self.partial = partial
+        if partial:
+            for c in range(len(self.symbols)):
+                self._preds[c][self.sink].append(self.sink)
+
+        self._blocks = None
+        self._block_of = None
+        self._done = False
+
+    # Every block as a frozenset of state names, without the sink
+    def _names(self, ids):
+        return frozenset(self.states[q] for q in ids if q != self.sink)
+
+    ## Refinement ##
+
+    # Runs the refinement, yielding a BlockSplit for each split. An event's
+    #   kept side reads the live partition, so it is only accurate until the
+    #   next event is asked for
+    def events(self):
+        n = len(self.states) + (1 if self.partial else 0)
+        final = {self.state_ids[state] for state in self.dfa.final_states}
+
+        accepting = [q for q in range(n) if q in final]
+        rejecting = [q for q in range(n) if q not in final]
+
+        self._blocks = [set(rejecting)] if rejecting else list()
+        self._block_of = [0] * n
+        step = 0
+
+        worklist = deque()
+        waiting = set()
+
+        def schedule(block, symbol):
+            if (block, symbol) not in waiting:
+                waiting.add((block, symbol))
+                worklist.append((block, symbol))
+
+        if accepting:
+            if rejecting:
+                self._blocks.append(set(accepting))
+                for q in accepting:
+                    self._block_of[q] = 1
+
+                yield BlockSplit(self, step, 0, 1, accepting, None, None)
+                step += 1
+
+                smaller = 1 if len(accepting) <= len(rejecting) else 0
+            else:
+                self._blocks.append(set(accepting))
+                smaller = 0
+
+            for c in range(len(self.symbols)):
+                schedule(smaller, c)
+
+        while worklist:
+            splitter, c = worklist.popleft()
+            waiting.discard((splitter, c))
+
+            # States with a c-transition into the splitter, grouped by block
+            touched = dict()
+            for target in self._blocks[splitter]:
+                for q in self._preds[c][target]:
+                    touched.setdefault(self._block_of[q], list()).append(q)
+
+            for block, moved in touched.items():
+                if len(moved) == len(self._blocks[block]):
+                    continue
+
+                new_block = len(self._blocks)
+                self._blocks[block].difference_update(moved)
+                self._blocks.append(set(moved))
+                for q in moved:
+                    self._block_of[q] = new_block
+
+                yield BlockSplit(self, step, block, new_block, moved, splitter, self.symbols[c])
+                step += 1
+
+                for d in range(len(self.symbols)):
+                    if (block, d) in waiting:
+                        schedule(new_block, d)
+                    elif len(moved) <= len(self._blocks[block]):
+                        schedule(new_block, d)
+                    else:
+                        schedule(block, d)
+
+        self._done = True
+
+    # How many blocks the partition has right now, not counting a block that
+    #   holds only the sink. Unlike blocks(), this can be asked between events
+    def block_count(self):
+        if self._blocks is None:
+            return 1
+        if self.partial and len(self._blocks[self._block_of[self.sink]]) == 1:
+            return len(self._blocks) - 1
+        return len(self._blocks)
+
+    def run(self):
+        if not self._done:
+            for _ in self.events():
+                pass
+        return self
+
+    ## Results ##
+
+    # The final partition, as frozensets of state names. Blocks holding only
+    #   the sink are left out
+    def blocks(self):
+        self.run()
+        return [names for names in map(self._names, self._blocks) if names]
+
+    def block_of(self, state):
+        self.run()
+        return self._names(self._blocks[self._block_of[self.state_ids[state]]])
+
+    # The minimal DFA. Merged states are named "{a,b}", unmerged ones keep
+    #   their name, and blocks that cannot be reached from the start are dropped
+    def minimized(self):
+        self.run()
+
+        def name_of(block):
+            names = self._names(self._blocks[block])
+            if len(names) == 1:
+                return next(iter(names))
+            return "{" + ",".join(sorted(map(str, names))) + "}"
+
+        # In a partial DFA, real states equivalent to the sink are dead
+        #   states. They are dropped along with the sink, so the result stays
+        #   partial
+        sink_block = self._block_of[self.sink] if self.partial else None
+        start = self._block_of[self.state_ids[self.dfa.initial_state]]
+
+        transitions = dict()
+        final_states = set()
+        queue = deque([start])
+        seen = {start}
+        while queue:
+            block = queue.popleft()
+            representative = next(q for q in self._blocks[block] if q != self.sink)
+            paths = self.dfa.transitions.get(self.states[representative], dict())
+
+            row = dict()
+            for symbol in self.symbols:
+                end = paths.get(symbol)
+                if end is None:
+                    continue
+                end_block = self._block_of[self.state_ids[end]]
+                if end_block == sink_block:
+                    continue
+
+                row[symbol] = name_of(end_block)
+                if end_block not in seen:
+                    seen.add(end_block)
+                    queue.append(end_block)
+
+            transitions[name_of(block)] = row
+            if self.states[representative] in self.dfa.final_states:
+                final_states.add(name_of(block))
+
+        return DFA(
+            states        = set(transitions),
+            input_symbols = set(self.symbols),
+            transitions   = transitions,
+            initial_state = name_of(start),
+            final_states  = final_states,
+            allow_partial = self.partial,
+        )
+
+
+class BlockSplit:
+    """One refinement step: `moved` left block `block` to form `new_block`.
+
+    The first event (splitter None) is the final/non-final split. After that,
+    each split happens because the moved states have a `symbol` transition
+    into block `splitter` and the states left behind do not.
+    """
+
+    def __init__(self, minimizer, step, block, new_block, moved, splitter, symbol):
+        self._minimizer = minimizer
+        self.step = step
+        self.block = block
+        self.new_block = new_block
+        self.moved = minimizer._names(moved)
+        self.splitter = splitter
+        self.symbol = symbol
+
+    # The states left in the old block. Read from the live partition
+    @property
+    def kept(self):
+        return self._minimizer._names(self._minimizer._blocks[self.block])
+
+    # Every pair this split proves distinguishable. There are O(n^2) of these
+    #   over a whole run, so this is for drawing pair tables of small DFAs
+    def marked_pairs(self):
+        kept = self.kept
+        return [(p, q) for p in self.moved for q in kept]
+
+    def __repr__(self):
+        on = "final states" if self.splitter is None else f"{self.symbol} into block {self.splitter}"
+        return f"BlockSplit({len(self.moved)} states out of block {self.block} on {on})"
+
+
+# Two DFAs get the same canonical form exactly when they accept the same
+#   strings. It is the minimal DFA with its dead states dropped, numbered in
+#   breadth first order from the start, reading symbols in sorted order
+def canonical_form(dfa):
+    minimal = Minimizer(dfa).minimized()
+    symbols = sorted(minimal.input_symbols, key=str)
+
+    # Live states are the ones that can still reach an accepting state
+    predecessors = {state: list() for state in minimal.states}
+    for start, paths in minimal.transitions.items():
+        for end in paths.values():
+            predecessors[end].append(start)
+
+    live = set(minimal.final_states)
+    frontier = deque(live)
+    while frontier:
+        state = frontier.popleft()
+        for start in predecessors[state]:
+            if start not in live:
+                live.add(start)
+                frontier.append(start)
+
+    if minimal.initial_state not in live:
+        return ((), ())
+
+    number = {minimal.initial_state: 0}
+    order = [minimal.initial_state]
+    rows = list()
+    for state in order:
+        row = list()
+        for symbol in symbols:
+            end = minimal.transitions.get(state, dict()).get(symbol)
+            if end is None or end not in live:
+                continue
+            if end not in number:
+                number[end] = len(order)
+                order.append(end)
+            row.append((symbol, number[end]))
+        rows.append(tuple(row))
+
+    finals = tuple(sorted(number[state] for state in minimal.final_states if state in number))
+    return (tuple(rows), finals)
@@ -1,17 +1,29 @@
 import sys
-import json
 
 from manim import *
 from labeledEdgeDiGraph import LabeledEdgeDiGraph
 from utils import *
+from fa_manager import NFA_Manager
+from fa_binary import read_automaton
+from minimizer import Minimizer
+from subset_construction import SubsetDiscovered
+from exceptions import StateBudgetExceeded
+
+# More DFA states than this would not fit on screen anyway
+DEFAULT_MAX_STATES = 64
 
 class NFA_DFA_Conversion(Scene):
-    def __init__(self, rawJson):
+    def __init__(self, rawJson, max_states=DEFAULT_MAX_STATES):
         super().__init__()
         self.rawJson = rawJson
 
         self.nfa = JSONToNFA(rawJson)
 
+        # The subset construction runs here, before anything is rendered, so a
+        #   conversion that blows past max_states fails straight away
+        self.conversion = NFA_Manager.from_nfa(self.nfa).determinize(max_states)
+        self.conversion_events = list(self.conversion.events())
+
         self.mobj = FAToMobj(self.nfa).shift(3*RIGHT)
 
         self.checklist = BulletedList(
@@ -34,43 +46,35 @@ class NFA_DFA_Conversion(Scene):
         
         return anims
 
+    # Grows the DFA one subset at a time, in the order the construction
+    #   discovered them. Each new state appears along with the transitions
+    #   found right after it, on the layout of the finished DFA
     def anim_remove_ambig(self):
-        self.nfa = DFA.from_nfa(self.nfa, minify=False)
-        new_transitions = {
-            "q" + str(start): {
-                symbol: "q" + str(self.nfa.transitions[start][symbol]) for symbol in self.nfa.transitions[start]
-            } for start in self.nfa.transitions
-        }
-        self.nfa = DFA(
-            states = set(["q" + str(state) for state in self.nfa.states]),
-            input_symbols=set(self.nfa.input_symbols),
-            transitions=new_transitions,
-            initial_state="q" + str(self.nfa.initial_state),
-            final_states = set(["q" + str(state) for state in self.nfa.final_states]),
-            allow_partial=True
-        )
+        self.nfa = self.conversion.dfa()
         new_mobj = FAToMobj(self.nfa).shift(3*RIGHT)
 
-        anims = [Indicate(self.checklist[2]), FadeTransform(self.mobj, new_mobj)]
+        yield [Indicate(self.checklist[2]), FadeOut(self.mobj)]
+
+        shown = set()
+        anims = list()
+        for event in self.conversion_events:
+            if isinstance(event, SubsetDiscovered):
+                if anims:
+                    yield anims
+                anims = [FadeIn(new_mobj.vertices[event.name])]
+            elif (event.start, event.end) not in shown:
+                shown.add((event.start, event.end))
+                anims.append(Create(new_mobj.edges[(event.start, event.end)]))
+        if anims:
+            yield anims
+
+        # Swap the pieces for the graph itself, so later steps can transform it
+        self.remove(*new_mobj.vertices.values(), *new_mobj.edges.values())
+        self.add(new_mobj)
         self.mobj = new_mobj
 
-        return anims
-
     def anim_minify(self):
-        self.nfa = self.nfa.minify()
-        new_transitions = {
-            "q" + str(start): {
-                symbol: "q" + str(self.nfa.transitions[start][symbol]) for symbol in self.nfa.transitions[start]
-            } for start in self.nfa.transitions
-        }
-        self.nfa = DFA(
-            states = set(["q" + str(state) for state in self.nfa.states]),
-            input_symbols=set(self.nfa.input_symbols),
-            transitions=new_transitions,
-            initial_state="q" + str(self.nfa.initial_state),
-            final_states = set(["q" + str(state) for state in self.nfa.final_states]),
-            allow_partial=True
-        )
+        self.nfa = Minimizer(self.nfa).minimized()
         new_mobj = FAToMobj(self.nfa).shift(3*RIGHT)
 
         anims = [Indicate(self.checklist[3]), FadeTransform(self.mobj, new_mobj)]
@@ -84,7 +88,8 @@ class NFA_DFA_Conversion(Scene):
         self.wait(2)
         self.play(*self.anim_remove_ep())
         self.wait(2)
-        self.play(*self.anim_remove_ambig())
+        for anims in self.anim_remove_ambig():
+            self.play(*anims)
         self.wait(2)
         self.play(*self.anim_minify())
         self.wait(2)
@@ -100,15 +105,18 @@ def main(args):
         print("Usage: python nfa_dfa.py <NFA.json> [picture_quality (default low)]")
         exit(code=2)
 
-    with open(nfaFilename, "r") as f:
-        rawJson = json.loads(f.read())
+    rawJson = read_automaton(nfaFilename)
 
     # TODO: Input validation. Ensure all things coming in from the json file are correctly typed and formatted
     # TODO: Error handling and prettifying.
     #   Try to decipher what could go wrong with the DFA lib and translate to readable errors
 
     with tempconfig({"quality": picture_quality, "preview": True}):
-        scene = NFA_DFA_Conversion(rawJson)
+        try:
+            scene = NFA_DFA_Conversion(rawJson)
+        except StateBudgetExceeded as e:
+            print(f"Can't animate this conversion: {e}", file=sys.stderr)
+            exit(code=1)
         scene.render()
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+from exceptions import InvalidInputException
+
+# Pump counts tried when looking for one that leaves the language. i = 1 gives
+#   back the original string, so it is skipped
+DEFAULT_PUMP_COUNTS = (0, 2, 3, 4, 5)
+
+
+class PumpingDecomposition:
+    """The split w = xyz the pumping lemma promises for a string w on a DFA.
+
+    y is the stretch of input between the first two visits to the same state
+    (loop_state), so |xy| <= p and |y| >= 1, and x y^i z ends in the same
+    state as w for every i. path holds the states visited while reading xy.
+    """
+
+    def __init__(self, dfa, string, x_end, y_end, path):
+        self.dfa = dfa
+        self.string = string
+
+        self.x = string[:x_end]
+        self.y = string[x_end:y_end]
+        self.z = string[y_end:]
+
+        self.path = path
+        self.loop_state = path[x_end]
+
+    def pumped(self, i):
+        return self.x + self.y * i + self.z
+
+    # The pump counts (from counts) whose pumped string is not in the
+    #   language, judged by in_language. These are the i that finish a proof
+    def leaving_counts(self, in_language, counts=DEFAULT_PUMP_COUNTS):
+        return [i for i in counts if not in_language(self.pumped(i))]
+
+    ## The transitions taken by each part, as (start, end) edges ##
+    def x_edges(self):
+        return list(zip(self.path[:len(self.x)], self.path[1:len(self.x) + 1]))
+
+    def y_edges(self):
+        return list(zip(self.path[len(self.x):-1], self.path[len(self.x) + 1:]))
+
+    # Stops early if z falls off a partial DFA
+    def z_edges(self):
+        edges = list()
+        state = self.loop_state
+        for symbol in self.z:
+            nxt = self.dfa._get_next_current_state(state, symbol)
+            if nxt is None:
+                break
+            edges.append((state, nxt))
+            state = nxt
+        return edges
+
+    def __repr__(self):
+        return f"PumpingDecomposition(x='{self.x}', y='{self.y}', z='{self.z}', loop at {self.loop_state})"
+
+
+# One pass over the string, stopping at the first state the run visits twice.
+#   Any string at least as long as the number of states has such a repeat
+def find_decomposition(dfa, string):
+    state = dfa.initial_state
+    path = [state]
+    first_visit = {state: 0}
+
+    for i, symbol in enumerate(string):
+        state = dfa._get_next_current_state(state, symbol)
+        if state is None:
+            raise InvalidInputException(f"No transition on '{symbol}' at position {i}")
+        path.append(state)
+
+        if state in first_visit:
+            return PumpingDecomposition(dfa, string, first_visit[state], i + 1, path)
+        first_visit[state] = i + 1
+
+    raise ValueError(
+        f"The run on '{string}' never repeats a state. Pumping needs a string of "
+        f"length at least {len(dfa.states)}"
+    )
+
+
+# Membership in 0^n 1^n, the language the demo proves non-regular
+def zeros_then_ones(string):
+    n = len(string) // 2
+    return len(string) % 2 == 0 and string == "0" * n + "1" * n
@@ -1,17 +1,33 @@
 import sys
-import json
 
 from manim import *
 from utils import *
 from labeledEdgeDiGraph import LabeledEdgeDiGraph
+from pumping import find_decomposition, zeros_then_ones
+from fa_binary import read_automaton
+
+def tex_string(string):
+    return string if string != "" else "\\epsilon"
 
 class Pumping_Demo(Scene):
-    def __init__(self, rawJson):
+    # The string defaults to 0^p 1^p, and in_language to membership in 0^n 1^n,
+    #   matching the claim the scene narrates
+    def __init__(self, rawJson, string=None, in_language=zeros_then_ones):
         super().__init__()
         self.rawJson = rawJson
 
         self.nfa = JSONToDFA(rawJson)
 
+        self.p = len(self.nfa.states)
+        if string is None:
+            string = "0" * self.p + "1" * self.p
+        self.string = string
+
+        # Everything the proof needs is worked out before anything is drawn
+        self.decomposition = find_decomposition(self.nfa, string)
+        self.leaving = self.decomposition.leaving_counts(in_language)
+        self.i = self.leaving[0] if self.leaving else 2
+
         self.mobj = FAToMobj(self.nfa).shift(3*RIGHT)
 
         self.checklist = BulletedList(
@@ -53,7 +69,7 @@ class Pumping_Demo(Scene):
         return anims
 
     def anim_step4(self):
-        desc = Tex("Let $p$ be the number of states of $M$. For simplicity, we have illustrated\\\\ a DFA with 3 states, but it could be any finite number.", font_size=24).shift(3*RIGHT).shift(UP)
+        desc = Tex(f"Let $p$ be the number of states of $M$. For simplicity, we have illustrated\\\\ a DFA with {self.p} states, but it could be any finite number.", font_size=24).shift(3*RIGHT).shift(UP)
         self.remove(self.right)
         anims = [Indicate(self.checklist[3]), FadeIn(desc)]
         self.right = desc
@@ -61,7 +77,7 @@ class Pumping_Demo(Scene):
 
     def anim_step5(self):
         desc = Tex("Choose the string $w$ using the format $0^p 1^p$.\\\\This guarantees $w$ has a length of at least $p$\\\\and that there are $p$ $0$s, which will\\\\become important later", font_size=24).shift(3*RIGHT).shift(2.5*UP)
-        self.l = Tex("$000111$", font_size=24, color="yellow").shift(3*RIGHT).shift(UP)
+        self.l = Tex(f"${self.string}$", font_size=24, color="yellow").shift(3*RIGHT).shift(UP)
         self.remove(self.right)
         anims = [Indicate(self.checklist[4]), ReplacementTransform(self.right, desc), Create(self.l)]
         self.right = desc
@@ -69,7 +85,7 @@ class Pumping_Demo(Scene):
 
     def anim_step6(self):
         desc = Tex("We next observe and state that the pumping lemma for regular languages holds for this string. $w$ is an element of the language of $L$ by definition, and it has a length greater than $p$. Therefore the pumping lemma holds for $w$", font_size=24).shift(3*RIGHT).shift(2.5*UP)
-        self.l = Tex("$000111$", font_size=24, color="yellow").shift(3*RIGHT).shift(UP)
+        self.l = Tex(f"${self.string}$", font_size=24, color="yellow").shift(3*RIGHT).shift(UP)
         self.remove(self.right)
         anims = [Indicate(self.checklist[5]), ReplacementTransform(self.right, desc), Create(self.l)]
         self.right = desc
@@ -77,22 +93,41 @@ class Pumping_Demo(Scene):
 
     def anim_step7(self):
         desc = Tex("We next use the pumping lemma rule to identify the different decompositions of $w$ into $x$, $y$, and $z$. We need to determine that all valid possibilities of how $w$ could be split will still break out of the language", font_size=24).shift(3*RIGHT).shift(2.5*UP)
-        self.l = Tex("$000111$", font_size=24, color="yellow").shift(3*RIGHT).shift(UP)
+        self.l = Tex(f"${self.string}$", font_size=24, color="yellow").shift(3*RIGHT).shift(UP)
         self.remove(self.right)
         self.right = desc
-        return [Indicate(self.checklist[6]), ReplacementTransform(self.l, MathTex("""x=0^\\alpha, y=0^\\beta, z=1^{p - \\alpha - \\beta}""", font_size=24, color="yellow").move_to(self.l))]
-
+        d = self.decomposition
+        xyz = MathTex(
+            f"x={tex_string(d.x)}, y={tex_string(d.y)}, z={tex_string(d.z)}",
+            font_size=24, color="yellow"
+        ).move_to(self.l)
+        return [Indicate(self.checklist[6]), ReplacementTransform(self.l, xyz)]
+
+    # Reads x once, loops around y i times and finishes with z, flashing each
+    #   transition of the decomposition on the DFA
     def anim_step8(self):
+        d = self.decomposition
+
         self.remove(self.l)
-        self.play(Create(Tex("Let $i = 2$", font_size=24, color="red").move_to(self.l).shift(0.5*UP)))
-        self.play(Indicate(self.checklist[7]), ShowPassingFlash(self.mobj.edges[('q0', 'q1')].copy()), ReplacementTransform(self.l, MathTex("""y=0^\\beta, z=1^{p-\\alpha-\\beta}""", font_size=24, color="yellow").move_to(self.l)))
-        self.remove(self.l)
+        if self.leaving:
+            self.play(Create(Tex(f"Let $i = {self.i}$", font_size=24, color="red").move_to(self.l).shift(0.5*UP)))
+        else:
+            self.play(Create(Tex(f"No $i$ we tried leaves the language. Let $i = {self.i}$ anyway", font_size=24, color="red").move_to(self.l).shift(0.5*UP)))
+
+        pumped = MathTex(f"x y^{{{self.i}}} z = {tex_string(d.pumped(self.i))}", font_size=24, color="yellow").move_to(self.l)
+        self.play(Indicate(self.checklist[7]), ReplacementTransform(self.l, pumped))
+        self.l = pumped
+
+        for edge in d.x_edges():
+            self.play(ShowPassingFlash(self.mobj.edges[edge].copy()))
         self.wait(0.5)
 
-        self.play(ShowPassingFlash(self.mobj.edges[('q1', 'q1')].copy()))
-        self.play(ShowPassingFlash(self.mobj.edges[('q1', 'q1')].copy()))
+        for _ in range(self.i):
+            for edge in d.y_edges():
+                self.play(ShowPassingFlash(self.mobj.edges[edge].copy()))
 
-        return [ShowPassingFlash(self.mobj.edges[('q1', 'q2')].copy()), Uncreate(self.l)]
+        z_flashes = [ShowPassingFlash(self.mobj.edges[edge].copy()) for edge in d.z_edges()]
+        return [Succession(*z_flashes), Uncreate(self.l)] if z_flashes else [Uncreate(self.l)]
 
     def anim_step9(self):
         self.remove(self.l)
@@ -129,11 +164,10 @@ def main(args):
         else:
             picture_quality = "medium_quality"
     else:
-        print("Usage: python pumping_demo.py <DFA.json> [picture_quality (default low)]")
+        print("Usage: python pumping_demo.py <DFA.json|DFA.fsmb> [picture_quality (default low)]")
         exit(code=2)
 
-    with open(dfaFilename, "r") as f:
-        rawJson = json.loads(f.read())
+    rawJson = read_automaton(dfaFilename)
 
     with tempconfig({"quality": picture_quality, "preview": True}):
         scene = Pumping_Demo(rawJson)
@@ -0,0 +1,141 @@
+from collections import deque
+
+from automata.fa.dfa import DFA
+
+from exceptions import StateBudgetExceeded
+
+
+class SubsetConstruction:
+    """Determinizes a BitsetNFA, exploring only the subsets it can reach.
+
+    Subsets are discovered breadth first from the closed initial set and
+    numbered in the order they are found, so the resulting DFA states are
+    q0, q1, ... with q0 the start. Epsilon closures are not recomputed here:
+    the BitsetNFA stores every successor mask already closed. The empty set
+    is never built; a symbol that leads nowhere simply has no transition.
+
+    Discovering more than max_states subsets raises StateBudgetExceeded, so
+    a conversion that would blow up stops at the budget instead of running
+    (or rendering) forever.
+    """
+
+    def __init__(self, nfa, max_states=256):
+        if max_states < 1:
+            raise ValueError("max_states must be at least 1")
+
+        self.nfa = nfa
+        self.max_states = max_states
+
+        # Discovery order: masks[i] is the subset named q<i>
+        self.masks = list()
+        self.ids = dict()
+        self.transitions = list()
+
+        self._done = False
+
+    @staticmethod
+    def name(index):
+        return "q" + str(index)
+
+    def _discover(self, mask, source, symbol):
+        if len(self.masks) == self.max_states:
+            raise StateBudgetExceeded(
+                f"Subset construction needs more than {self.max_states} states"
+            )
+
+        index = len(self.masks)
+        self.ids[mask] = index
+        self.masks.append(mask)
+        return SubsetDiscovered(self, index, source, symbol)
+
+    # Runs the construction, yielding a SubsetDiscovered for every new subset
+    #   and a SubsetTransition for every DFA transition, in the order found
+    def events(self):
+        self.masks.clear()
+        self.ids.clear()
+        self.transitions.clear()
+
+        yield self._discover(self.nfa.initial, None, None)
+
+        frontier = deque([0])
+        while frontier:
+            index = frontier.popleft()
+            mask = self.masks[index]
+
+            for symbol in self.nfa.symbols:
+                nxt = self.nfa.step(mask, symbol)
+                if not nxt:
+                    continue
+
+                end = self.ids.get(nxt)
+                if end is None:
+                    yield self._discover(nxt, index, symbol)
+                    end = len(self.masks) - 1
+                    frontier.append(end)
+
+                self.transitions.append((index, symbol, end))
+                yield SubsetTransition(self, index, symbol, end)
+
+        self._done = True
+
+    def run(self):
+        if not self._done:
+            for _ in self.events():
+                pass
+        return self
+
+    ## Results ##
+
+    # DFA state name -> the NFA states it stands for
+    def subsets(self):
+        self.run()
+        return {self.name(i): self.nfa.decode(mask) for i, mask in enumerate(self.masks)}
+
+    def dfa(self):
+        self.run()
+
+        transitions = {self.name(i): dict() for i in range(len(self.masks))}
+        for start, symbol, end in self.transitions:
+            transitions[self.name(start)][symbol] = self.name(end)
+
+        return DFA(
+            states        = set(transitions),
+            input_symbols = set(self.nfa.symbols),
+            transitions   = transitions,
+            initial_state = self.name(0),
+            final_states  = {
+                self.name(i) for i, mask in enumerate(self.masks) if self.nfa.is_accepting(mask)
+            },
+            allow_partial = True,
+        )
+
+
+class SubsetDiscovered:
+    """A new DFA state. source and symbol say which transition found it"""
+
+    def __init__(self, construction, index, source, symbol):
+        nfa = construction.nfa
+        mask = construction.masks[index]
+
+        self.index = index
+        self.name = construction.name(index)
+        self.states = nfa.decode(mask)
+        self.accepting = nfa.is_accepting(mask)
+
+        self.source = construction.name(source) if source is not None else None
+        self.symbol = symbol
+
+    def __repr__(self):
+        return f"SubsetDiscovered({self.name} = {sorted(map(str, self.states))})"
+
+
+class SubsetTransition:
+    """A DFA transition between two subsets that have already been discovered"""
+
+    def __init__(self, construction, start, symbol, end):
+        self.start = construction.name(start)
+        self.symbol = symbol
+        self.end = construction.name(end)
+
+    def __repr__(self):
+        return f"SubsetTransition({self.start} --{self.symbol}--> {self.end})"
@@ -0,0 +1,79 @@
+import os
+import sys
+import random
+import itertools
+
+import pytest
+
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+
+# The modules under test sit at the top of the repo, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Every string over symbols of length 0 to max_length, shortest first
+def all_strings(symbols, max_length):
+    for length in range(max_length + 1):
+        for letters in itertools.product(sorted(symbols), repeat=length):
+            yield "".join(letters)
+
+
+# The states dfa visits reading string, starting with start (the initial
+#   state by default). Stops before the first symbol with no transition
+def dfa_path(dfa, string, start=None):
+    path = [dfa.initial_state if start is None else start]
+    for symbol in string:
+        state = dfa.transitions.get(path[-1], dict()).get(symbol)
+        if state is None:
+            break
+        path.append(state)
+    return path
+
+
+# Whether dfa accepts string, with missing transitions of a partial DFA
+#   rejecting
+def dfa_accepts(dfa, string):
+    path = dfa_path(dfa, string)
+    return len(path) == len(string) + 1 and path[-1] in dfa.final_states
+
+
+def random_dfa(rng, n, symbols="ab", partial=False):
+    states = [f"s{i}" for i in range(n)]
+    transitions = dict()
+    for state in states:
+        transitions[state] = {
+            symbol: rng.choice(states) for symbol in symbols
+            if not (partial and rng.random() < 0.25)
+        }
+    return DFA(
+        states        = set(states),
+        input_symbols = set(symbols),
+        transitions   = transitions,
+        initial_state = states[0],
+        final_states  = {state for state in states if rng.random() < 0.4},
+        allow_partial = partial,
+    )
+
+
+def random_nfa(rng, n, symbols="ab", epsilons=True):
+    states = [f"n{i}" for i in range(n)]
+    transitions = {state: dict() for state in states}
+    for state in states:
+        for symbol in list(symbols) + ([""] if epsilons else []):
+            ends = {end for end in states if rng.random() < 0.2}
+            if ends:
+                transitions[state][symbol] = ends
+    return NFA(
+        states        = set(states),
+        input_symbols = set(symbols),
+        transitions   = transitions,
+        initial_state = states[0],
+        final_states  = {state for state in states if rng.random() < 0.3},
+    )
+
+
+# Seeded, so a failing case can be rebuilt from its index
+@pytest.fixture
+def rng():
+    return random.Random(2024)
@@ -0,0 +1,59 @@
+from automata.base.exceptions import RejectionException
+
+from conftest import all_strings, random_nfa
+from bitset_nfa import BitsetNFA
+from fa_manager import NFA_Manager
+
+
+# automata-lib's active sets after each symbol. Its stepwise reader raises
+#   once the whole input is read and rejected, after the last set
+def _active_sets(nfa, string):
+    sets = list()
+    try:
+        for states in nfa.read_input_stepwise(string):
+            sets.append(frozenset(states))
+    except RejectionException:
+        pass
+    return sets
+
+
+def test_accepts_agrees_with_automata(rng):
+    for _ in range(50):
+        nfa = random_nfa(rng, rng.randint(1, 6))
+        bitset = BitsetNFA.from_nfa(nfa)
+
+        for string in all_strings("ab", 5):
+            assert bitset.accepts(string) == nfa.accepts_input(string), string
+
+
+def test_run_keeps_every_active_set(rng):
+    for _ in range(30):
+        nfa = random_nfa(rng, rng.randint(1, 6))
+        bitset = BitsetNFA.from_nfa(nfa)
+
+        for string in all_strings("ab", 4):
+            run = bitset.run(string)
+            assert run.active_history() == _active_sets(nfa, string)
+            assert run.accepted == nfa.accepts_input(string)
+
+
+def test_masks_round_trip(rng):
+    nfa = random_nfa(rng, 6)
+    bitset = BitsetNFA.from_nfa(nfa)
+
+    for states in (set(), {"n0"}, {"n1", "n4"}, set(nfa.states)):
+        assert bitset.decode(bitset.encode(states)) == frozenset(states)
+
+
+def test_unknown_symbols_kill_the_run(rng):
+    nfa = random_nfa(rng, 4)
+    assert not BitsetNFA.from_nfa(nfa).accepts("abz")
+
+
+def test_manager_simulates_from_the_current_states(rng):
+    nfa = random_nfa(rng, 5, epsilons=False)
+    manager = NFA_Manager.from_nfa(nfa, "ab")
+
+    run = manager.simulate()
+    assert run.active_history() == _active_sets(nfa, "ab")
+    assert manager.current_states == run.active_states()
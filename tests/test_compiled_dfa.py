@@ -0,0 +1,101 @@
+import pytest
+
+from automata.fa.dfa import DFA
+
+from conftest import all_strings, dfa_accepts, dfa_path, random_dfa
+from compiled_dfa import CompiledDFA
+from exceptions import UnsupportedSymbolException
+from fa_manager import DFA_Manager
+
+
+def _multi_character_dfa():
+    return DFA(
+        states        = {"q0", "q1"},
+        input_symbols = {"a", "yz"},
+        transitions   = {
+            "q0": {"a": "q0", "yz": "q1"},
+            "q1": {"a": "q0", "yz": "q1"},
+        },
+        initial_state = "q0",
+        final_states  = {"q1"},
+    )
+
+
+def test_run_many_agrees_with_automata(rng):
+    strings = list(all_strings("ab", 6))
+    for _ in range(30):
+        dfa = random_dfa(rng, rng.randint(1, 8))
+        accepted, final_states = CompiledDFA.from_dfa(dfa).run_many(strings)
+
+        assert accepted.tolist() == [dfa.accepts_input(string) for string in strings]
+        assert final_states == [dfa_path(dfa, string)[-1] for string in strings]
+
+
+def test_run_many_on_partial_dfas_and_unknown_symbols(rng):
+    strings = list(all_strings("abc", 4))
+    for _ in range(30):
+        dfa = random_dfa(rng, rng.randint(1, 6), partial=True)
+        accepted, final_states = CompiledDFA.from_dfa(dfa).run_many(strings)
+
+        for string, accepts, final_state in zip(strings, accepted.tolist(), final_states):
+            path = dfa_path(dfa, string)
+            assert accepts == dfa_accepts(dfa, string)
+            assert final_state == (path[-1] if len(path) == len(string) + 1 else None)
+
+
+def test_run_many_keeps_the_order_of_the_batch(rng):
+    dfa = random_dfa(rng, 5)
+    strings = ["abab", "", "b", "aaaaaaa", "ba"]
+
+    accepted, _ = CompiledDFA.from_dfa(dfa).run_many(strings)
+    assert accepted.tolist() == [dfa.accepts_input(string) for string in strings]
+
+
+def test_trace_records_the_run(rng):
+    for _ in range(30):
+        dfa = random_dfa(rng, rng.randint(1, 6), partial=True)
+        compiled = CompiledDFA.from_dfa(dfa)
+
+        for string in all_strings("ab", 5):
+            trace = compiled.trace(string)
+            path = dfa_path(dfa, string)
+
+            assert trace.states == path
+            assert trace.accepted == dfa_accepts(dfa, string)
+            if len(path) == len(string) + 1:
+                assert trace.stopped_at is None
+                assert trace.transitions() == list(zip(path, path[1:], string))
+            else:
+                assert trace.stopped_at == len(path) - 1
+
+
+def test_trace_from_a_given_state(rng):
+    dfa = random_dfa(rng, 6)
+    compiled = CompiledDFA.from_dfa(dfa)
+
+    for state in dfa.states:
+        trace = compiled.trace("abba", compiled.state_ids[state])
+        assert trace.states == dfa_path(dfa, "abba", start=state)
+
+
+def test_manager_trace_continues_from_the_current_state(rng):
+    dfa = random_dfa(rng, 6)
+    manager = DFA_Manager.from_dfa(dfa, "abba")
+
+    manager.next()
+    trace = manager.trace()
+    assert trace.states == dfa_path(dfa, "abba")[1:]
+    assert manager.current_state == dfa_path(dfa, "abba")[-1]
+
+
+def test_multi_character_symbols_are_refused():
+    with pytest.raises(UnsupportedSymbolException, match="yz"):
+        CompiledDFA.from_dfa(_multi_character_dfa())
+
+
+def test_manager_runs_multi_character_symbols_through_automata():
+    manager = DFA_Manager.from_dfa(_multi_character_dfa())
+    accepted, final_states = manager.run_many([["a", "yz"], ["yz", "a"], [], "ayz", ["b"]])
+
+    assert accepted.tolist() == [True, False, False, False, False]
+    assert final_states == ["q1", "q0", "q0", None, None]
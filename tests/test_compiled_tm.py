@@ -0,0 +1,132 @@
+import json
+
+from pathlib import Path
+
+import pytest
+
+from automata.base.exceptions import RejectionException
+from automata.tm.dtm import DTM
+
+from conftest import all_strings
+from compiled_tm import CompiledTM
+from exceptions import InvalidInputException
+
+MACHINE = Path(__file__).parent.parent / "turing.json"
+
+
+@pytest.fixture
+def raw_tm():
+    with open(MACHINE, "r") as f:
+        return json.loads(f.read())
+
+
+def _dtm(rawJson):
+    return DTM(
+        states        = set(rawJson["states"]),
+        input_symbols = set(rawJson["input_symbols"]),
+        tape_symbols  = set(rawJson["tape_symbols"]),
+        blank_symbol  = rawJson["blank_symbol"],
+        transitions   = rawJson["transitions"],
+        initial_state = rawJson["initial_state"],
+        final_states  = set(rawJson["final_states"]),
+    )
+
+
+# Every configuration automata-lib goes through, the starting one first
+def _configurations(dtm, string):
+    configurations = list()
+    try:
+        for configuration in dtm.read_input_stepwise(string):
+            configurations.append(configuration)
+    except RejectionException:
+        pass
+    return configurations
+
+
+def _trimmed(configuration, blank):
+    return configuration.tape.get_symbols_as_str().strip(blank)
+
+
+def test_run_agrees_with_automata(raw_tm):
+    dtm = _dtm(raw_tm)
+    compiled = CompiledTM.from_json(raw_tm)
+
+    for string in all_strings("01", 7):
+        result = compiled.run(string)
+        configurations = _configurations(dtm, string)
+
+        assert result.accepted == dtm.accepts_input(string), string
+        assert result.steps == len(configurations) - 1
+        assert result.state == configurations[-1].state
+        assert result.tape == _trimmed(configurations[-1], dtm.blank_symbol)
+
+
+def test_from_dtm_matches_from_json(raw_tm):
+    from_json = CompiledTM.from_json(raw_tm)
+    from_dtm = CompiledTM.from_dtm(_dtm(raw_tm), states=raw_tm["states"])
+
+    for string in all_strings("01", 5):
+        assert repr(from_json.run(string)) == repr(from_dtm.run(string))
+
+
+def test_step_budget(raw_tm):
+    result = CompiledTM.from_json(raw_tm).run("000111", max_steps=3)
+    assert result.status == "budget"
+    assert not result.halted
+    assert result.steps == 3
+
+
+def test_unknown_tape_symbol(raw_tm):
+    with pytest.raises(InvalidInputException):
+        CompiledTM.from_json(raw_tm).run("012")
+
+
+def test_keyframes_match_the_run(raw_tm):
+    dtm = _dtm(raw_tm)
+    compiled = CompiledTM.from_json(raw_tm)
+
+    for string in ("01", "0011", "000111", "0101"):
+        configurations = _configurations(dtm, string)
+        result = compiled.run(string, every=2)
+
+        steps = [keyframe.step for keyframe in result.keyframes]
+        assert steps[0] == 0 and steps[-1] == result.steps
+        assert all(step % 2 == 0 for step in steps[:-1])
+
+        for keyframe in result.keyframes:
+            configuration = configurations[keyframe.step]
+            assert keyframe.state == configuration.state
+            assert keyframe.tape == _trimmed(configuration, dtm.blank_symbol)
+
+
+def test_state_change_keyframes(raw_tm):
+    dtm = _dtm(raw_tm)
+    result = CompiledTM.from_json(raw_tm).run("000111", state_changes=True)
+    configurations = _configurations(dtm, "000111")
+
+    changes = [
+        step for step in range(1, len(configurations))
+        if configurations[step].state != configurations[step - 1].state
+    ]
+    steps = [keyframe.step for keyframe in result.keyframes]
+    assert steps == [0] + changes + ([result.steps] if changes[-1] != result.steps else [])
+
+
+def test_no_keyframes_unless_asked(raw_tm):
+    assert CompiledTM.from_json(raw_tm).run("0011").keyframes == []
+
+
+def test_run_resumes_partway(raw_tm):
+    dtm = _dtm(raw_tm)
+    compiled = CompiledTM.from_json(raw_tm)
+    full = compiled.run("000111")
+
+    for step, configuration in enumerate(_configurations(dtm, "000111")):
+        resumed = compiled.run(
+            configuration.tape.get_symbols_as_str(),
+            start = compiled.state_ids[configuration.state],
+            head  = configuration.tape.current_position,
+        )
+        assert resumed.state == full.state
+        assert resumed.tape == full.tape
+        assert resumed.steps == full.steps - step
@@ -0,0 +1,133 @@
+import json
+import shutil
+
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dsl import interpreter
+from dsl.compiler import Session, compile_script
+from dsl.dsl_errors import TypeNotRecognizedError, TypeNotSpecifiedError
+
+SIMPLE = Path(__file__).parent.parent / "fa_vault" / "simple.json"
+
+
+@pytest.fixture
+def machine(tmp_path):
+    interpreter.clear_cache()
+    filename = tmp_path / "simple.json"
+    shutil.copy(SIMPLE, filename)
+    yield filename
+    interpreter.clear_cache()
+
+
+def _rewrite(filename, **changes):
+    with open(filename, "r") as f:
+        rawJson = json.loads(f.read())
+    rawJson.update(changes)
+    with open(filename, "w") as f:
+        f.write(json.dumps(rawJson))
+
+
+## LOAD cache ##
+
+def test_loading_a_file_twice_builds_it_once(machine):
+    first = interpreter.load_machine(machine)
+    second = interpreter.load_machine(machine)
+
+    assert first is not second
+    assert first.auto is second.auto
+    assert len(interpreter._machine_cache) == 1
+
+
+def test_stepping_one_load_leaves_the_other(machine):
+    first = interpreter.load_machine(machine)
+    first.input_string = "b"
+    second = interpreter.load_machine(machine)
+
+    first.next()
+    assert first.current_state == "q1"
+    assert second.current_state == "q0"
+    assert second.input_string == ""
+
+
+def test_concurrent_loads_share_one_build(machine):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        machines = list(pool.map(interpreter.load_machine, [machine] * 16))
+
+    assert len({id(m.auto) for m in machines}) == 1
+
+
+def test_editing_a_file_loads_it_again(machine):
+    first = interpreter.load_machine(machine)
+    _rewrite(machine, final_states=["q0"])
+    second = interpreter.load_machine(machine)
+
+    assert first.auto is not second.auto
+    assert second.dfa.final_states == {"q0"}
+    assert first.source_key != second.source_key
+
+
+def test_a_failed_load_is_not_cached(machine):
+    _rewrite(machine, type="pda")
+    with pytest.raises(TypeNotRecognizedError):
+        interpreter.load_machine(machine)
+    assert interpreter._machine_cache == dict()
+
+
+def test_session_keeps_unchanged_loads(machine):
+    session = Session()
+    session.run_script([f"LOAD {machine} AS m"])
+    loaded = session.env["m"]
+
+    session.run_script([f"LOAD {machine} AS m"])
+    assert session.env["m"] is loaded
+
+    _rewrite(machine, final_states=["q2"])
+    session.run_script([f"LOAD {machine} AS m"])
+    assert session.env["m"] is not loaded
+    assert session.env["m"].dfa.final_states == {"q2"}
+
+
+## Plans ##
+
+def test_a_load_overwritten_before_use_is_dead():
+    plan = compile_script([
+        "LOAD a.json AS m",
+        "LOAD b.json AS m",
+        "RENDER m",
+        "LOAD c.json AS m",
+        "LOAD d.json AS n",
+    ])
+    dead = [s.filename for s in plan.loads if plan.is_dead(s)]
+
+    assert dead == ["a.json"]
+    assert [r.varname for r in plan.renders] == ["m"]
+
+
+def test_a_load_used_in_between_is_not_dead():
+    plan = compile_script(["LOAD a.json AS m", "SHOW m", "LOAD b.json AS m"])
+    assert not any(plan.is_dead(s) for s in plan.loads)
+
+
+def test_dead_loads_are_checked_but_not_built(machine, tmp_path):
+    other = tmp_path / "other.json"
+    shutil.copy(machine, other)
+
+    session = Session()
+    session.run_script([f"LOAD {other} AS m", f"LOAD {machine} AS m"])
+
+    assert session.env["m"].source_file == str(machine.resolve())
+    assert len(interpreter._machine_cache) == 1
+
+
+def test_dead_loads_of_bad_files_are_reported(machine, tmp_path):
+    untyped = tmp_path / "untyped.json"
+    with open(untyped, "w") as f:
+        f.write(json.dumps({"states": []}))
+
+    with pytest.raises(TypeNotSpecifiedError):
+        Session().run_script([f"LOAD {untyped} AS m", f"LOAD {machine} AS m"])
+    with pytest.raises(FileNotFoundError):
+        Session().run_script([f"LOAD {tmp_path / 'missing.json'} AS m", f"LOAD {machine} AS m"])
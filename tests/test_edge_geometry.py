@@ -0,0 +1,54 @@
+import numpy as np
+
+from utils import angle_between, edge_offsets, loop_angles
+
+RIGHT = np.array([1.0, 0.0, 0.0])
+
+
+def _points(rng, n):
+    return np.array([[rng.uniform(-4, 4), rng.uniform(-4, 4), 0.0] for _ in range(n)])
+
+
+def test_offsets_are_perpendicular_and_fixed_length(rng):
+    positions = _points(rng, 8)
+    starts = np.array([0, 1, 2, 3, 4])
+    ends = np.array([1, 2, 3, 4, 5])
+
+    offsets = edge_offsets(positions, starts, ends, distance=0.25)
+    directions = positions[ends] - positions[starts]
+
+    assert np.allclose(np.einsum("ij,ij->i", offsets, directions), 0)
+    assert np.allclose(np.linalg.norm(offsets, axis=1), 0.25)
+
+
+def test_offsets_of_opposite_edges_cancel(rng):
+    positions = _points(rng, 4)
+    there = edge_offsets(positions, np.array([0, 2]), np.array([1, 3]))
+    back = edge_offsets(positions, np.array([1, 3]), np.array([0, 2]))
+    assert np.allclose(there, -back)
+
+
+def test_offset_of_a_zero_length_edge_is_zero():
+    positions = np.array([[1.0, 1.0, 0.0], [1.0, 1.0, 0.0]])
+    assert np.allclose(edge_offsets(positions, np.array([0]), np.array([1])), 0)
+
+
+def test_loop_angles_match_angle_between(rng):
+    positions = _points(rng, 20)
+    center = np.array([0.5, -0.25, 0.0])
+
+    angles = loop_angles(positions, center)
+    for position, angle in zip(positions, angles):
+        expected = angle_between(position - center, RIGHT)
+        if position[1] < center[1]:
+            expected = -expected
+        assert np.isclose(angle, expected)
+
+
+def test_loop_angles_point_away_from_center():
+    positions = np.array([[2.0, 0.0, 0.0], [0.0, 2.0, 0.0], [-2.0, 0.0, 0.0], [0.0, -2.0, 0.0]])
+    assert np.allclose(loop_angles(positions, np.zeros(3)), [0, np.pi / 2, np.pi, -np.pi / 2])
+
+
+def test_loop_angle_at_the_center_is_zero():
+    assert np.allclose(loop_angles(np.zeros((1, 3)), np.zeros(3)), [0])
@@ -0,0 +1,86 @@
+import json
+
+from pathlib import Path
+
+from conftest import random_dfa, random_nfa
+from edge_index import EPSILON, EdgeIndex, label_symbols
+from utils import DFAtoManimEdges, JSONtoManimEdges, NFAtoManimEdges
+
+VAULT = Path(__file__).parent.parent / "fa_vault"
+
+
+# The symbols on each edge, worked out the slow way: one scan of the
+#   transitions per pair of states
+def _expected_edges(transitions, states):
+    expected = dict()
+    for start in states:
+        for end in states:
+            symbols = {
+                symbol for symbol, ends in transitions.get(start, dict()).items()
+                if end == ends or (not isinstance(ends, str) and end in ends)
+            }
+            if symbols:
+                expected[(start, end)] = symbols
+    return expected
+
+
+def _edges_of(index):
+    return {edge: set(index.symbols(*edge)) for edge in index.edges()}
+
+
+def test_one_edge_per_pair_of_dfa_states(rng):
+    for _ in range(30):
+        dfa = random_dfa(rng, rng.randint(1, 6), partial=True)
+        index = EdgeIndex.from_transitions(dfa.transitions)
+        assert _edges_of(index) == _expected_edges(dfa.transitions, dfa.states)
+
+
+def test_one_edge_per_pair_of_nfa_states(rng):
+    for _ in range(30):
+        nfa = random_nfa(rng, rng.randint(1, 6))
+        index = EdgeIndex.from_transitions(nfa.transitions, nondeterministic=True)
+        assert _edges_of(index) == _expected_edges(nfa.transitions, nfa.states)
+
+
+# Ends in a set are sorted, so the order they were put in does not matter
+def test_edge_order_is_stable(rng):
+    nfa = random_nfa(rng, 6)
+    rebuilt = {
+        start: {symbol: set(sorted(ends, reverse=True)) for symbol, ends in paths.items()}
+        for start, paths in nfa.transitions.items()
+    }
+
+    assert EdgeIndex.from_transitions(rebuilt, nondeterministic=True).edges() == \
+        EdgeIndex.from_transitions(nfa.transitions, nondeterministic=True).edges()
+
+
+def test_labels_round_trip():
+    index = EdgeIndex()
+    index.add("p", "a", "q")
+    index.add("p", "", "q")
+    index.add("p", "a", "q")
+
+    assert index.label("p", "q") == "a, " + EPSILON
+    assert label_symbols(index.label("p", "q")) == ["a", ""]
+    assert len(index) == 1 and ("p", "q") in index
+
+
+def test_vault_files_match_the_converters():
+    for path in sorted(VAULT.glob("*.json")):
+        with open(path, "r") as f:
+            rawJson = json.loads(f.read())
+
+        edges, edge_config = JSONtoManimEdges(rawJson)
+        assert set(edges) == set(_expected_edges(rawJson["transitions"], rawJson["states"]))
+        for edge in edges:
+            assert set(label_symbols(edge_config[edge]["label"])) == \
+                _expected_edges(rawJson["transitions"], rawJson["states"])[edge]
+
+
+def test_automaton_converters(rng):
+    dfa = random_dfa(rng, 5)
+    nfa = random_nfa(rng, 5)
+
+    assert DFAtoManimEdges(dfa)[0] == EdgeIndex.from_transitions(dfa.transitions).edges()
+    assert NFAtoManimEdges(nfa)[0] == \
+        EdgeIndex.from_transitions(nfa.transitions, nondeterministic=True).edges()
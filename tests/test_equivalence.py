@@ -0,0 +1,47 @@
+from conftest import all_strings, dfa_accepts, random_dfa
+from equivalence import check_equivalence, check_inclusion
+
+
+def test_equivalence_agrees_with_automata(rng):
+    for _ in range(200):
+        left = random_dfa(rng, rng.randint(1, 5))
+        right = random_dfa(rng, rng.randint(1, 5))
+        assert check_equivalence(left, right).holds == (left == right)
+
+
+def test_inclusion_agrees_with_automata(rng):
+    for _ in range(200):
+        left = random_dfa(rng, rng.randint(1, 5))
+        right = random_dfa(rng, rng.randint(1, 5))
+        assert check_inclusion(left, right).holds == left.issubset(right)
+
+
+def test_counterexample_is_shortest(rng):
+    for _ in range(100):
+        left = random_dfa(rng, rng.randint(1, 5), partial=True)
+        right = random_dfa(rng, rng.randint(1, 5), partial=True)
+        result = check_equivalence(left, right)
+
+        differing = [
+            string for string in all_strings("ab", 8)
+            if dfa_accepts(left, string) != dfa_accepts(right, string)
+        ]
+        if result.holds:
+            assert not differing
+            continue
+
+        counterexample = result.counterexample
+        assert dfa_accepts(left, counterexample) != dfa_accepts(right, counterexample)
+        assert result.left_accepts == dfa_accepts(left, counterexample)
+        assert len(counterexample) == len(differing[0])
+
+
+def test_inclusion_counterexample_escapes(rng):
+    for _ in range(100):
+        left = random_dfa(rng, rng.randint(1, 5), partial=True)
+        right = random_dfa(rng, rng.randint(1, 5), partial=True)
+        result = check_inclusion(left, right)
+
+        if not result.holds:
+            assert dfa_accepts(left, result.counterexample)
+            assert not dfa_accepts(right, result.counterexample)
@@ -0,0 +1,64 @@
+import json
+
+from pathlib import Path
+
+from conftest import all_strings, dfa_accepts, random_dfa
+from compiled_dfa import CompiledDFA
+from equivalence import check_equivalence
+from fa_binary import BinaryDFA, dump_binary, is_binary, read_automaton
+from fa_manager import DFA_Manager
+from utils import JSONToDFA
+
+SIMPLE = Path(__file__).parent.parent / "fa_vault" / "simple.json"
+
+
+def _dfa_json(dfa):
+    rawJson = {
+        "type": "dfa",
+        "states": sorted(dfa.states),
+        "input_symbols": sorted(dfa.input_symbols),
+        "transitions": {state: dict(paths) for state, paths in dfa.transitions.items()},
+        "initial_state": dfa.initial_state,
+        "final_states": sorted(dfa.final_states),
+    }
+    if dfa.allow_partial:
+        rawJson["allow_partial"] = True
+    return rawJson
+
+
+def test_round_trip_of_the_vault_dfa(tmp_path):
+    with open(SIMPLE, "r") as f:
+        rawJson = json.loads(f.read())
+
+    filename = tmp_path / "simple.fsmb"
+    dump_binary(rawJson, filename)
+
+    assert is_binary(filename)
+    assert read_automaton(filename) == rawJson
+
+
+def test_round_trip_of_random_dfas(tmp_path, rng):
+    for i in range(20):
+        dfa = random_dfa(rng, rng.randint(1, 8), partial=i % 2 == 1)
+        rawJson = _dfa_json(dfa)
+
+        filename = tmp_path / f"random{i}.fsmb"
+        dump_binary(rawJson, filename)
+        assert read_automaton(filename) == rawJson
+
+        with BinaryDFA(filename) as binary:
+            compiled = CompiledDFA.from_binary(binary)
+            for string in all_strings("ab", 6):
+                expected = dfa_accepts(dfa, string)
+                assert binary.accepts(string) == expected
+                assert compiled.accepts(string) == expected
+
+
+def test_manager_from_binary(tmp_path, rng):
+    dfa = random_dfa(rng, 6, partial=True)
+    filename = tmp_path / "managed.fsmb"
+    dump_binary(_dfa_json(dfa), filename)
+
+    manager = DFA_Manager.from_binary(str(filename), "abba")
+    assert check_equivalence(manager.auto, JSONToDFA(_dfa_json(dfa)))
+    assert manager.current_state == dfa.initial_state
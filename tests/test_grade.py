@@ -0,0 +1,82 @@
+import csv
+import json
+
+from pathlib import Path
+
+import pytest
+
+from grade import grade_all, main, read_submissions, structural_hash
+
+REFERENCE = Path(__file__).parent.parent / "fa_vault" / "simple.json"
+
+
+@pytest.fixture
+def reference():
+    with open(REFERENCE, "r") as f:
+        return json.loads(f.read())
+
+
+def _renamed(rawJson, prefix):
+    name = {state: prefix + state for state in rawJson["states"]}
+    return dict(
+        rawJson,
+        states        = [name[state] for state in rawJson["states"]],
+        transitions   = {
+            name[start]: {symbol: name[end] for symbol, end in paths.items()}
+            for start, paths in rawJson["transitions"].items()
+        },
+        initial_state = name[rawJson["initial_state"]],
+        final_states  = [name[state] for state in rawJson["final_states"]],
+    )
+
+
+def _write(directory, name, rawJson):
+    path = directory / name
+    with open(path, "w") as f:
+        f.write(rawJson if isinstance(rawJson, str) else json.dumps(rawJson))
+    return str(path)
+
+
+def test_structural_hash_ignores_order(reference):
+    shuffled = dict(reversed(list(reference.items())))
+    shuffled["states"] = list(reversed(reference["states"]))
+    assert structural_hash(shuffled) == structural_hash(reference)
+    assert structural_hash(_renamed(reference, "x")) != structural_hash(reference)
+
+
+def test_grade_all_verdicts(tmp_path, reference):
+    flipped = dict(reference, final_states=[
+        state for state in reference["states"] if state not in reference["final_states"]
+    ])
+    files = [
+        _write(tmp_path, "a_same.json", reference),
+        _write(tmp_path, "b_renamed.json", _renamed(reference, "p")),
+        _write(tmp_path, "c_flipped.json", flipped),
+        _write(tmp_path, "d_copy.json", dict(reversed(list(reference.items())))),
+        _write(tmp_path, "e_broken.json", "{not json"),
+    ]
+
+    results = grade_all(reference, files, workers=2)
+    verdicts = {result["submission"]: result for result in results}
+
+    assert verdicts["a_same.json"]["verdict"] == "equivalent"
+    assert verdicts["b_renamed.json"]["verdict"] == "equivalent"
+    assert verdicts["c_flipped.json"]["verdict"] == "not equivalent"
+    assert verdicts["c_flipped.json"]["counterexample"] == "<empty>"
+    assert verdicts["d_copy.json"]["duplicate_of"] == "a_same.json"
+    assert verdicts["e_broken.json"]["verdict"] == "invalid"
+
+
+def test_main_writes_a_csv(tmp_path, reference):
+    submissions = tmp_path / "submissions"
+    submissions.mkdir()
+    _write(submissions, "one.json", reference)
+    _write(submissions, "notes.txt", "ignored")
+
+    out_file = tmp_path / "grades.csv"
+    main(["grade.py", str(REFERENCE), str(submissions), str(out_file), "1"])
+
+    assert read_submissions(submissions) == [str(submissions / "one.json")]
+    with open(out_file, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["submission"], row["verdict"]) for row in rows] == [("one.json", "equivalent")]
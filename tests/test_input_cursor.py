@@ -0,0 +1,63 @@
+import io
+
+from conftest import dfa_path, random_dfa
+from fa_manager import DFA_Manager
+from input_cursor import InputCursor
+
+
+def _sources(text):
+    return [text, iter(text), (symbol for symbol in text), io.StringIO(text)]
+
+
+def test_reads_every_source_the_same():
+    for source in _sources("abcab"):
+        cursor = InputCursor(source)
+        assert list(cursor) == list("abcab")
+        assert cursor.position == 5
+        assert cursor.exhausted()
+        assert cursor.advance() is None
+
+
+def test_peek_does_not_consume():
+    for source in _sources("ab"):
+        cursor = InputCursor(source)
+        assert cursor.peek() == "a"
+        assert cursor.peek() == "a"
+        assert cursor.position == 0
+
+        assert cursor.advance() == "a"
+        assert cursor.peek() == "b"
+        assert cursor.position == 1
+
+
+def test_remaining_after_a_partial_read():
+    for source in _sources("abcde"):
+        cursor = InputCursor(source)
+        cursor.advance()
+        cursor.peek()
+
+        assert cursor.remaining() == "bcde"
+        assert cursor.advance() == "b"
+        assert cursor.remaining() == "cde"
+
+
+def test_streams_are_read_in_chunks():
+    cursor = InputCursor(io.StringIO("abcdefg"), chunk_size=3)
+    assert "".join(cursor) == "abcdefg"
+
+
+def test_empty_input():
+    for source in _sources(""):
+        cursor = InputCursor(source)
+        assert cursor.peek() is None
+        assert cursor.exhausted()
+        assert cursor.remaining() == ""
+
+
+def test_manager_steps_through_a_stream(rng):
+    dfa = random_dfa(rng, 5)
+    manager = DFA_Manager.from_dfa(dfa, io.StringIO("abbab"))
+
+    for expected in dfa_path(dfa, "abbab")[1:]:
+        manager.next()
+        assert manager.current_state == expected
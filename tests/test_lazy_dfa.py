@@ -0,0 +1,61 @@
+import pytest
+
+from conftest import all_strings, random_nfa
+from bitset_nfa import BitsetNFA
+from lazy_dfa import LazyDFA
+
+
+def test_accepts_agrees_with_automata(rng):
+    for _ in range(30):
+        nfa = random_nfa(rng, rng.randint(1, 6))
+        lazy = LazyDFA(BitsetNFA.from_nfa(nfa))
+
+        strings = list(all_strings("ab", 5))
+        assert lazy.accepts_many(strings) == [nfa.accepts_input(string) for string in strings]
+
+
+def test_repeated_runs_hit_the_cache(rng):
+    nfa = random_nfa(rng, 5, epsilons=False)
+    lazy = LazyDFA(BitsetNFA.from_nfa(nfa))
+
+    lazy.accepts("abab")
+    first = lazy.stats()
+    assert first["hits"] + first["misses"] >= 1
+
+    lazy.accepts("abab")
+    second = lazy.stats()
+    assert second["misses"] == first["misses"]
+    assert second["hits"] > first["hits"]
+
+
+def test_cache_is_bounded(rng):
+    nfa = random_nfa(rng, 6)
+    lazy = LazyDFA(BitsetNFA.from_nfa(nfa), max_subsets=2)
+
+    for string in all_strings("ab", 5):
+        assert lazy.accepts(string) == nfa.accepts_input(string)
+        assert lazy.stats()["subsets"] <= 2
+
+
+def test_evicts_the_least_recently_used_subset():
+    nfa = BitsetNFA(
+        states     = ["a", "b", "c"],
+        symbols    = ["x"],
+        closures   = [1, 2, 4],
+        successors = {"x": [2, 4, 1]},
+        initial    = 1,
+        final_mask = 4,
+    )
+    lazy = LazyDFA(nfa, max_subsets=2)
+
+    # a -> b -> c -> a visits three subsets, so the first is evicted
+    assert lazy.run("xxx") == 1
+    assert lazy.stats() == {"hits": 0, "misses": 3, "evictions": 1, "subsets": 2}
+
+    lazy.clear()
+    assert lazy.stats() == {"hits": 0, "misses": 0, "evictions": 0, "subsets": 0}
+
+
+def test_needs_room_for_a_subset():
+    with pytest.raises(ValueError):
+        LazyDFA(None, max_subsets=0)
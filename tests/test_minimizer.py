@@ -0,0 +1,47 @@
+from conftest import all_strings, dfa_accepts, random_dfa
+from minimizer import Minimizer, canonical_form
+
+
+def test_minimized_accepts_the_same_language(rng):
+    for _ in range(50):
+        dfa = random_dfa(rng, rng.randint(1, 8), partial=rng.random() < 0.5)
+        minimal = Minimizer(dfa).minimized()
+
+        for string in all_strings("ab", 7):
+            assert dfa_accepts(minimal, string) == dfa_accepts(dfa, string), string
+
+
+def test_minimized_matches_automata_state_count(rng):
+    for _ in range(50):
+        dfa = random_dfa(rng, rng.randint(1, 8))
+        assert len(Minimizer(dfa).minimized().states) == len(dfa.minify().states)
+
+
+def test_canonical_form_identifies_languages(rng):
+    dfas = [random_dfa(rng, rng.randint(1, 5)) for _ in range(30)]
+    for left in dfas:
+        for right in dfas:
+            same = canonical_form(left) == canonical_form(right)
+            assert same == (left == right)
+
+
+def test_events_cover_the_run(rng):
+    dfa = random_dfa(rng, 8)
+    minimizer = Minimizer(dfa)
+    splits = list(minimizer.events())
+
+    # Every split adds one block to the final/non-final starting pair
+    assert len(minimizer.blocks()) <= len(splits) + 2
+    assert all(split.moved for split in splits)
+
+
+def test_block_count_follows_the_live_partition(rng):
+    for _ in range(30):
+        dfa = random_dfa(rng, rng.randint(1, 8), partial=rng.random() < 0.5)
+        minimizer = Minimizer(dfa)
+
+        for _ in minimizer.events():
+            live = [minimizer._names(block) for block in minimizer._blocks]
+            assert minimizer.block_count() == sum(1 for names in live if names)
+
+        assert minimizer.block_count() == len(minimizer.blocks())
@@ -0,0 +1,68 @@
+import pytest
+
+from automata.fa.dfa import DFA
+
+from conftest import dfa_path, random_dfa
+from exceptions import InvalidInputException
+from pumping import find_decomposition, zeros_then_ones
+
+
+def test_decomposition_satisfies_the_lemma(rng):
+    for _ in range(50):
+        dfa = random_dfa(rng, rng.randint(1, 6))
+        string = "".join(rng.choice("ab") for _ in range(len(dfa.states) + rng.randint(0, 3)))
+        decomposition = find_decomposition(dfa, string)
+
+        x, y, z = decomposition.x, decomposition.y, decomposition.z
+        assert x + y + z == string
+        assert len(x + y) <= len(dfa.states)
+        assert len(y) >= 1
+
+        # Pumping y returns to the loop state, so the run ends where it did
+        end = dfa_path(dfa, string)[-1]
+        for i in range(5):
+            assert dfa_path(dfa, decomposition.pumped(i))[-1] == end
+
+
+def test_edges_follow_the_run(rng):
+    dfa = random_dfa(rng, 4)
+    string = "abbaabab"
+    decomposition = find_decomposition(dfa, string)
+
+    path = dfa_path(dfa, string)
+    edges = decomposition.x_edges() + decomposition.y_edges() + decomposition.z_edges()
+    assert edges == list(zip(path, path[1:]))
+    assert decomposition.loop_state == path[len(decomposition.x)]
+
+
+def test_short_strings_cannot_be_pumped():
+    with pytest.raises(ValueError):
+        find_decomposition(_zeros_then_ones_dfa(), "1")
+
+
+def test_missing_transition(rng):
+    dfa = random_dfa(rng, 3)
+    with pytest.raises(InvalidInputException):
+        find_decomposition(dfa, "z" * 5)
+
+
+def test_leaving_counts_for_zeros_then_ones():
+    decomposition = find_decomposition(_zeros_then_ones_dfa(), "000111")
+
+    assert decomposition.y == "0"
+    assert decomposition.leaving_counts(zeros_then_ones) == [0, 2, 3, 4, 5]
+
+
+# Accepts 0*1*, the regular superset of 0^n 1^n the demo pumps against
+def _zeros_then_ones_dfa():
+    return DFA(
+        states        = {"zeros", "ones", "dead"},
+        input_symbols = {"0", "1"},
+        transitions   = {
+            "zeros": {"0": "zeros", "1": "ones"},
+            "ones": {"0": "dead", "1": "ones"},
+            "dead": {"0": "dead", "1": "dead"},
+        },
+        initial_state = "zeros",
+        final_states  = {"zeros", "ones"},
+    )
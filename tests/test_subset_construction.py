@@ -0,0 +1,36 @@
+import pytest
+
+from automata.fa.dfa import DFA
+
+from conftest import all_strings, dfa_accepts, random_nfa
+from bitset_nfa import BitsetNFA
+from exceptions import StateBudgetExceeded
+from subset_construction import SubsetConstruction
+
+
+def test_dfa_agrees_with_automata(rng):
+    for _ in range(50):
+        nfa = random_nfa(rng, rng.randint(1, 6))
+        dfa = SubsetConstruction(BitsetNFA.from_nfa(nfa)).dfa()
+
+        expected = DFA.from_nfa(nfa)
+        for string in all_strings("ab", 6):
+            assert dfa_accepts(dfa, string) == expected.accepts_input(string), string
+
+
+def test_subsets_name_the_dfa_states(rng):
+    nfa = random_nfa(rng, 6)
+    construction = SubsetConstruction(BitsetNFA.from_nfa(nfa))
+
+    subsets = construction.subsets()
+    assert set(subsets) == construction.dfa().states
+    assert all(subsets.values())
+
+
+def test_budget_stops_the_construction(rng):
+    nfa = random_nfa(rng, 8, epsilons=False)
+    construction = SubsetConstruction(BitsetNFA.from_nfa(nfa), max_states=1)
+
+    if len(SubsetConstruction(BitsetNFA.from_nfa(nfa)).subsets()) > 1:
+        with pytest.raises(StateBudgetExceeded):
+            construction.dfa()
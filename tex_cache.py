@@ -0,0 +1,25 @@
+from manim.constants import DEFAULT_FONT_SIZE
+from manim.mobject.text.tex_mobject import MathTex
+
+# Compiled labels, shared by every graph and scene in the process. Keyed by
+#   (tex string, font size, color). Kept in memory only: manim's own tex
+#   cache already saves the LaTeX run across processes, and unpickling
+#   mobjects from a cache directory would run whatever code was put there
+_labels = dict()
+
+
+# Hands out a copy of a compiled MathTex label. The label is only built the
+#   first time a (tex, font_size, color) combination is seen in this process
+def cached_math_tex(tex, fill_color="white", font_size=DEFAULT_FONT_SIZE):
+    key = (str(tex), float(font_size), str(fill_color))
+
+    label = _labels.get(key)
+    if label is None:
+        label = MathTex(tex, fill_color=fill_color, font_size=font_size)
+        _labels[key] = label
+
+    return label.copy()
+
+
+def clear_label_cache():
+    _labels.clear()
@@ -1,37 +1,109 @@
 from manim import *
 
+from tex_cache import cached_math_tex
+
 class TuringTape:
-    def __init__(self, input_string):
+    def __init__(self, input_string, blank="_"):
         self.string = input_string
+        self.blank = blank
         self.index = 0
         self.boxes = VGroup()
 
         if self.string == "": self.string = "_"
 
-    def get_mobject(self):
+    @staticmethod
+    def _build(string):
         out = VGroup()
 
-        starter = MathTex(self.string[0])
+        starter = cached_math_tex(str(string[0]))
         starter_box = SurroundingRectangle(starter, color="white")
 
         most_recent = VGroup(starter, starter_box)
-        for char in self.string[1:]:
+        for char in string[1:]:
             out.add(most_recent)
-            new_char = MathTex(str(char))
+            new_char = cached_math_tex(str(char))
             new_box = SurroundingRectangle(new_char, color="white").set_height(most_recent.get_height())
 
             new_group = VGroup(new_char, new_box).next_to(most_recent, RIGHT, buff=0)
             most_recent = new_group
         out.add(most_recent)
+        return out
 
-        self.boxes = out
-        self.boxes.add_updater(self.update_mobj)
-        self.boxes.update()
+    def get_mobject(self):
+        self.boxes = self._build(self.string)
+        for i in range(len(self.boxes)):
+            self.boxes[i].set_color(self._cell_color(i))
         return self.boxes
 
-    def update_mobj(self, ctx):
-        for i in range(len(self.boxes)):
-            if i == self.index:
-                self.boxes[i].set_color("yellow")
-            else:
-                self.boxes[i].set_color("white")
+    # A static picture of some other tape contents, highlighted at index. Used
+    #   as the target when jumping the live tape ahead several steps at once
+    def snapshot(self, string, index):
+        if string == "": string = "_"
+
+        out = self._build(string)
+        for i in range(len(out)):
+            out[i].set_color("yellow" if i == index else "white")
+        return out
+
+    # Makes a snapshot the live tape: its cells replace the ones on screen,
+    #   inside the same boxes group, so the string, the head and the cells
+    #   agree again after a jump
+    def show(self, snapshot, string, index):
+        self.boxes.remove(*self.boxes.submobjects)
+        self.boxes.add(*snapshot.submobjects)
+        self.string = string if string != "" else "_"
+        self.index = index
+
+    def _cell_color(self, i):
+        return "yellow" if i == self.index else "white"
+
+    ## Single cell changes. Each touches at most two cells of the tape ##
+
+    # Moves the head highlight. Only the cell the head leaves and the cell it
+    #   lands on are recolored
+    def set_index(self, index, animate=False):
+        old, self.index = self.index, index
+        cells = [i for i in sorted({old, index}) if 0 <= i < len(self.boxes)]
+
+        if animate:
+            return AnimationGroup(*[
+                self.boxes[i].animate.set_color(self._cell_color(i)) for i in cells
+            ])
+
+        for i in cells:
+            self.boxes[i].set_color(self._cell_color(i))
+
+    # Replaces the symbol in one cell
+    def write(self, index, symbol, animate=False):
+        cell = self.boxes[index]
+        new_char = cached_math_tex(str(symbol)).move_to(cell[1]).set_color(cell[0].get_color())
+
+        self.string = self.string[:index] + str(symbol) + self.string[index + 1:]
+        if animate:
+            return Transform(cell[0], new_char)
+        cell[0].become(new_char)
+
+    # Adds a blank cell at one end, for when the head runs off the tape. A
+    #   cell added on the left shifts every index up by one
+    def grow(self, side, animate=False):
+        if side == "L":
+            neighbour = self.boxes[0]
+        else:
+            neighbour = self.boxes[-1]
+
+        new_char = cached_math_tex(self.blank)
+        new_box = SurroundingRectangle(new_char, color="white").set_height(neighbour.get_height())
+        new_cell = VGroup(new_char, new_box).set_color("white")
+
+        if side == "L":
+            new_cell.next_to(neighbour, LEFT, buff=0)
+            self.boxes.add_to_back(new_cell)
+            self.string = self.blank + self.string
+            self.index += 1
+        else:
+            new_cell.next_to(neighbour, RIGHT, buff=0)
+            self.boxes.add(new_cell)
+            self.string = self.string + self.blank
+
+        if animate:
+            return FadeIn(new_cell)
@@ -2,7 +2,22 @@ import numpy as np
 from automata.fa.dfa import DFA
 from automata.fa.nfa import NFA
 
+import os
 import json
+
+from edge_index import EdgeIndex
+
+# Where the on-disk caches (layouts, ...) live. Set FSMIPR_CACHE_DIR to
+#   move them somewhere else
+def get_cache_dir(*parts):
+    base = os.environ.get("FSMIPR_CACHE_DIR")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache", "fsmipr")
+
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
 # Unit Vector and Angle Between from:
 # https://stackoverflow.com/questions/2827393/angles-between-two-n-dimensional-vectors-in-python
 def unit_vector(vector):
@@ -13,48 +28,36 @@ def angle_between(v1, v2):
     v2_u = unit_vector(v2)
     return np.arccos(np.clip(np.dot(v1_u, v2_u), -1.0, 1.0))
 
-# This function just makes the edge list for displaying the dfa. It loses the input character
-def JSONtoManimEdges(rawJson): 
-    rawJson["transitions"] = merge_duplicate_edges(rawJson)
-    edges = []
-    edge_config = dict()
-    for start in rawJson["transitions"]:
-        for symbol in rawJson["transitions"][start]:
-            for end in rawJson["transitions"][start][symbol]:
-                newEdge = tuple((start, end))
-                edges.append(newEdge)
-                
-                if (start, end) not in edge_config:
-                    edge_config[(start, end)] = dict()
-                edge_config[(start, end)]["label"] = symbol
-    return edges, edge_config
+## Edge geometry, for many edges at once ##
+
+# For edges that run both ways: how far to shift each arrow, at right
+#   angles to it, so the pair does not overlap. positions is an (n, 3) array
+#   of vertex centers, starts and ends are indices into it
+def edge_offsets(positions, starts, ends, distance=0.1):
+    normals = np.cross(positions[ends] - positions[starts], np.array([0, 0, 1]))
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return distance * normals / np.where(lengths == 0, 1, lengths)
+
+# For self-loops: the angle of each vertex around center, measured from the
+#   x axis and negative below center. The same as angle_between(position -
+#   center, RIGHT) with the sign flipped for vertices under the center
+def loop_angles(positions, center):
+    rays = positions - center
+    norms = np.linalg.norm(rays, axis=1)
+    cosines = np.divide(rays[:, 0], norms, out=np.ones_like(norms), where=norms > 0)
+    angles = np.arccos(np.clip(cosines, -1.0, 1.0))
+    return np.where(rays[:, 1] < 0, -angles, angles)
+
+# The edge lists for displaying an automaton, one edge per pair of states
+#   with every symbol on it in the label. See edge_index
+def JSONtoManimEdges(rawJson):
+    return EdgeIndex.from_json(rawJson).mobj_edges()
 
 def NFAtoManimEdges(nfa):
-    edges = []
-    edge_config = dict()
-    transitions = merge_duplicate_edges({"transitions": nfa.transitions})
-    for start in transitions:
-        for symbol in transitions[start]:
-            for end in transitions[start][symbol]:
-                edges.append((start, end))
-
-                if (start, end) not in edge_config:
-                    edge_config[(start, end)] = dict()
-                edge_config[(start, end)]["label"] = symbol
-    return edges, edge_config
+    return EdgeIndex.from_transitions(nfa.transitions, nondeterministic=True).mobj_edges()
 
 def DFAtoManimEdges(dfa):
-    edges = []
-    edge_config = dict()
-    for start in dfa.transitions:
-        for symbol in dfa.transitions[start]:
-            end = dfa.transitions[start][symbol]
-            edges.append((start, end))
-
-            if (start, end) not in edge_config:
-                edge_config[(start, end)] = dict()
-            edge_config[(start, end)]["label"] = symbol
-    return edges, edge_config
+    return EdgeIndex.from_transitions(dfa.transitions).mobj_edges()
 
 def JSONToDFA(rawJson):
     return DFA(
@@ -97,27 +100,15 @@ def FAToMobj(fa):
         edge_config = edge_config,
     )
 
+# Transitions with every symbol between the same two states merged into one
+#   "a, b" symbol: {start: {"a, b": [end]}}
 def merge_duplicate_edges(rawJson):
-    new_transitions = dict()
-
-    for start in rawJson["transitions"]:
-        finishes = list()
-        new_transitions[start] = dict()
-
-        for symbol in rawJson["transitions"][start]:
-            for end in rawJson["transitions"][start][symbol]:
-                finishes.append([symbol, [end]])
-        finishes.sort(key=lambda x: x[1])
-
-        compiled = [finishes[0]]
-        for finish in finishes[1:]:
-            if finish[1] == compiled[-1][1]:
-                compiled[-1][0] = ", ".join([compiled[-1][0], finish[0]])
-            else:
-                compiled.append(finish)
-        
-        for new_edge in compiled:
-            new_transitions[start][new_edge[0]] = new_edge[1]
+    index = EdgeIndex.from_json(rawJson)
+
+    new_transitions = {start: dict() for start in rawJson["transitions"]}
+    for (start, end) in index.edges():
+        symbols = ", ".join(map(str, index.symbols(start, end)))
+        new_transitions[start][symbols] = [end]
 
     return new_transitions
 
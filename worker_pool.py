@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+
+# Runs fn(argument) for every (key, argument) in tasks on a pool of worker
+#   processes, yielding (key, argument, result, error) as each one finishes.
+#   error is None on success, or the exception the task ended with
+#
+# A worker that dies (killed, out of memory, a crash in native code) breaks
+#   the whole pool, and every task still in it fails along with it. Those
+#   tasks are split with split(key, argument) into smaller (key, argument)
+#   pairs, if given, and run again one at a time on a fresh one-worker pool,
+#   so only a task that takes its worker down again is reported as failed
+def run_tasks(fn, tasks, workers, split=None, initializer=None, initargs=()):
+    unfinished = list()
+    with ProcessPoolExecutor(
+        max_workers = workers,
+        initializer = initializer,
+        initargs    = initargs,
+    ) as pool:
+        futures = {pool.submit(fn, argument): (key, argument) for key, argument in tasks}
+
+        for future in as_completed(futures):
+            key, argument = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                unfinished.append((key, argument))
+                continue
+            except Exception as e:
+                yield key, argument, None, e
+                continue
+            yield key, argument, result, None
+
+    retry = list()
+    for key, argument in unfinished:
+        retry.extend(split(key, argument) if split is not None else [(key, argument)])
+
+    pool = None
+    try:
+        for key, argument in retry:
+            if pool is None:
+                pool = ProcessPoolExecutor(
+                    max_workers = 1,
+                    initializer = initializer,
+                    initargs    = initargs,
+                )
+
+            try:
+                result = pool.submit(fn, argument).result()
+            except BrokenProcessPool as e:
+                # Only this task was in the pool, so it is the one that broke it
+                pool.shutdown()
+                pool = None
+                yield key, argument, None, e
+                continue
+            except Exception as e:
+                yield key, argument, None, e
+                continue
+            yield key, argument, result, None
+    finally:
+        if pool is not None:
+            pool.shutdown()